@@ -0,0 +1 @@
+"""Offline benchmarks for Spotify MCP server."""
@@ -0,0 +1,474 @@
+"""
+Local stand-in for the Spotify Web API used by the benchmarks.
+
+Run standalone with `python -m benchmarks.mock_spotify`; it prints its base
+URL and serves until interrupted. GET /_mock/stats returns request counts
+by endpoint and POST /_mock/reset zeroes them; neither is counted. GET
+responses carry an ETag derived from the body and are answered with
+304 Not Modified when If-None-Match matches it.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Largest page each paged endpoint accepts, as documented by Spotify; larger limits get a 400
+PAGE_SIZES = {
+    'playlist_items': 100,
+    'user_playlists': 50,
+    'saved_tracks': 50,
+    'artist_albums': 50,
+    'search': 50,
+}
+
+# Most IDs the several-items endpoints accept
+SEVERAL_LIMITS = {'tracks': 50, 'albums': 20, 'artists': 50}
+
+_WORDS = (
+    "love night dream fire heart blue summer rain light road city gold wild sky river moon shadow "
+    "dance home ocean star song time world young girl boy story storm echo ghost silver paper"
+).split()
+
+
+class Library:
+    """
+    Deterministic catalog and user library.
+
+    Names are drawn from a small vocabulary so searches have matches. Every
+    playlist draws its tracks from the shared catalog, so artists and
+    albums repeat across playlists as they do in real libraries.
+    """
+
+    def __init__(self, playlists: int = 20, tracks_per_playlist: int = 500, saved_tracks: int = 1000,
+                 artists: int = 200, albums_per_artist: int = 5, tracks_per_album: int = 10, seed: int = 0):
+        rng = random.Random(seed)
+
+        def name(words=2):
+            return " ".join(rng.choice(_WORDS) for _ in range(words)).title()
+
+        self.artists = {}
+        self.albums = {}
+        self.tracks = {}
+        for a in range(artists):
+            artist = {'id': f"ar{a:06d}", 'name': name(), 'genres': ['pop'], 'popularity': rng.randint(0, 100),
+                      'type': 'artist'}
+            self.artists[artist['id']] = artist
+            for b in range(albums_per_artist):
+                album = {'id': f"al{a:06d}{b:02d}", 'name': name(3), 'artists': [self._artist_ref(artist)],
+                         'album_type': rng.choice(('album', 'single', 'compilation')),
+                         'release_date': f"{rng.randint(1970, 2025)}-01-01", 'total_tracks': tracks_per_album,
+                         'genres': [], 'type': 'album'}
+                album['album_group'] = album['album_type']
+                self.albums[album['id']] = album
+                for t in range(tracks_per_album):
+                    track = {'id': f"tr{a:06d}{b:02d}{t:02d}", 'name': name(), 'artists': [self._artist_ref(artist)],
+                             'album': self._album_ref(album), 'track_number': t + 1,
+                             'duration_ms': rng.randint(120000, 300000), 'is_playable': True, 'type': 'track'}
+                    self.tracks[track['id']] = track
+
+        track_ids = list(self.tracks)
+        self.playlists = {}
+        for p in range(playlists):
+            playlist_id = f"pl{p:06d}"
+            self.playlists[playlist_id] = {
+                'id': playlist_id, 'name': name(), 'description': 'Benchmark playlist',
+                'owner': {'display_name': 'bench', 'id': 'bench'}, 'version': 0,
+                'items': [rng.choice(track_ids) for _ in range(tracks_per_playlist)],
+            }
+        self.saved = [rng.choice(track_ids) for _ in range(saved_tracks)]
+
+    @staticmethod
+    def _artist_ref(artist: Dict) -> Dict:
+        return {'id': artist['id'], 'name': artist['name'], 'type': 'artist'}
+
+    def _album_ref(self, album: Dict) -> Dict:
+        return {k: album[k] for k in ('id', 'name', 'artists', 'album_type', 'release_date', 'total_tracks')}
+
+
+class MockSpotify:
+    """
+    Threaded HTTP server answering the Web API endpoints the clients use.
+
+    Args:
+        library: Catalog and user library to serve
+        latency_ms: Delay added to every response
+        jitter_ms: Random +/- variation of the delay
+        throttle_rate: Fraction of requests answered with 429
+        retry_after: Retry-After seconds sent with a 429
+        page_sizes: Per-endpoint maximum page sizes, see PAGE_SIZES
+        seed: Seed for latency jitter and throttling
+    """
+
+    def __init__(self, library: Library, latency_ms: float = 0, jitter_ms: float = 0, throttle_rate: float = 0,
+                 retry_after: float = 0.05, page_sizes: Optional[Dict[str, int]] = None, seed: int = 0):
+        self.library = library
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.page_sizes = {**PAGE_SIZES, **(page_sizes or {})}
+        self.requests: Counter = Counter()
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.playback = {'is_playing': False, 'track': next(iter(library.tracks)), 'progress_ms': 0,
+                         'volume': 50, 'queue': []}
+        self.devices = [
+            {'id': 'dev1', 'name': 'Bench Speaker', 'type': 'Speaker', 'is_active': True, 'volume_percent': 50},
+            {'id': 'dev2', 'name': 'Bench Phone', 'type': 'Smartphone', 'is_active': False, 'volume_percent': 50},
+        ]
+
+    # ---- Server lifecycle ----
+
+    def start(self) -> str:
+        """Start serving on a free local port and return the API base URL."""
+        mock = self
+
+        class Handler(_Handler):
+            spotify = mock
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-spotify", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1/"
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_counters(self):
+        """Zero the request, 429 and byte counters."""
+        with self._lock:
+            self.requests.clear()
+            self.throttled = 0
+            self.bytes_sent = 0
+
+    def stats(self) -> Dict:
+        """Request counts by endpoint since the last reset, including throttled requests."""
+        with self._lock:
+            return {
+                'requests': sum(self.requests.values()),
+                'throttled': self.throttled,
+                'bytes_sent': self.bytes_sent,
+                'endpoints': dict(self.requests),
+            }
+
+    # ---- Request handling ----
+
+    def _wait(self) -> bool:
+        """Sleep for the configured latency; return whether to answer with a 429."""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            throttle = self.throttle_rate and self._rng.random() < self.throttle_rate
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+        return throttle
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body) -> tuple:
+        """Return (status, headers, payload) for one request."""
+        route = _route_name(method, path)
+        with self._lock:
+            self.requests[route] += 1
+        if self._wait():
+            with self._lock:
+                self.throttled += 1
+            error = {'error': {'status': 429, 'message': 'API rate limit exceeded'}}
+            return 429, {'Retry-After': str(self.retry_after)}, error
+        try:
+            # Latency is simulated above, so holding the state lock here doesn't serialize it
+            with self._state_lock:
+                return 200, {}, self._dispatch(method, path, query, body)
+        except _ApiError as e:
+            return e.status, {}, {'error': {'status': e.status, 'message': e.message}}
+
+    def _dispatch(self, method: str, path: str, query: Dict[str, str], body):
+        lib = self.library
+        parts = path.strip('/').split('/')[1:]  # drop the 'v1' prefix
+
+        if parts == ['me']:
+            return {'id': 'bench', 'display_name': 'bench'}
+        if parts == ['me', 'playlists']:
+            playlists = [self._playlist_summary(p) for p in lib.playlists.values()]
+            return self._page(playlists, query, 'user_playlists')
+        if parts == ['me', 'tracks']:
+            items = [{'added_at': f"2024-01-01T00:00:{i % 60:02d}Z", 'track': lib.tracks[t]}
+                     for i, t in enumerate(lib.saved)]
+            return self._page(items, query, 'saved_tracks')
+        if parts == ['search']:
+            return self._search(query)
+        if parts[0] in SEVERAL_LIMITS and len(parts) == 1:
+            ids = [i for i in query.get('ids', '').split(',') if i]
+            if len(ids) > SEVERAL_LIMITS[parts[0]]:
+                raise _ApiError(400, "Too many ids requested")
+            table = getattr(lib, parts[0])
+            return {parts[0]: [self._full(parts[0], i) if i in table else None for i in ids]}
+        if parts[0] in ('tracks', 'albums', 'artists') and len(parts) == 2:
+            return self._full(parts[0], parts[1])
+        if parts[0] == 'artists' and parts[2:] == ['albums']:
+            self._get(lib.artists, parts[1])
+            groups = (query.get('include_groups') or 'album,single,compilation,appears_on').split(',')
+            albums = [a for a in lib.albums.values()
+                      if a['artists'][0]['id'] == parts[1] and a['album_group'] in groups]
+            return self._page(albums, query, 'artist_albums')
+        if parts[0] == 'artists' and parts[2:] == ['top-tracks']:
+            self._get(lib.artists, parts[1])
+            return {'tracks': [t for t in lib.tracks.values() if t['artists'][0]['id'] == parts[1]][:10]}
+        if parts[0] == 'playlists':
+            return self._playlists(method, parts[1:], query, body)
+        if parts[0] == 'users' and parts[2:] == ['playlists'] and method == 'POST':
+            return self._create_playlist(body or {})
+        if parts[:2] == ['me', 'player']:
+            return self._player(method, parts[2:], query)
+        raise _ApiError(404, f"Unknown endpoint {method} {path}")
+
+    # ---- Endpoint groups ----
+
+    def _playlists(self, method: str, parts: List[str], query: Dict[str, str], body):
+        playlist = self._get(self.library.playlists, parts[0])
+        if len(parts) == 1 and method == 'GET':
+            if query.get('fields') == 'snapshot_id':
+                return {'snapshot_id': self._snapshot(playlist)}
+            return {**self._playlist_summary(playlist), 'tracks': self._items_page(playlist, {'limit': '100'})}
+        if len(parts) == 1 and method == 'PUT':
+            playlist.update({k: v for k, v in (body or {}).items() if k in ('name', 'description')})
+            playlist['version'] += 1
+            return None
+        if parts[1:] == ['tracks'] and method == 'GET':
+            return self._items_page(playlist, query)
+        if parts[1:] == ['tracks'] and method == 'POST':
+            # spotipy sends a bare list of URIs with position as a query parameter
+            uris = body if isinstance(body, list) else (body or {}).get('uris', [])
+            position = query.get('position') or (body.get('position') if isinstance(body, dict) else None)
+            if len(uris) > 100:
+                raise _ApiError(400, "Too many tracks")
+            ids = [u.rsplit(':', 1)[-1] for u in uris]
+            at = len(playlist['items']) if position is None else int(position)
+            playlist['items'][at:at] = ids
+            playlist['version'] += 1
+            return {'snapshot_id': self._snapshot(playlist)}
+        if parts[1:] == ['tracks'] and method == 'DELETE':
+            remove = {t['uri'].rsplit(':', 1)[-1] for t in (body or {}).get('tracks', [])}
+            if len(remove) > 100:
+                raise _ApiError(400, "Too many tracks")
+            playlist['items'] = [i for i in playlist['items'] if i not in remove]
+            playlist['version'] += 1
+            return {'snapshot_id': self._snapshot(playlist)}
+        raise _ApiError(404, "Unknown playlist endpoint")
+
+    def _create_playlist(self, body: Dict) -> Dict:
+        playlist_id = f"pl{len(self.library.playlists):06d}"
+        playlist = {'id': playlist_id, 'name': body.get('name', ''), 'description': body.get('description', ''),
+                    'owner': {'display_name': 'bench', 'id': 'bench'}, 'version': 0, 'items': []}
+        self.library.playlists[playlist_id] = playlist
+        return {**self._playlist_summary(playlist), 'tracks': self._items_page(playlist, {'limit': '100'})}
+
+    def _player(self, method: str, parts: List[str], query: Dict[str, str]):
+        state = self.playback
+        track = self.library.tracks[state['track']]
+        if parts == [] and method == 'GET':
+            return {'is_playing': state['is_playing'], 'progress_ms': state['progress_ms'], 'item': track,
+                    'currently_playing_type': 'track', 'device': self.devices[0]}
+        if parts == ['currently-playing']:
+            return {'is_playing': state['is_playing'], 'progress_ms': state['progress_ms'], 'item': track,
+                    'currently_playing_type': 'track'}
+        if parts == ['devices']:
+            return {'devices': self.devices}
+        if parts == ['queue'] and method == 'GET':
+            return {'currently_playing': track, 'queue': [self.library.tracks[t] for t in state['queue'][:20]]}
+        if parts == ['queue'] and method == 'POST':
+            state['queue'].append(query['uri'].rsplit(':', 1)[-1])
+            return None
+        if parts == ['play']:
+            state['is_playing'] = True
+            return None
+        if parts == ['pause']:
+            state['is_playing'] = False
+            return None
+        if parts in (['next'], ['previous']):
+            if state['queue'] and parts == ['next']:
+                state['track'] = state['queue'].pop(0)
+            state['progress_ms'] = 0
+            return None
+        if parts == ['seek']:
+            state['progress_ms'] = int(query.get('position_ms', 0))
+            return None
+        if parts == ['volume']:
+            state['volume'] = int(query.get('volume_percent', 50))
+            return None
+        raise _ApiError(404, "Unknown player endpoint")
+
+    def _search(self, query: Dict[str, str]) -> Dict:
+        words = query.get('q', '').lower().split()
+        limit = self._limit(query, 'search', default=10)
+        offset = int(query.get('offset', 0))
+        sources = {
+            'track': ('tracks', self.library.tracks.values()),
+            'album': ('albums', self.library.albums.values()),
+            'artist': ('artists', self.library.artists.values()),
+            'playlist': ('playlists', [self._playlist_summary(p) for p in self.library.playlists.values()]),
+        }
+        results = {}
+        for qtype in query.get('type', 'track').split(','):
+            key, items = sources[qtype]
+            matches = [i for i in items if all(w in i['name'].lower() for w in words)]
+            results[key] = {'items': matches[offset:offset + limit], 'offset': offset, 'limit': limit,
+                            'total': len(matches)}
+        return results
+
+    # ---- Helpers ----
+
+    @staticmethod
+    def _get(table: Dict, item_id: str) -> Dict:
+        if item_id not in table:
+            raise _ApiError(404, "Resource not found")
+        return table[item_id]
+
+    def _full(self, kind: str, item_id: str) -> Dict:
+        item = self._get(getattr(self.library, kind), item_id)
+        if kind == 'albums':
+            tracks = [t for t in self.library.tracks.values() if t['album']['id'] == item_id]
+            return {**item, 'tracks': {'items': tracks, 'offset': 0, 'limit': 50, 'total': len(tracks)}}
+        return item
+
+    @staticmethod
+    def _snapshot(playlist: Dict) -> str:
+        return f"{playlist['id']}v{playlist['version']}"
+
+    def _playlist_summary(self, playlist: Dict) -> Dict:
+        return {'id': playlist['id'], 'name': playlist['name'], 'description': playlist['description'],
+                'owner': playlist['owner'], 'snapshot_id': self._snapshot(playlist),
+                'tracks': {'total': len(playlist['items'])}}
+
+    def _items_page(self, playlist: Dict, query: Dict[str, str]) -> Dict:
+        page = self._page(playlist['items'], query, 'playlist_items')
+        page['items'] = [{'added_at': '2024-01-01T00:00:00Z', 'track': self.library.tracks[t]} for t in page['items']]
+        return page
+
+    def _limit(self, query: Dict[str, str], endpoint: str, default: int = 20) -> int:
+        limit = int(query.get('limit', default))
+        if not 0 < limit <= self.page_sizes[endpoint]:
+            raise _ApiError(400, f"Invalid limit {limit}, must be between 1 and {self.page_sizes[endpoint]}")
+        return limit
+
+    def _page(self, items: List, query: Dict[str, str], endpoint: str) -> Dict:
+        limit = self._limit(query, endpoint)
+        offset = int(query.get('offset', 0))
+        return {'items': items[offset:offset + limit], 'offset': offset, 'limit': limit, 'total': len(items),
+                'next': None if offset + limit >= len(items) else f"offset={offset + limit}"}
+
+
+class _ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+_ID_RE = re.compile(r"^(?:[a-z]{2}\d+|bench|dev\d+)$")
+
+
+def _route_name(method: str, path: str) -> str:
+    """Endpoint name for counting, with IDs replaced by {id}."""
+    parts = ['{id}' if _ID_RE.match(p) else p for p in path.strip('/').split('/')[1:]]
+    return f"{method} /{'/'.join(parts)}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; with Nagle on, delayed ACKs add ~40ms to every response
+    disable_nagle_algorithm = True
+    spotify: MockSpotify
+
+    def _serve(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        body = json.loads(raw) if raw else None
+        if url.path == '/_mock/reset':
+            self.spotify.reset_counters()
+            status, headers, payload = 200, {}, None
+        elif url.path == '/_mock/stats':
+            status, headers, payload = 200, {}, self.spotify.stats()
+        else:
+            status, headers, payload = self.spotify.handle(self.command, url.path, query, body)
+        data = json.dumps(payload).encode() if payload is not None else b''
+        if self.command == 'GET' and status == 200 and data and not url.path.startswith('/_mock/'):
+            etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+            headers = {**headers, 'ETag': etag}
+            if self.headers.get('If-None-Match') == etag:
+                status, data = 304, b''
+        with self.spotify._lock:
+            self.spotify.bytes_sent += len(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Options shaping the mock's latency, throttling and library size."""
+    group = parser.add_argument_group("mock Spotify API")
+    group.add_argument("--latency-ms", type=float, default=20, help="delay added to every response")
+    group.add_argument("--jitter-ms", type=float, default=5, help="random +/- variation of the delay")
+    group.add_argument("--throttle-rate", type=float, default=0, help="fraction of requests answered with 429")
+    group.add_argument("--retry-after", type=float, default=0.05, help="Retry-After seconds sent with a 429")
+    group.add_argument("--max-page-size", type=int, default=None,
+                       help="largest page any paged endpoint accepts (default: Spotify's documented limits)")
+    group.add_argument("--playlists", type=int, default=20, help="playlists in the user's library")
+    group.add_argument("--tracks-per-playlist", type=int, default=500, help="tracks in each playlist")
+    group.add_argument("--saved-tracks", type=int, default=1000, help="tracks in the user's saved tracks")
+    group.add_argument("--artists", type=int, default=200, help="artists in the catalog (5 albums of 10 tracks each)")
+    group.add_argument("--seed", type=int, default=0, help="seed for the library, jitter and throttling")
+
+
+def from_arguments(args: argparse.Namespace) -> MockSpotify:
+    """Build a MockSpotify from the options added by add_arguments."""
+    library = Library(playlists=args.playlists, tracks_per_playlist=args.tracks_per_playlist,
+                      saved_tracks=args.saved_tracks, artists=args.artists, seed=args.seed)
+    page_sizes = {endpoint: args.max_page_size for endpoint in PAGE_SIZES} if args.max_page_size else None
+    return MockSpotify(library, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                       throttle_rate=args.throttle_rate, retry_after=args.retry_after, page_sizes=page_sizes,
+                       seed=args.seed)
+
+
+def serve(args: argparse.Namespace, ready):
+    """Serve until the process is terminated, sending the base URL through the ready pipe or queue."""
+    mock = from_arguments(args)
+    ready.put(mock.start())
+    threading.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    mock = from_arguments(parser.parse_args())
+    print(mock.start(), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
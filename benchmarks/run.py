@@ -0,0 +1,310 @@
+"""
+Offline benchmarks of the MCP tools against a local stand-in for the Spotify Web API.
+
+The real FastMCP tool handlers are called over an in-memory MCP session,
+and the Spotify client talks HTTP to benchmarks.mock_spotify running in a
+separate process. For every scenario the harness reports p50/p99 latency
+of sequential calls, throughput under concurrent calls and the number of
+upstream requests per call.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency-ms 50 --throttle-rate 0.05 --native-async
+    python -m benchmarks.run --json baseline.json
+    python -m benchmarks.run --baseline baseline.json --max-regression 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import mock_spotify
+
+# Prefixes of the text the tools return when a call failed, as in src.helpers.error_handler (imported only after
+# the environment is prepared, so not imported here)
+ERROR_PREFIXES = ("Error:", "Spotify API error:", "Validation error:", "Unexpected error:")
+
+
+@dataclass
+class Scenario:
+    """A tool and the arguments of its i-th call."""
+    name: str
+    tool: str
+    arguments: Callable[[int], Dict]
+
+
+def build_scenarios(args: argparse.Namespace) -> List[Scenario]:
+    """Scenarios over the library the mock generates from the same options."""
+    playlists = [f"pl{i:06d}" for i in range(args.playlists)]
+    # Writes go to the last playlist so they don't change what the read scenarios load
+    read_playlists, scratch = playlists[:-1] or playlists, playlists[-1]
+
+    def track(i):
+        return f"tr{i % args.artists:06d}{i // args.artists % 5:02d}{i % 10:02d}"
+
+    def artist(i):
+        return f"ar{i % args.artists:06d}"
+
+    words = mock_spotify._WORDS
+    return [
+        Scenario('get_user_playlists', 'get_user_playlists', lambda i: {}),
+        Scenario('get_playlist_tracks', 'get_playlist_tracks',
+                 lambda i: {'playlist_id': read_playlists[i % len(read_playlists)]}),
+        Scenario('get_playlist_tracks[page]', 'get_playlist_tracks',
+                 lambda i: {'playlist_id': read_playlists[i % len(read_playlists)], 'limit': 50}),
+        Scenario('search_spotify', 'search_spotify', lambda i: {'query': words[i % len(words)], 'qtype': 'track'}),
+        Scenario('search_spotify[library]', 'search_spotify',
+                 lambda i: {'query': words[i % len(words)], 'scope': 'library'}),
+        Scenario('get_item_info[track]', 'get_item_info', lambda i: {'item_uri': f"spotify:track:{track(i)}"}),
+        Scenario('get_item_info[artist]', 'get_item_info', lambda i: {'item_uri': f"spotify:artist:{artist(i)}"}),
+        Scenario('get_items_info', 'get_items_info',
+                 lambda i: {'item_uris': [f"spotify:track:{track(i * 20 + j)}" for j in range(20)]}),
+        Scenario('get_devices', 'get_devices', lambda i: {}),
+        Scenario('get_current_track', 'get_current_track', lambda i: {}),
+        Scenario('get_queue', 'get_queue', lambda i: {}),
+        Scenario('start_playback', 'start_playback', lambda i: {'spotify_uri': f"spotify:track:{track(i)}"}),
+        Scenario('pause_playback', 'pause_playback', lambda i: {}),
+        Scenario('add_to_queue', 'add_to_queue', lambda i: {'track_id': track(i)}),
+        Scenario('skip_tracks', 'skip_tracks', lambda i: {'num_skips': 1}),
+        Scenario('set_volume', 'set_volume', lambda i: {'volume_percent': 30 + i % 50}),
+        Scenario('seek_to_position', 'seek_to_position', lambda i: {'position_ms': 1000 * (i % 60)}),
+        Scenario('add_tracks_to_playlist', 'add_tracks_to_playlist',
+                 lambda i: {'playlist_id': scratch, 'track_ids': [track(i * 150 + j) for j in range(150)]}),
+        Scenario('remove_tracks_from_playlist', 'remove_tracks_from_playlist',
+                 lambda i: {'playlist_id': scratch, 'track_ids': [track(i * 150 + j) for j in range(150)]}),
+    ]
+
+
+# ---- Mock server ----
+
+def start_mock(args: argparse.Namespace) -> tuple:
+    """Start the mock API in its own process so it doesn't compete with the client for the GIL."""
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(target=mock_spotify.serve, args=(args, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=60)
+
+
+def mock_control(api_url: str, action: str) -> Optional[Dict]:
+    """Call the mock's /_mock/stats or /_mock/reset endpoint."""
+    base = api_url.split('/v1/')[0]
+    method = 'POST' if action == 'reset' else 'GET'
+    with urllib.request.urlopen(urllib.request.Request(f"{base}/_mock/{action}", method=method)) as response:
+        body = response.read()
+    return json.loads(body) if body else None
+
+
+def prepare_environment(args: argparse.Namespace, api_url: str) -> str:
+    """Point the server at the mock, with a cached token so no sign-in is attempted."""
+    home = tempfile.mkdtemp(prefix="spotify-mcp-bench-")
+    os.environ.update({
+        'HOME': home,
+        'USERPROFILE': home,
+        'SPOTIFY_CLIENT_ID': 'bench',
+        'SPOTIFY_CLIENT_SECRET': 'bench',
+        'SPOTIFY_REDIRECT_URI': 'http://127.0.0.1:8888/callback',
+        'SPOTIFY_MCP_API_URL': api_url,
+        'SPOTIFY_MCP_NATIVE_ASYNC': '1' if args.native_async else '0',
+        'SPOTIFY_MCP_LAZY_STARTUP': 'false',
+        # Building the library index in the background would add its requests to whichever scenario runs first
+        'SPOTIFY_MCP_LIBRARY_INDEX_WARMUP': 'false',
+        'SPOTIFY_MCP_RATE_LIMIT': str(args.client_rate_limit),
+        'SPOTIFY_MCP_RATE_LIMIT_BURST': str(args.client_rate_limit),
+    })
+
+    # Imported only now because the cache path is resolved from HOME at import
+    from src.api.spotify_api import CACHE_PATH, SCOPES
+    token = {'access_token': 'bench', 'token_type': 'Bearer', 'expires_in': 3600, 'refresh_token': 'bench',
+             'scope': " ".join(SCOPES), 'expires_at': int(time.time()) + 10 * 365 * 86400}
+    with open(CACHE_PATH, "w") as f:
+        json.dump(token, f)
+    return home
+
+
+# ---- Measurement ----
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def is_error(result) -> bool:
+    """Whether a tool call failed, either as an MCP error or as error text from handle_spotify_errors."""
+    if result.isError:
+        return True
+    text = result.content[0].text if result.content and hasattr(result.content[0], 'text') else ''
+    return text.startswith(ERROR_PREFIXES)
+
+
+async def run_scenario(session, scenario: Scenario, args: argparse.Namespace, api_url: str) -> Dict:
+    """Measure one scenario: sequential latency and upstream requests, then concurrent throughput."""
+    errors = 0
+
+    async def call(i: int) -> float:
+        nonlocal errors
+        started = time.perf_counter()
+        result = await session.call_tool(scenario.tool, scenario.arguments(i))
+        elapsed = time.perf_counter() - started
+        if is_error(result):
+            errors += 1
+            if errors == 1:
+                logging.warning(f"{scenario.name} failed: {result.content[0].text if result.content else result}")
+        return elapsed
+
+    if not args.cold:
+        # One unmeasured call so caches and connections reflect steady state
+        await call(0)
+
+    mock_control(api_url, 'reset')
+    latencies = [await call(i) for i in range(1, args.iterations + 1)]
+    upstream = mock_control(api_url, 'stats')
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(i):
+        async with semaphore:
+            return await call(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(args.iterations + 1, 2 * args.iterations + 1)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'throughput_per_s': round(args.iterations / elapsed, 1),
+        'upstream_per_call': round(upstream['requests'] / args.iterations, 2),
+        'throttled_per_call': round(upstream['throttled'] / args.iterations, 2),
+        'upstream_kb_per_call': round(upstream['bytes_sent'] / args.iterations / 1024, 1),
+        'errors': errors,
+    }
+
+
+async def run_all(server, scenarios: List[Scenario], args: argparse.Namespace, api_url: str) -> Dict[str, Dict]:
+    """Run the scenarios one after another over a single in-memory MCP session."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    results = {}
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+        for scenario in scenarios:
+            results[scenario.name] = await run_scenario(session, scenario, args, api_url)
+            print(format_row(scenario.name, results[scenario.name]), flush=True)
+    return results
+
+
+# ---- Reporting ----
+
+COLUMNS = (
+    ('p50_ms', 'p50 ms'), ('p99_ms', 'p99 ms'), ('throughput_per_s', 'calls/s'),
+    ('upstream_per_call', 'req/call'), ('throttled_per_call', '429/call'), ('upstream_kb_per_call', 'KB/call'),
+    ('errors', 'errors'),
+)
+
+
+def format_header() -> str:
+    return f"{'scenario':<30}" + "".join(f"{title:>10}" for _, title in COLUMNS)
+
+
+def format_row(name: str, result: Dict) -> str:
+    return f"{name:<30}" + "".join(f"{result[key]:>10}" for key, _ in COLUMNS)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Regressions against a baseline run.
+
+    A scenario regresses when its p50 latency grew by more than
+    max_regression percent, when it needs more upstream requests per call,
+    or when it started failing.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base['p50_ms'] and (result['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100 > max_regression:
+            regressions.append(f"{name}: p50 {base['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result['upstream_per_call'] > base['upstream_per_call'] + 0.01:
+            regressions.append(f"{name}: upstream requests per call "
+                               f"{base['upstream_per_call']} -> {result['upstream_per_call']}")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    mock_spotify.add_arguments(parser)
+    group = parser.add_argument_group("benchmark")
+    group.add_argument("--iterations", type=int, default=30, help="calls per scenario and phase")
+    group.add_argument("--concurrency", type=int, default=8, help="calls in flight during the throughput phase")
+    group.add_argument("--scenarios", default=None, help="comma-separated scenario names (default: all)")
+    group.add_argument("--native-async", action="store_true", help="benchmark the native asyncio client")
+    group.add_argument("--cold", action="store_true", help="don't make an unmeasured warm-up call first")
+    group.add_argument("--client-rate-limit", type=int, default=1000,
+                       help="client-side request rate limit per second (SPOTIFY_MCP_RATE_LIMIT)")
+    group.add_argument("--json", dest="json_path", help="write the results to this file")
+    group.add_argument("--baseline", help="results file of an earlier run to compare against")
+    group.add_argument("--max-regression", type=float, default=20,
+                       help="allowed p50 latency increase over the baseline, in percent")
+    group.add_argument("--verbose", action="store_true", help="show the server's log output")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(','))
+        unknown = wanted - {s.name for s in scenarios}
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    process, api_url = start_mock(args)
+    try:
+        prepare_environment(args, api_url)
+        # The server reads its configuration at import, so it is imported only now
+        from src import server
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+        if server.spotify_client is None:
+            sys.exit("Could not start the server against the mock API")
+
+        print(f"Mock API at {api_url}, {'native asyncio' if args.native_async else 'threaded'} client, "
+              f"{args.latency_ms}ms latency, {args.iterations} calls, concurrency {args.concurrency}")
+        print(format_header())
+        try:
+            results = asyncio.run(run_all(server, scenarios, args, api_url))
+        finally:
+            server.spotify_client.close()
+            server.executor.shutdown(wait=False)
+    finally:
+        process.terminate()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({'options': vars(args), 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.max_regression)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Awaitable facade over the blocking Spotify client."""
+
+import asyncio
+import functools
+import inspect
+from typing import Any, Dict, Iterator, Optional, Set
+
+from src.helpers.executor import SpotifyExecutor
+
+# Returned by next() once a generator is exhausted
+_DONE = object()
+
+
+class AsyncBridge:
+    """
+    Exposes the public methods of a blocking client as coroutines.
+
+    Each call is handed to a SpotifyExecutor so a slow Spotify request only
+    occupies a worker thread, never the event loop. Generator methods become
+    async generators that advance the generator one step per worker call.
+    """
+
+    def __init__(self, client, executor: SpotifyExecutor):
+        self.client = client
+        self.executor = executor
+        self._closing: Set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+        if name.startswith('_') or not callable(attr) or inspect.iscoroutinefunction(attr):
+            return attr
+
+        if inspect.isgeneratorfunction(inspect.unwrap(attr)):
+            @functools.wraps(attr)
+            async def stream(*args, **kwargs):
+                # Decorators such as ensure_username run when the generator is created, so do that in a worker too
+                steps = await self.executor.run(attr, *args, **kwargs)
+                pending = None
+                try:
+                    while True:
+                        pending = asyncio.ensure_future(self.executor.run(next, steps, _DONE))
+                        step = await asyncio.shield(pending)
+                        if step is _DONE:
+                            steps = None
+                            return
+                        yield step
+                finally:
+                    if steps is not None:
+                        self._close_later(steps, pending)
+
+            return stream
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.executor.run(attr, *args, **kwargs)
+
+        return call
+
+    async def stats(self) -> Dict:
+        """The client's stats plus the worker pool's; cheap enough to read on the event loop."""
+        return {**self.client.stats(), 'executor': self.executor.stats()}
+
+    def _close_later(self, steps: Iterator, pending: Optional[asyncio.Future]):
+        """
+        Close an abandoned generator so it stops its remaining work.
+
+        The caller may be in the middle of being cancelled, so closing runs as
+        its own task, after any step still running in a worker has finished.
+        """
+        async def close():
+            if pending is not None:
+                await asyncio.wait([pending])
+            await self.executor.run(steps.close)
+
+        task = asyncio.ensure_future(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
@@ -0,0 +1,886 @@
+"""Native asyncio Spotify API client."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Optional, AsyncIterator, Dict, List
+
+import httpx
+from spotipy import SpotifyException
+
+from src.api.spotify_api import (
+    create_auth_manager, authenticate, PLAYLIST_ITEMS_PAGE_SIZE, USER_PLAYLISTS_PAGE_SIZE,
+    PLAYLIST_MUTATION_CHUNK_SIZE, ARTIST_ALBUM_GROUPS, ARTIST_ALBUMS_PAGE_SIZE, SAVED_TRACKS_PAGE_SIZE
+)
+from src.config import config
+from src.helpers import (
+    parsers, device_helpers, auth_helpers, batch, bulk, metrics, pagination, playback_state, progress,
+    projection, revalidation
+)
+from src.helpers.cache import MetadataCache
+from src.helpers.device_registry import DeviceRegistry
+from src.helpers.disk_store import open_store
+from src.helpers.library_index import LibraryIndex, SAVED_TRACKS_SOURCE, playlist_source, track_object
+from src.helpers.models import Playlist
+from src.helpers.playlist_store import PlaylistStore, SNAPSHOT_FIELDS
+from src.helpers.progress import Progress
+from src.helpers.revalidation import RevalidationCache, RevalidatingSpotify
+from src.helpers.scheduler import RequestScheduler, ScheduledSpotify
+from src.helpers.single_flight import SingleFlight, CoalescedSpotify
+from src.helpers.token_manager import TokenManager
+from src.helpers.uri_helpers import get_id, get_uri
+
+API_PREFIX = config.API_URL
+
+
+def http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncSpotify:
+    """
+    Minimal asyncio counterpart of spotipy.Spotify.
+
+    Method names and arguments mirror the Spotipy calls used by Client so the
+    two implementations stay easy to compare. Requests share one pooled
+    httpx.AsyncClient, keeping TLS connections alive between calls.
+    """
+
+    def __init__(self, token_manager: TokenManager, logger: logging.Logger):
+        self.token_manager = token_manager
+        self.logger = logger
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client on first use."""
+        if self._http is None:
+            http2 = config.HTTP2 and http2_available()
+            if config.HTTP2 and not http2:
+                self.logger.warning("SPOTIFY_MCP_HTTP2 is set but h2 is not installed, using HTTP/1.1")
+            self._http = httpx.AsyncClient(
+                base_url=API_PREFIX,
+                http2=http2,
+                timeout=config.HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._http
+
+    async def _access_token(self) -> str:
+        """Get a valid access token, refreshing it off the event loop if needed."""
+        if self.token_manager.expires_soon():
+            return (await asyncio.to_thread(self.token_manager.get_token))['access_token']
+        return self.token_manager.get_token()['access_token']
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None, payload=None):
+        """Send a request and decode the JSON body, raising SpotifyException on HTTP errors."""
+        headers = {"Authorization": f"Bearer {await self._access_token()}"}
+        exchange = revalidation.current_exchange.get()
+        if exchange is not None and exchange.etag_sent is not None:
+            headers["If-None-Match"] = exchange.etag_sent
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        response = await self._get_http().request(method, path, params=params, json=payload, headers=headers)
+        metrics.registry.record_response(len(response.content))
+        if exchange is not None:
+            exchange.received(response.status_code, response.headers.get("ETag"), len(response.content))
+
+        if response.is_error:
+            try:
+                error = response.json().get("error", {})
+                msg, reason = error.get("message"), error.get("reason")
+            except ValueError:
+                msg, reason = response.text or None, None
+            self.logger.error(f"HTTP Error for {method} to {path} returned {response.status_code} due to {msg}")
+            raise SpotifyException(
+                response.status_code,
+                -1,
+                f"{response.url}:\n {msg}",
+                reason=reason,
+                headers=response.headers,
+            )
+
+        if not response.content:
+            return None
+        started = time.perf_counter()
+        try:
+            return response.json()
+        except ValueError:
+            return None
+        finally:
+            if exchange is not None:
+                exchange.decode_seconds = time.perf_counter() - started
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # ---- Endpoints ----
+
+    async def current_user(self):
+        return await self._request("GET", "me")
+
+    async def search(self, q, limit=10, offset=0, type="track", market=None):
+        return await self._request("GET", "search", {"q": q, "limit": limit, "offset": offset, "type": type, "market": market})
+
+    async def track(self, track_id, market=None):
+        return await self._request("GET", f"tracks/{get_id('track', track_id)}", {"market": market})
+
+    async def album(self, album_id, market=None):
+        return await self._request("GET", f"albums/{get_id('album', album_id)}", {"market": market})
+
+    async def artist(self, artist_id):
+        return await self._request("GET", f"artists/{get_id('artist', artist_id)}")
+
+    async def tracks(self, tracks, market=None):
+        ids = ",".join(get_id('track', t) for t in tracks)
+        return await self._request("GET", "tracks", {"ids": ids, "market": market})
+
+    async def albums(self, albums, market=None):
+        ids = ",".join(get_id('album', a) for a in albums)
+        return await self._request("GET", "albums", {"ids": ids, "market": market})
+
+    async def artists(self, artists):
+        return await self._request("GET", "artists", {"ids": ",".join(get_id('artist', a) for a in artists)})
+
+    async def artist_albums(self, artist_id, album_type=None, include_groups=None, country=None, limit=20, offset=0):
+        return await self._request("GET", f"artists/{get_id('artist', artist_id)}/albums", {
+            "include_groups": include_groups or album_type, "country": country, "limit": limit, "offset": offset,
+        })
+
+    async def artist_top_tracks(self, artist_id, country="US"):
+        return await self._request("GET", f"artists/{get_id('artist', artist_id)}/top-tracks", {"country": country})
+
+    async def playlist(self, playlist_id, fields=None, market=None, additional_types=("track",)):
+        return await self._request("GET", f"playlists/{get_id('playlist', playlist_id)}", {
+            "fields": fields, "market": market, "additional_types": ",".join(additional_types),
+        })
+
+    async def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, market=None,
+                             additional_types=("track",)):
+        return await self._request("GET", f"playlists/{get_id('playlist', playlist_id)}/tracks", {
+            "fields": fields, "limit": limit, "offset": offset, "market": market,
+            "additional_types": ",".join(additional_types),
+        })
+
+    async def current_user_playlists(self, limit=50, offset=0):
+        return await self._request("GET", "me/playlists", {"limit": limit, "offset": offset})
+
+    async def current_user_saved_tracks(self, limit=20, offset=0, market=None):
+        return await self._request("GET", "me/tracks", {"limit": limit, "offset": offset, "market": market})
+
+    async def playlist_add_items(self, playlist_id, items, position=None):
+        payload = {"uris": [get_uri('track', item) for item in items]}
+        if position is not None:
+            payload["position"] = position
+        return await self._request("POST", f"playlists/{get_id('playlist', playlist_id)}/tracks", payload=payload)
+
+    async def playlist_remove_all_occurrences_of_items(self, playlist_id, items, snapshot_id=None):
+        payload = {"tracks": [{"uri": get_uri('track', item)} for item in items]}
+        if snapshot_id:
+            payload["snapshot_id"] = snapshot_id
+        return await self._request("DELETE", f"playlists/{get_id('playlist', playlist_id)}/tracks", payload=payload)
+
+    async def user_playlist_create(self, user, name, public=True, collaborative=False, description=""):
+        return await self._request("POST", f"users/{user}/playlists", payload={
+            "name": name, "public": public, "collaborative": collaborative, "description": description,
+        })
+
+    async def playlist_change_details(self, playlist_id, name=None, public=None, collaborative=None, description=None):
+        payload = {"name": name, "public": public, "collaborative": collaborative, "description": description}
+        return await self._request("PUT", f"playlists/{get_id('playlist', playlist_id)}",
+                                   payload={k: v for k, v in payload.items() if v is not None})
+
+    async def current_user_playing_track(self):
+        return await self._request("GET", "me/player/currently-playing")
+
+    async def current_playback(self, market=None, additional_types=None):
+        return await self._request("GET", "me/player", {"market": market, "additional_types": additional_types})
+
+    async def devices(self):
+        return await self._request("GET", "me/player/devices")
+
+    async def queue(self):
+        return await self._request("GET", "me/player/queue")
+
+    async def start_playback(self, device_id=None, context_uri=None, uris=None, offset=None, position_ms=None):
+        payload = {"context_uri": context_uri, "uris": uris, "offset": offset, "position_ms": position_ms}
+        return await self._request("PUT", "me/player/play", {"device_id": device_id},
+                                   payload={k: v for k, v in payload.items() if v is not None})
+
+    async def pause_playback(self, device_id=None):
+        return await self._request("PUT", "me/player/pause", {"device_id": device_id})
+
+    async def add_to_queue(self, uri, device_id=None):
+        return await self._request("POST", "me/player/queue", {"uri": get_uri('track', uri), "device_id": device_id})
+
+    async def next_track(self, device_id=None):
+        return await self._request("POST", "me/player/next", {"device_id": device_id})
+
+    async def previous_track(self, device_id=None):
+        return await self._request("POST", "me/player/previous", {"device_id": device_id})
+
+    async def seek_track(self, position_ms, device_id=None):
+        return await self._request("PUT", "me/player/seek", {"position_ms": position_ms, "device_id": device_id})
+
+    async def volume(self, volume_percent, device_id=None):
+        return await self._request("PUT", "me/player/volume", {"volume_percent": volume_percent, "device_id": device_id})
+
+
+class AsyncClient:
+    """Asyncio variant of Client with the same method surface and parsed output."""
+
+    def __init__(self, logger: logging.Logger):
+        """Initialize Spotify client with necessary permissions."""
+        self.logger = logger
+
+        try:
+            self.auth_manager = create_auth_manager()
+            self.cache_handler = self.auth_manager.cache_handler
+            authenticate(self.auth_manager, self.logger)
+            self.token_manager = TokenManager(self.auth_manager)
+            self.token_manager.start()
+        except Exception as e:
+            self.logger.error(f"Failed to initialize Spotify client: {e}")
+            raise
+
+        self.transport = AsyncSpotify(self.token_manager, logger)
+        self.scheduler = RequestScheduler()
+        self.single_flight = SingleFlight()
+        self.revalidation = RevalidationCache()
+        scheduled = ScheduledSpotify(self.transport, self.scheduler)
+        if config.REVALIDATION:
+            scheduled = RevalidatingSpotify(scheduled, self.revalidation)
+        self.sp = CoalescedSpotify(scheduled, self.single_flight)
+        self.username = None
+        self.disk_store = open_store()
+        self.cache = MetadataCache(store=self.disk_store)
+        self.playlist_store = PlaylistStore()
+        self.device_registry = DeviceRegistry()
+        self.library_index = LibraryIndex()
+        self._library_refresh: Optional[asyncio.Task] = None
+
+    async def aclose(self):
+        """Stop a background library refresh and close pooled connections."""
+        if self._library_refresh is not None:
+            self._library_refresh.cancel()
+        await self.transport.aclose()
+
+    # ---- Authentication methods ----
+
+    def auth_ok(self) -> bool:
+        """Check if authentication token is valid."""
+        return auth_helpers.check_token(self.auth_manager, self.cache_handler)
+
+    def auth_refresh(self):
+        """Refresh authentication token."""
+        auth_helpers.refresh_token(self.auth_manager, self.cache_handler)
+
+    async def set_username(self, device=None):
+        """Set the current user's username."""
+        self.username = (await self.sp.current_user())['display_name']
+
+    # ---- Search methods ----
+
+    async def search(self, query: str, qtype: str = 'track', limit=10, scope: str = 'catalog', device=None):
+        """
+        Search for items on Spotify.
+
+        Args:
+            query: Search query term
+            qtype: Item types to return ('track', 'album', 'artist', 'playlist' or comma-separated)
+            limit: Maximum number of items to return
+            scope: 'catalog' searches all of Spotify, 'library' searches the tracks in the
+                   user's playlists and saved tracks using the local index
+        """
+        if scope == 'library':
+            if self.library_index.refreshed_at is None:
+                # Nothing to answer from yet, so wait for the first build (joining the warm-up's, if running)
+                await self.refresh_library_index()
+            else:
+                await self.start_library_refresh()
+            return {'tracks': self.library_index.search(query, limit)}
+        if scope != 'catalog':
+            raise ValueError(f"Unknown search scope: {scope}")
+
+        # The username is only needed to mark the user's own playlists
+        if self.username is None and 'playlist' in qtype:
+            await self.set_username()
+
+        results = await self.sp.search(q=query, limit=limit, type=qtype)
+        if not results:
+            raise ValueError("No search results found.")
+
+        return parsers.parse_search_results(results, qtype, self.username)
+
+    async def refresh_library_index(self):
+        """Bring the library index up to date (see Client.refresh_library_index)."""
+        async def refresh():
+            dirty = self.library_index.take_dirty()
+            stale = self.library_index.is_stale()
+            if stale:
+                playlist_ids = [p['id'] for p in await self.get_current_user_playlists()]
+                self.library_index.retain({playlist_source(i) for i in playlist_ids} | {SAVED_TRACKS_SOURCE})
+                jobs = [self._load_playlist(i) for i in playlist_ids] + [self._index_saved_tracks()]
+            else:
+                jobs = [self._load_playlist(source.split(':', 1)[1]) for source in dirty]
+                if not jobs:
+                    return
+            semaphore = asyncio.Semaphore(max(1, config.PAGE_CONCURRENCY))
+
+            async def run(job):
+                async with semaphore:
+                    try:
+                        await job
+                    except Exception as e:
+                        # One unavailable playlist shouldn't make the rest of the library unsearchable
+                        self.logger.warning(f"Could not index part of the library: {e}")
+
+            await asyncio.gather(*(run(job) for job in jobs))
+            if stale:
+                self.library_index.mark_refreshed()
+
+        await self.single_flight.do_async('library_index', refresh)
+
+    async def start_library_refresh(self):
+        """Refresh the library index in a background task if it is stale or has dirty sources."""
+        if not self.library_index.needs_refresh():
+            return
+        if self._library_refresh is not None and not self._library_refresh.done():
+            return
+
+        async def run():
+            try:
+                await self.refresh_library_index()
+            except Exception as e:
+                self.logger.warning(f"Background library index refresh failed: {e}")
+
+        self._library_refresh = asyncio.ensure_future(run())
+
+    async def _index_saved_tracks(self):
+        """Index the user's saved tracks unless the newest save and the total are unchanged."""
+        first_page = await self.sp.current_user_saved_tracks(limit=SAVED_TRACKS_PAGE_SIZE)
+        items = first_page['items']
+        # Saved tracks are listed newest first, so a save or removal changes one of these
+        signature = (first_page['total'], items[0]['added_at'] if items else None)
+        if signature == self.library_index.signature(SAVED_TRACKS_SOURCE):
+            return
+        items = await pagination.fetch_all_items_async(
+            first_page,
+            lambda offset: self.sp.current_user_saved_tracks(limit=SAVED_TRACKS_PAGE_SIZE, offset=offset),
+            SAVED_TRACKS_PAGE_SIZE,
+        )
+        self.library_index.index_source(SAVED_TRACKS_SOURCE, signature, [item['track'] for item in items])
+
+    async def get_info(self, item_uri: str, full_discography: bool = False, album_tracks: bool = False,
+                       fields: Optional[List[str]] = None) -> dict:
+        """
+        Get detailed information about a Spotify item.
+
+        Args:
+            item_uri: URI like 'spotify:track:xxxxx' or 'spotify:album:xxxxx'
+            full_discography: For artists, list every release instead of the first page of albums
+            album_tracks: For artists, include each listed album's tracks
+            fields: Extra attributes to include, as dotted paths like 'album.release_date'
+                    (for playlists, attributes of each track)
+        """
+        _, qtype, item_id = item_uri.split(":")
+        item_uri = f"spotify:{qtype}:{item_id}"
+        fields = projection.validate_fields(fields)
+        options = []
+        if qtype == 'artist':
+            options = [name for name, on in (('discography', full_discography), ('album_tracks', album_tracks)) if on]
+        if fields:
+            options.append(f"fields={','.join(fields)}")
+        item_uri = ":".join([item_uri, *options])
+
+        cached = await self.cache.get_async(item_uri)
+        if cached is not None:
+            return cached
+
+        async def fetch():
+            info = await self._fetch_info(qtype, item_id, full_discography, album_tracks, fields)
+            self.cache.set(item_uri, info)
+            return info
+
+        # Concurrent requests for the same item share one fetch and its parsed result
+        return await self.single_flight.do_async(item_uri, fetch)
+
+    async def get_items_info(self, item_uris: List[str]) -> List[Dict]:
+        """
+        Get information about several Spotify items at once.
+
+        Args:
+            item_uris: Mixed list of track, album, artist and playlist URIs
+
+        Returns:
+            Parsed items in input order; items that could not be resolved are {'uri', 'error'}
+        """
+        if self.disk_store is None:
+            plan = batch.BatchPlan(item_uris, self.cache)
+        else:
+            # Planning looks cache misses up on disk, which must not block the event loop
+            plan = await asyncio.to_thread(batch.BatchPlan, item_uris, self.cache)
+        semaphore = asyncio.Semaphore(max(1, config.PAGE_CONCURRENCY))
+
+        async def fetch_several(qtype, ids):
+            endpoint = batch.SEVERAL_ITEMS_ENDPOINTS[qtype][0]
+            async with semaphore:
+                try:
+                    plan.add_response(qtype, ids, await getattr(self.sp, endpoint)(ids))
+                except Exception as e:
+                    plan.add_error(qtype, ids, e)
+
+        async def fetch_single(uri):
+            async with semaphore:
+                try:
+                    plan.results[uri] = await self.get_info(uri)
+                except Exception as e:
+                    plan.results[uri] = batch.item_error(uri, e)
+
+        await asyncio.gather(
+            *(fetch_several(qtype, ids) for qtype, ids in plan.requests),
+            *(fetch_single(uri) for uri in plan.singles),
+        )
+        return plan.collect()
+
+    async def _fetch_info(self, qtype: str, item_id: str, full_discography: bool = False,
+                          album_tracks: bool = False, fields: tuple = ()) -> dict:
+        """Fetch and parse an item, bypassing the cache."""
+        if qtype == 'track':
+            track = await self.sp.track(item_id)
+            return projection.with_fields(parsers.parse_track(track, detailed=True), track, fields)
+        elif qtype == 'album':
+            album = await self.sp.album(item_id)
+            return projection.with_fields(parsers.parse_album(album, detailed=True), album, fields)
+        elif qtype == 'artist':
+            return await self._fetch_artist(item_id, full_discography, album_tracks, fields)
+        elif qtype == 'playlist':
+            if self.username is None:
+                await self.set_username()
+            return await self._load_playlist(item_id, fields)
+        else:
+            raise ValueError(f"Unknown qtype: {qtype}")
+
+    async def _fetch_artist(self, artist_id: str, full_discography: bool = False,
+                            album_tracks: bool = False, fields: tuple = ()) -> dict:
+        """Fetch an artist with top tracks and albums, issuing the requests concurrently."""
+        artist, albums, top_tracks = await asyncio.gather(
+            self.sp.artist(artist_id),
+            self._artist_discography(artist_id) if full_discography else self.sp.artist_albums(artist_id),
+            self.sp.artist_top_tracks(artist_id),
+        )
+        artist_info = projection.with_fields(parsers.parse_artist(artist, detailed=True), artist, fields)
+        parsed_info = parsers.parse_search_results(
+            {'albums': albums, 'tracks': {'items': top_tracks['tracks']}},
+            qtype="album,track"
+        )
+        if album_tracks:
+            parsed_info['albums'] = await self.get_items_info(
+                [f"spotify:album:{a['id']}" for a in parsed_info['albums']]
+            )
+        artist_info.update({
+            'top_tracks': parsed_info['tracks'],
+            'albums': parsed_info['albums']
+        })
+        return artist_info
+
+    async def _artist_discography(self, artist_id: str) -> Dict:
+        """Every release of an artist, paging through all album groups in parallel."""
+        async def fetch_group(group):
+            def fetch_page(offset=0):
+                return self.sp.artist_albums(artist_id, include_groups=group, limit=ARTIST_ALBUMS_PAGE_SIZE,
+                                             offset=offset)
+            return await pagination.fetch_all_items_async(await fetch_page(), fetch_page, ARTIST_ALBUMS_PAGE_SIZE)
+
+        groups = await asyncio.gather(*(fetch_group(group) for group in ARTIST_ALBUM_GROUPS))
+        return {'items': parsers.dedupe_releases([album for group in groups for album in group])}
+
+    # ---- Playback methods ----
+
+    async def _current_playback(self) -> Optional[Dict]:
+        """Playback state, fetched at most once per client call (see playback_state)."""
+        return await playback_state.current_playback_async(self.sp.current_playback)
+
+    @playback_state.request_scoped_async
+    async def get_current_track(self) -> Optional[Dict]:
+        """Get information about the currently playing track."""
+        try:
+            current = await self._current_playback()
+            if not current or current.get('currently_playing_type') != 'track':
+                return None
+
+            track_info = parsers.parse_track(current['item'])
+            track_info['is_playing'] = current.get('is_playing', False)
+            return track_info
+        except Exception as e:
+            self.logger.error(f"Error getting current track: {e}")
+            raise
+
+    @playback_state.request_scoped_async
+    async def is_track_playing(self) -> bool:
+        """Check if a track is actively playing."""
+        curr_track = await self.get_current_track()
+        return curr_track and curr_track.get('is_playing', False)
+
+    @playback_state.request_scoped_async
+    @device_helpers.ensure_active_device_async
+    async def start_playback(self, spotify_uri=None, device=None):
+        """
+        Start playback of a Spotify URI.
+
+        Args:
+            spotify_uri: URI to play ('spotify:track:xxxxx' or 'spotify:album:xxxxx').
+                        If None, resumes current playback.
+            device: Device to play on (will be auto-selected if not provided)
+        """
+        if not spotify_uri:
+            if await self.is_track_playing():
+                return
+            if not await self.get_current_track():
+                raise ValueError("No track to resume playback.")
+
+        # Determine if URI is a track or a context (album/playlist)
+        uris = [spotify_uri] if spotify_uri and spotify_uri.startswith('spotify:track:') else None
+        context_uri = spotify_uri if spotify_uri and not uris else None
+        device_id = device_helpers.get_device_id(device)
+
+        await self.sp.start_playback(uris=uris, context_uri=context_uri, device_id=device_id)
+        self.device_registry.invalidate()
+        playback_state.invalidate()
+
+    @playback_state.request_scoped_async
+    @device_helpers.ensure_active_device_async
+    async def pause_playback(self, device=None):
+        """Pause playback."""
+        playback = await self._current_playback()
+        if playback and playback.get('is_playing'):
+            await self.sp.pause_playback(device_helpers.get_device_id(device))
+
+    @device_helpers.ensure_active_device_async
+    async def add_to_queue(self, track_id: str, device=None):
+        """Add track to queue."""
+        await self.sp.add_to_queue(track_id, device_helpers.get_device_id(device))
+
+    @playback_state.request_scoped_async
+    @device_helpers.ensure_active_device_async
+    async def get_queue(self, device=None):
+        """Get the current queue of tracks."""
+        queue_info, current = await asyncio.gather(self.sp.queue(), self.get_current_track())
+        return {
+            **queue_info,
+            'currently_playing': current,
+            'queue': [parsers.parse_track(track) for track in queue_info['queue']],
+        }
+
+    async def skip_track(self, n=1):
+        """Skip n tracks forward."""
+        for _ in range(n):
+            await self.sp.next_track()
+
+    async def previous_track(self):
+        """Go to previous track."""
+        await self.sp.previous_track()
+
+    async def seek_to_position(self, position_ms):
+        """Seek to position in current track."""
+        await self.sp.seek_track(position_ms=position_ms)
+
+    async def set_volume(self, volume_percent):
+        """Set playback volume (0-100)."""
+        await self.sp.volume(volume_percent)
+
+    # ---- Playlist methods ----
+
+    @auth_helpers.ensure_username_async
+    async def get_current_user_playlists(self, limit: Optional[int] = None, offset: int = 0,
+                                         cursor: Optional[str] = None):
+        """Get current user's playlists, optionally one page at a time."""
+        key = self._user_playlists_key()
+        playlists = await self.cache.get_async(key)
+        if playlists is None:
+            playlists = [p async for p in self.iter_current_user_playlists()]
+            self.cache.set(key, playlists)
+
+        if limit is None and not offset and not cursor:
+            return playlists
+        return pagination.page_of(playlists, offset, limit, cursor)
+
+    async def iter_current_user_playlists(self) -> AsyncIterator[Dict]:
+        """Yield every parsed playlist of the current user, fetching pages concurrently."""
+        if self.username is None:
+            await self.set_username()
+        first_page = await self.sp.current_user_playlists(limit=USER_PLAYLISTS_PAGE_SIZE)
+        if not first_page:
+            raise ValueError("No playlists found.")
+
+        pages = pagination.iter_pages_async(
+            first_page,
+            lambda offset: self.sp.current_user_playlists(limit=USER_PLAYLISTS_PAGE_SIZE, offset=offset),
+            USER_PLAYLISTS_PAGE_SIZE,
+        )
+        async for items in pages:
+            for playlist in items:
+                yield parsers.parse_playlist(playlist, self.username)
+
+    def _user_playlists_key(self) -> str:
+        """Cache key for the current user's playlist list."""
+        return f"spotify:user_playlists:{self.username}"
+
+    @auth_helpers.ensure_username_async
+    async def get_playlist_tracks(self, playlist_id: str, limit: Optional[int] = None, offset: int = 0,
+                                  cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+        """Get tracks from a playlist, optionally one page at a time."""
+        fields = projection.validate_fields(fields)
+        if limit is None and not offset and not cursor:
+            return (await self._load_playlist(playlist_id, fields))['tracks']
+        playlist_id = get_id('playlist', playlist_id)
+        stored = not fields and (self.playlist_store.snapshot(playlist_id) or (
+            self.disk_store is not None and await asyncio.to_thread(self.disk_store.playlist_snapshot, playlist_id)))
+        if not stored:
+            return await self._playlist_tracks_page(playlist_id, pagination.resolve_offset(offset, limit, cursor),
+                                                    limit, fields)
+        return pagination.page_of((await self._load_playlist(playlist_id, fields))['tracks'], offset, limit, cursor)
+
+    async def _playlist_tracks_page(self, playlist_id: str, offset: int, limit: Optional[int],
+                                    fields: tuple) -> Dict:
+        """One page of a playlist's tracks (see Client._playlist_tracks_page)."""
+        def fetch_page(page_offset, page_size=PLAYLIST_ITEMS_PAGE_SIZE):
+            return self.sp.playlist_items(playlist_id, fields=projection.playlist_items_fields(fields),
+                                          limit=page_size, offset=page_offset, additional_types=('track',))
+
+        first_page = await fetch_page(offset, min(limit or PLAYLIST_ITEMS_PAGE_SIZE, PLAYLIST_ITEMS_PAGE_SIZE))
+        items = await pagination.fetch_all_items_async(first_page, fetch_page, PLAYLIST_ITEMS_PAGE_SIZE, limit)
+        tracks = [parsers.parse_track(item['track']) for item in items]
+        if fields:
+            projection.with_track_fields(tracks, items, fields)
+        return pagination.make_page(tracks, offset, first_page['total'])
+
+    async def iter_playlist_tracks(self, playlist_id: str,
+                                   fields: Optional[List[str]] = None) -> AsyncIterator[Progress]:
+        """Load every track of a playlist, yielding a progress step per page (see Client.iter_playlist_tracks)."""
+        if self.username is None:
+            await self.set_username()
+        steps = self._iter_load_playlist(playlist_id, projection.validate_fields(fields))
+        async with contextlib.aclosing(steps):
+            async for step in steps:
+                yield step if step.result is None else step._replace(result=step.result['tracks'])
+
+    async def _load_playlist(self, playlist_id: str, fields: tuple = ()) -> Dict:
+        """Get a parsed playlist (see _iter_load_playlist)."""
+        return await progress.run_async(self._iter_load_playlist(playlist_id, fields))
+
+    async def _iter_load_playlist(self, playlist_id: str, fields: tuple = ()) -> AsyncIterator[Progress]:
+        """
+        Get a parsed playlist, downloading it only if its snapshot_id has moved.
+
+        Only the attributes the parsers read (plus any extra track fields) are
+        requested. Playlists with extra fields are not kept in the store. A
+        progress step is yielded per page of tracks; the last step's result
+        is the parsed playlist.
+        """
+        playlist_id = get_id('playlist', playlist_id)
+        source = playlist_source(playlist_id)
+        # After a restart the playlist may only be in the disk store
+        in_memory = not fields and self.playlist_store.snapshot(playlist_id)
+        on_disk = (not fields and not in_memory and self.disk_store is not None
+                   and await asyncio.to_thread(self.disk_store.playlist_snapshot, playlist_id))
+        if in_memory or on_disk:
+            current = await self.sp.playlist(playlist_id, fields=SNAPSHOT_FIELDS)
+            stored = self.playlist_store.get(playlist_id, current['snapshot_id'])
+            if stored is None:
+                stored = await self._restore_playlist(playlist_id, current['snapshot_id'])
+            if stored is not None:
+                await self._index_stored_playlist(source, current['snapshot_id'], stored)
+                total = stored.total_tracks
+                yield Progress(total, total, f"Loaded {total} tracks (unchanged)", stored.to_dict())
+                return
+
+        playlist = await self.sp.playlist(playlist_id, fields=projection.playlist_fields(fields))
+        if not playlist:
+            raise ValueError("No playlist found.")
+        total = playlist['tracks']['total']
+        items = []
+        pages = pagination.iter_pages_async(
+            playlist['tracks'],
+            lambda offset: self.sp.playlist_items(playlist_id, fields=projection.playlist_items_fields(fields),
+                                                  limit=PLAYLIST_ITEMS_PAGE_SIZE, offset=offset),
+            PLAYLIST_ITEMS_PAGE_SIZE,
+        )
+        async with contextlib.aclosing(pages):
+            async for page in pages:
+                items.extend(page)
+                yield Progress(len(items), total, f"Loaded {len(items)} of {total} tracks")
+        # Responses may be shared with concurrent callers, so build a new dict rather than filling in this one
+        playlist = {**playlist, 'tracks': {**playlist['tracks'], 'items': items}}
+        self.library_index.index_source(source, playlist['snapshot_id'], [item['track'] for item in items if item])
+        if fields:
+            parsed = parsers.parse_playlist(playlist, self.username, detailed=True)
+            projection.with_track_fields(parsed['tracks'], items, fields)
+        else:
+            parsed = self.playlist_store.put(playlist_id, playlist['snapshot_id'],
+                                             Playlist.from_api(playlist, self.username)).to_dict()
+            if self.disk_store is not None:
+                self.disk_store.put_playlist(playlist)
+        yield Progress(len(items), total, f"Loaded {len(items)} tracks", parsed)
+
+    async def _restore_playlist(self, playlist_id: str, snapshot_id: str) -> Optional[Playlist]:
+        """Load a playlist saved by an earlier run from the disk store if it is still at this snapshot."""
+        if self.disk_store is None:
+            return None
+        playlist = await asyncio.to_thread(self.disk_store.get_playlist, playlist_id, snapshot_id)
+        if playlist is None:
+            return None
+        items = playlist['tracks']['items']
+        self.library_index.index_source(playlist_source(playlist_id), snapshot_id, [item['track'] for item in items])
+        return self.playlist_store.put(playlist_id, snapshot_id, Playlist.from_api(playlist, self.username))
+
+    async def _index_stored_playlist(self, source: str, snapshot_id: str, stored: Playlist):
+        """Index a reused library playlist that is missing from the library index (see Client)."""
+        if self.library_index.signature(source) == snapshot_id or not self.library_index.in_library(source):
+            return
+        playlist_id = source.split(':', 1)[1]
+        raw = None
+        if self.disk_store is not None:
+            raw = await asyncio.to_thread(self.disk_store.get_playlist, playlist_id, snapshot_id)
+        if raw is not None:
+            tracks = [item['track'] for item in raw['tracks']['items']]
+        else:
+            tracks = [track_object(track) for track in stored.tracks if track is not None]
+        self.library_index.index_source(source, snapshot_id, tracks)
+
+    def _invalidate_playlist(self, playlist_id: str):
+        """Drop cached copies of a playlist after modifying it."""
+        self.cache.invalidate(get_uri('playlist', playlist_id))
+        self.playlist_store.invalidate(get_id('playlist', playlist_id))
+        if self.disk_store is not None:
+            self.disk_store.delete_playlist(get_id('playlist', playlist_id))
+        self.library_index.mark_dirty(playlist_source(get_id('playlist', playlist_id)))
+
+    async def add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str], position: Optional[int] = None,
+                                     resume_from: int = 0) -> Dict:
+        """Add any number of tracks to a playlist in API-sized chunks."""
+        return await progress.run_async(
+            self.iter_add_tracks_to_playlist(playlist_id, track_ids, position, resume_from)
+        )
+
+    async def iter_add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str],
+                                          position: Optional[int] = None,
+                                          resume_from: int = 0) -> AsyncIterator[Progress]:
+        """add_tracks_to_playlist, yielding a progress step per chunk."""
+        if self.username is None:
+            await self.set_username()
+        if not playlist_id or not track_ids:
+            raise ValueError("playlist_id and track_ids are required.")
+
+        async def send(chunk, offset, snapshot_id):
+            return await self.sp.playlist_add_items(
+                playlist_id, chunk, position=None if position is None else position + offset
+            )
+
+        steps = bulk.iter_chunks_async(track_ids, PLAYLIST_MUTATION_CHUNK_SIZE, send, resume_from)
+        try:
+            async with contextlib.aclosing(steps):
+                async for step in steps:
+                    if step.result is not None:
+                        self.logger.info(f"Added {step.done} of {len(track_ids)} tracks to playlist {playlist_id}")
+                    yield step
+        finally:
+            self._invalidate_playlist(playlist_id)
+
+    async def remove_tracks_from_playlist(self, playlist_id: str, track_ids: List[str],
+                                          resume_from: int = 0) -> Dict:
+        """Remove any number of tracks from a playlist in API-sized chunks."""
+        return await progress.run_async(self.iter_remove_tracks_from_playlist(playlist_id, track_ids, resume_from))
+
+    async def iter_remove_tracks_from_playlist(self, playlist_id: str, track_ids: List[str],
+                                               resume_from: int = 0) -> AsyncIterator[Progress]:
+        """remove_tracks_from_playlist, yielding a progress step per chunk."""
+        if self.username is None:
+            await self.set_username()
+        if not playlist_id or not track_ids:
+            raise ValueError("playlist_id and track_ids are required.")
+
+        async def send(chunk, offset, snapshot_id):
+            return await self.sp.playlist_remove_all_occurrences_of_items(playlist_id, chunk, snapshot_id=snapshot_id)
+
+        steps = bulk.iter_chunks_async(track_ids, PLAYLIST_MUTATION_CHUNK_SIZE, send, resume_from)
+        try:
+            async with contextlib.aclosing(steps):
+                async for step in steps:
+                    if step.result is not None:
+                        self.logger.info(f"Removed {step.done} of {len(track_ids)} tracks from playlist {playlist_id}")
+                    yield step
+        finally:
+            self._invalidate_playlist(playlist_id)
+
+    @auth_helpers.ensure_username_async
+    async def create_playlist(self, name: str, description: Optional[str] = None, public: bool = True):
+        """Create a new playlist."""
+        if not name:
+            raise ValueError("Playlist name is required.")
+
+        user = await self.sp.current_user()
+        playlist = await self.sp.user_playlist_create(
+            user=user['id'],
+            name=name,
+            public=public,
+            description=description
+        )
+        self.cache.invalidate(self._user_playlists_key())
+        self.library_index.add_to_library(playlist_source(playlist['id']))
+        self.logger.info(f"Created playlist: {name} (ID: {playlist['id']})")
+        return parsers.parse_playlist(playlist, self.username, detailed=True)
+
+    @auth_helpers.ensure_username_async
+    async def change_playlist_details(self, playlist_id: str, name: Optional[str] = None, description: Optional[str] = None):
+        """Change playlist details."""
+        if not playlist_id:
+            raise ValueError("playlist_id is required.")
+
+        await self.sp.playlist_change_details(playlist_id, name=name, description=description)
+        self._invalidate_playlist(playlist_id)
+        self.cache.invalidate(self._user_playlists_key())
+        self.logger.info(f"Updated playlist details for {playlist_id}")
+
+    # ---- Device methods ----
+
+    async def get_devices(self) -> List[Dict]:
+        """Get all available devices (reused for a few seconds, see DeviceRegistry)."""
+        async def fetch():
+            return (await self.sp.devices())['devices']
+
+        return await self.device_registry.get_async(fetch)
+
+    async def is_active_device(self) -> bool:
+        """Check if there's an active device."""
+        return device_helpers.is_device_active(await self.get_devices())
+
+    async def _get_candidate_device(self) -> Dict:
+        """Get a candidate device for playback."""
+        return device_helpers.get_candidate_device(await self.get_devices())
+
+    # ---- Diagnostics ----
+
+    async def stats(self) -> Dict:
+        """Return the counters of the caches, request scheduler and coalescing layer."""
+        return {
+            'cache': self.cache.stats(),
+            'playlist_store': self.playlist_store.stats(),
+            'library_index': self.library_index.stats(),
+            'device_registry': self.device_registry.stats(),
+            'scheduler': self.scheduler.stats(),
+            'single_flight': self.single_flight.stats(),
+            'disk_store': self.disk_store.stats() if self.disk_store is not None else {},
+            'revalidation': self.revalidation.stats(),
+        }
@@ -0,0 +1,114 @@
+"""Stand-in for the Spotify client that builds it on first use."""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.helpers import startup
+
+logger = logging.getLogger(__name__)
+
+
+class LazyClient:
+    """
+    Defers building the Spotify client until a tool needs it.
+
+    Building imports spotipy, loads the OAuth token and may run the browser
+    flow, so it runs in a worker thread rather than before the MCP handshake.
+    Concurrent callers share one build; a failed build is retried on the
+    next call. Methods named iter_* are forwarded as async generators,
+    everything else as coroutines.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+        self._warm_up: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def build(self) -> Any:
+        """Build the client now, blocking, unless it already exists."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    started = time.perf_counter()
+                    self._client = self.factory()
+                    startup.mark('client_ready')
+                    logger.info(f"Spotify client built in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return self._client
+
+    async def get(self) -> Any:
+        """Return the client, building it off the event loop if needed."""
+        if self._client is not None:
+            return self._client
+        return await asyncio.to_thread(self.build)
+
+    def warm_up(self, library_index: bool = True):
+        """
+        Build the client in the background so the first tool call doesn't wait for it.
+
+        Args:
+            library_index: Also start building the library index, so the first library search can answer from it
+        """
+        async def run():
+            try:
+                client = await self.get()
+            except Exception as e:
+                logger.warning(f"Background warm-up failed, the client will be built on first use: {e}")
+                return
+            if library_index:
+                await client.start_library_refresh()
+
+        self._warm_up = asyncio.ensure_future(run())
+
+    async def stats(self) -> Dict:
+        """The client's stats, or none if it hasn't been built; reading them never builds it."""
+        if self._client is None:
+            return {}
+        return await self._client.stats()
+
+    async def aclose(self):
+        """Close the client, awaiting the native async client's pooled connections too (see close)."""
+        if self._warm_up is not None:
+            self._warm_up.cancel()
+        if self._client is not None and not self._closed:
+            aclose = getattr(self._client, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+        self.close()
+
+    def close(self):
+        """
+        Stop the client's background token refresh and fan-out pool and close its metadata store, if it was built.
+
+        Closing again does nothing. The native async client's connections can only be closed by aclose.
+        """
+        if self._client is not None and not self._closed:
+            self._closed = True
+            self._client.token_manager.stop()
+            # Only the Spotipy client fans out in threads
+            fan_out = getattr(self._client, 'fan_out', None)
+            if fan_out is not None:
+                fan_out.shutdown(wait=False)
+            if self._client.disk_store is not None:
+                self._client.disk_store.close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        if name.startswith('iter_'):
+            async def stream(*args, **kwargs):
+                steps = getattr(await self.get(), name)(*args, **kwargs)
+                async with contextlib.aclosing(steps):
+                    async for step in steps:
+                        yield step
+            return stream
+
+        async def call(*args, **kwargs):
+            return await getattr(await self.get(), name)(*args, **kwargs)
+        return call
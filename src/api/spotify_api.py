@@ -1,19 +1,36 @@
 """Spotify API client."""
 
+import functools
 import logging
 import os
-from typing import Optional, Dict, List
+import threading
+from typing import Optional, Dict, Iterator, List
 
+import requests
 import spotipy
-from dotenv import load_dotenv
 from spotipy.oauth2 import SpotifyOAuth
 
-from src.helpers import parsers, device_helpers, auth_helpers
+from src.config import config
+from src.helpers import (
+    parsers, device_helpers, auth_helpers, batch, bulk, metrics, pagination, playback_state, progress,
+    projection, revalidation
+)
 from src.helpers.auth_helpers import normalize_redirect_uri
-
-
-load_dotenv()
-
+from src.helpers.cache import MetadataCache
+from src.helpers.device_registry import DeviceRegistry
+from src.helpers.disk_store import open_store
+from src.helpers.executor import FanOutPool
+from src.helpers.library_index import LibraryIndex, SAVED_TRACKS_SOURCE, playlist_source, track_object
+from src.helpers.models import Playlist
+from src.helpers.playlist_store import PlaylistStore, SNAPSHOT_FIELDS
+from src.helpers.progress import Progress
+from src.helpers.revalidation import RevalidationCache, RevalidatingSpotify
+from src.helpers.scheduler import RequestScheduler, ScheduledSpotify
+from src.helpers.single_flight import SingleFlight, CoalescedSpotify
+from src.helpers.token_manager import BufferedCacheFileHandler, TokenManager
+from src.helpers.uri_helpers import get_id, get_uri
+
+# Environment variables, including .env, were loaded by src.config
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 REDIRECT_URI = normalize_redirect_uri(os.getenv("SPOTIFY_REDIRECT_URI"))
@@ -21,6 +38,20 @@ REDIRECT_URI = normalize_redirect_uri(os.getenv("SPOTIFY_REDIRECT_URI"))
 # Define a persistent cache path
 CACHE_PATH = os.path.join(os.path.expanduser("~"), ".spotify_mcp_cache")
 
+# Largest pages the playlist items and current user's playlists endpoints return
+PLAYLIST_ITEMS_PAGE_SIZE = 100
+USER_PLAYLISTS_PAGE_SIZE = 50
+
+# Largest page the saved tracks endpoint returns
+SAVED_TRACKS_PAGE_SIZE = 50
+
+# Most items the playlist add/remove endpoints accept per request
+PLAYLIST_MUTATION_CHUNK_SIZE = 100
+
+# Album groups making up an artist's full discography, and the largest page the endpoint returns
+ARTIST_ALBUM_GROUPS = ('album', 'single', 'compilation', 'appears_on')
+ARTIST_ALBUMS_PAGE_SIZE = 50
+
 SCOPES = [
     "user-read-currently-playing",
     "user-read-playback-state",
@@ -38,44 +69,90 @@ SCOPES = [
 ]
 
 
+def create_auth_manager() -> SpotifyOAuth:
+    """Build the OAuth manager shared by the Spotify clients."""
+    return SpotifyOAuth(
+        scope=",".join(SCOPES),
+        client_id=CLIENT_ID,
+        client_secret=CLIENT_SECRET,
+        redirect_uri=REDIRECT_URI,
+        cache_handler=BufferedCacheFileHandler(CACHE_PATH),
+        open_browser=True  # Allow browser to open ONLY on first initialization
+    )
+
+
+def create_session() -> requests.Session:
+    """
+    HTTP session for Spotipy with a sized connection pool and no transport retries.
+
+    Retries and 429 handling are left to RequestScheduler, which needs to see
+    the Retry-After header instead of urllib3 sleeping on it.
+    """
+    session = requests.Session()
+    adapter = revalidation.RevalidatingAdapter(
+        pool_connections=config.HTTP_MAX_KEEPALIVE,
+        pool_maxsize=config.HTTP_MAX_CONNECTIONS,
+        max_retries=0,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if metrics.registry.enabled:
+        session.hooks['response'].append(lambda response, *args, **kwargs:
+                                         metrics.registry.record_response(len(response.content)))
+    return session
+
+
+def authenticate(auth_manager: SpotifyOAuth, logger: logging.Logger) -> dict:
+    """Load the cached token, running the browser flow if there is none."""
+    # Try to get token on initialization (will open browser if needed)
+    token_info = auth_manager.get_cached_token()
+    if token_info is None:
+        logger.info("No cached token found. Initiating authentication...")
+        # This will open browser for initial authentication
+        token_info = auth_manager.get_access_token(as_dict=True)
+        if token_info:
+            logger.info("Authentication successful! Token cached.")
+        else:
+            raise RuntimeError("Authentication failed")
+    else:
+        logger.info("Using cached authentication token")
+    return token_info
+
+
 class Client:
     def __init__(self, logger: logging.Logger):
         """Initialize Spotify client with necessary permissions."""
         self.logger = logger
-        scope = ",".join(SCOPES)
 
         try:
-            self.sp = spotipy.Spotify(
-                auth_manager=SpotifyOAuth(
-                    scope=scope,
-                    client_id=CLIENT_ID,
-                    client_secret=CLIENT_SECRET,
-                    redirect_uri=REDIRECT_URI,
-                    cache_path=CACHE_PATH,
-                    open_browser=True  # Allow browser to open ONLY on first initialization
-                )
-            )
+            self.scheduler = RequestScheduler()
+            self.single_flight = SingleFlight()
+            raw = spotipy.Spotify(auth_manager=create_auth_manager(), requests_session=create_session())
+            raw.prefix = config.API_URL
+            self.revalidation = RevalidationCache()
+            scheduled = ScheduledSpotify(raw, self.scheduler)
+            if config.REVALIDATION:
+                scheduled = RevalidatingSpotify(scheduled, self.revalidation)
+            self.sp = CoalescedSpotify(scheduled, self.single_flight)
             self.auth_manager = self.sp.auth_manager
             self.cache_handler = self.auth_manager.cache_handler
-
-            # Try to get token on initialization (will open browser if needed)
-            token_info = self.auth_manager.get_cached_token()
-            if token_info is None:
-                self.logger.info("No cached token found. Initiating authentication...")
-                # This will open browser for initial authentication
-                token_info = self.auth_manager.get_access_token(as_dict=True)
-                if token_info:
-                    self.logger.info("Authentication successful! Token cached.")
-                else:
-                    raise RuntimeError("Authentication failed")
-            else:
-                self.logger.info("Using cached authentication token")
-
+            authenticate(self.auth_manager, self.logger)
+            self.token_manager = TokenManager(self.auth_manager)
+            self.token_manager.start()
         except Exception as e:
             self.logger.error(f"Failed to initialize Spotify client: {e}")
             raise
 
         self.username = None
+        self.disk_store = open_store()
+        self.cache = MetadataCache(store=self.disk_store)
+        self.playlist_store = PlaylistStore()
+        self.device_registry = DeviceRegistry()
+        self.library_index = LibraryIndex()
+        self._library_refresh: Optional[threading.Thread] = None
+        self._library_refresh_lock = threading.Lock()
+        # Every concurrent sub-request of this client shares one bounded pool, however deeply calls nest
+        self.fan_out = FanOutPool()
 
     # ---- Authentication methods ----
 
@@ -95,7 +172,7 @@ class Client:
     # ---- Search methods ----
 
     @auth_helpers.ensure_auth
-    def search(self, query: str, qtype: str = 'track', limit=10, device=None):
+    def search(self, query: str, qtype: str = 'track', limit=10, scope: str = 'catalog', device=None):
         """
         Search for items on Spotify.
 
@@ -103,8 +180,21 @@ class Client:
             query: Search query term
             qtype: Item types to return ('track', 'album', 'artist', 'playlist' or comma-separated)
             limit: Maximum number of items to return
+            scope: 'catalog' searches all of Spotify, 'library' searches the tracks in the
+                   user's playlists and saved tracks using the local index
         """
-        if self.username is None:
+        if scope == 'library':
+            if self.library_index.refreshed_at is None:
+                # Nothing to answer from yet, so wait for the first build (joining the warm-up's, if running)
+                self.refresh_library_index()
+            else:
+                self.start_library_refresh()
+            return {'tracks': self.library_index.search(query, limit)}
+        if scope != 'catalog':
+            raise ValueError(f"Unknown search scope: {scope}")
+
+        # The username is only needed to mark the user's own playlists
+        if self.username is None and 'playlist' in qtype:
             self.set_username()
 
         results = self.sp.search(q=query, limit=limit, type=qtype)
@@ -113,46 +203,201 @@ class Client:
 
         return parsers.parse_search_results(results, qtype, self.username)
 
-    def get_info(self, item_uri: str) -> dict:
+    def refresh_library_index(self):
+        """
+        Bring the library index up to date.
+
+        Once the index is older than SPOTIFY_MCP_LIBRARY_INDEX_TTL, every
+        playlist is revalidated by snapshot_id and only changed playlists are
+        downloaded again; in between, only playlists modified through this
+        client are revalidated. Library searches only wait for this the first
+        time; afterwards they answer from the index as it is and refresh it
+        in the background (see start_library_refresh).
+        """
+        def refresh():
+            dirty = self.library_index.take_dirty()
+            stale = self.library_index.is_stale()
+            if stale:
+                playlist_ids = [p['id'] for p in self.get_current_user_playlists()]
+                self.library_index.retain({playlist_source(i) for i in playlist_ids} | {SAVED_TRACKS_SOURCE})
+                jobs = [functools.partial(self._load_playlist, i) for i in playlist_ids] + [self._index_saved_tracks]
+            else:
+                jobs = [functools.partial(self._load_playlist, source.split(':', 1)[1]) for source in dirty]
+                if not jobs:
+                    return
+
+            def run(job):
+                try:
+                    job()
+                except Exception as e:
+                    # One unavailable playlist shouldn't make the rest of the library unsearchable
+                    self.logger.warning(f"Could not index part of the library: {e}")
+
+            list(self.fan_out.map(run, jobs))
+            if stale:
+                self.library_index.mark_refreshed()
+
+        self.single_flight.do('library_index', refresh)
+
+    def start_library_refresh(self):
+        """Refresh the library index in a background thread if it is stale or has dirty sources."""
+        if not self.library_index.needs_refresh():
+            return
+        with self._library_refresh_lock:
+            if self._library_refresh is not None and self._library_refresh.is_alive():
+                return
+
+            def run():
+                try:
+                    self.refresh_library_index()
+                except Exception as e:
+                    self.logger.warning(f"Background library index refresh failed: {e}")
+
+            self._library_refresh = threading.Thread(target=run, name="library-index", daemon=True)
+            self._library_refresh.start()
+
+    def _index_saved_tracks(self):
+        """Index the user's saved tracks unless the newest save and the total are unchanged."""
+        first_page = self.sp.current_user_saved_tracks(limit=SAVED_TRACKS_PAGE_SIZE)
+        items = first_page['items']
+        # Saved tracks are listed newest first, so a save or removal changes one of these
+        signature = (first_page['total'], items[0]['added_at'] if items else None)
+        if signature == self.library_index.signature(SAVED_TRACKS_SOURCE):
+            return
+        items = pagination.fetch_all_items(
+            first_page,
+            lambda offset: self.sp.current_user_saved_tracks(limit=SAVED_TRACKS_PAGE_SIZE, offset=offset),
+            SAVED_TRACKS_PAGE_SIZE,
+            self.fan_out,
+        )
+        self.library_index.index_source(SAVED_TRACKS_SOURCE, signature, [item['track'] for item in items])
+
+    def get_info(self, item_uri: str, full_discography: bool = False, album_tracks: bool = False,
+                 fields: Optional[List[str]] = None) -> dict:
         """
         Get detailed information about a Spotify item.
 
         Args:
             item_uri: URI like 'spotify:track:xxxxx' or 'spotify:album:xxxxx'
+            full_discography: For artists, list every release instead of the first page of albums
+            album_tracks: For artists, include each listed album's tracks
+            fields: Extra attributes to include, as dotted paths like 'album.release_date'
+                    (for playlists, attributes of each track)
         """
         _, qtype, item_id = item_uri.split(":")
+        item_uri = f"spotify:{qtype}:{item_id}"
+        fields = projection.validate_fields(fields)
+        options = []
+        if qtype == 'artist':
+            options = [name for name, on in (('discography', full_discography), ('album_tracks', album_tracks)) if on]
+        if fields:
+            options.append(f"fields={','.join(fields)}")
+        item_uri = ":".join([item_uri, *options])
+
+        cached = self.cache.get(item_uri)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            info = self._fetch_info(qtype, item_id, full_discography, album_tracks, fields)
+            self.cache.set(item_uri, info)
+            return info
+
+        # Concurrent requests for the same item share one fetch and its parsed result
+        return self.single_flight.do(item_uri, fetch)
+
+    def get_items_info(self, item_uris: List[str]) -> List[Dict]:
+        """
+        Get information about several Spotify items at once.
+
+        Args:
+            item_uris: Mixed list of track, album, artist and playlist URIs
 
+        Returns:
+            Parsed items in input order; items that could not be resolved are {'uri', 'error'}
+        """
+        plan = batch.BatchPlan(item_uris, self.cache)
+
+        def fetch_several(qtype, ids):
+            endpoint = batch.SEVERAL_ITEMS_ENDPOINTS[qtype][0]
+            try:
+                plan.add_response(qtype, ids, getattr(self.sp, endpoint)(ids))
+            except Exception as e:
+                plan.add_error(qtype, ids, e)
+
+        def fetch_single(uri):
+            try:
+                plan.results[uri] = self.get_info(uri)
+            except Exception as e:
+                plan.results[uri] = batch.item_error(uri, e)
+
+        jobs = [functools.partial(fetch_several, qtype, ids) for qtype, ids in plan.requests]
+        jobs += [functools.partial(fetch_single, uri) for uri in plan.singles]
+        if jobs:
+            # Groups are independent, so they run concurrently (the scheduler still paces them)
+            list(self.fan_out.map(lambda job: job(), jobs))
+        return plan.collect()
+
+    def _fetch_info(self, qtype: str, item_id: str, full_discography: bool = False,
+                    album_tracks: bool = False, fields: tuple = ()) -> dict:
+        """Fetch and parse an item, bypassing the cache."""
         if qtype == 'track':
-            return parsers.parse_track(self.sp.track(item_id), detailed=True)
+            track = self.sp.track(item_id)
+            return projection.with_fields(parsers.parse_track(track, detailed=True), track, fields)
         elif qtype == 'album':
-            return parsers.parse_album(self.sp.album(item_id), detailed=True)
+            album = self.sp.album(item_id)
+            return projection.with_fields(parsers.parse_album(album, detailed=True), album, fields)
         elif qtype == 'artist':
-            artist_info = parsers.parse_artist(self.sp.artist(item_id), detailed=True)
-            albums = self.sp.artist_albums(item_id)
-            top_tracks = self.sp.artist_top_tracks(item_id)['tracks']
-            parsed_info = parsers.parse_search_results(
-                {'albums': albums, 'tracks': {'items': top_tracks}},
-                qtype="album,track"
-            )
-            artist_info.update({
-                'top_tracks': parsed_info['tracks'],
-                'albums': parsed_info['albums']
-            })
-            return artist_info
+            return self._fetch_artist(item_id, full_discography, album_tracks, fields)
         elif qtype == 'playlist':
             if self.username is None:
                 self.set_username()
-            playlist = self.sp.playlist(item_id)
-            return parsers.parse_playlist(playlist, self.username, detailed=True)
+            return self._load_playlist(item_id, fields)
         else:
             raise ValueError(f"Unknown qtype: {qtype}")
 
+    def _fetch_artist(self, artist_id: str, full_discography: bool = False, album_tracks: bool = False,
+                      fields: tuple = ()) -> dict:
+        """Fetch an artist with top tracks and albums, issuing the requests concurrently."""
+        calls = (self.sp.artist, self._artist_discography if full_discography else self.sp.artist_albums,
+                 self.sp.artist_top_tracks)
+        artist, albums, top_tracks = self.fan_out.map(lambda call: call(artist_id), calls, len(calls))
+
+        artist_info = projection.with_fields(parsers.parse_artist(artist, detailed=True), artist, fields)
+        parsed_info = parsers.parse_search_results(
+            {'albums': albums, 'tracks': {'items': top_tracks['tracks']}},
+            qtype="album,track"
+        )
+        if album_tracks:
+            parsed_info['albums'] = self.get_items_info([f"spotify:album:{a['id']}" for a in parsed_info['albums']])
+        artist_info.update({
+            'top_tracks': parsed_info['tracks'],
+            'albums': parsed_info['albums']
+        })
+        return artist_info
+
+    def _artist_discography(self, artist_id: str) -> Dict:
+        """Every release of an artist, paging through all album groups in parallel."""
+        def fetch_group(group):
+            def fetch_page(offset=0):
+                return self.sp.artist_albums(artist_id, include_groups=group, limit=ARTIST_ALBUMS_PAGE_SIZE,
+                                             offset=offset)
+            return pagination.fetch_all_items(fetch_page(), fetch_page, ARTIST_ALBUMS_PAGE_SIZE, self.fan_out)
+
+        groups = list(self.fan_out.map(fetch_group, ARTIST_ALBUM_GROUPS, len(ARTIST_ALBUM_GROUPS)))
+        return {'items': parsers.dedupe_releases([album for group in groups for album in group])}
+
     # ---- Playback methods ----
 
+    def _current_playback(self) -> Optional[Dict]:
+        """Playback state, fetched at most once per client call (see playback_state)."""
+        return playback_state.current_playback(self.sp.current_playback)
+
+    @playback_state.request_scoped
     def get_current_track(self) -> Optional[Dict]:
         """Get information about the currently playing track."""
         try:
-            current = self.sp.current_user_playing_track()
+            current = self._current_playback()
             if not current or current.get('currently_playing_type') != 'track':
                 return None
 
@@ -163,11 +408,13 @@ class Client:
             self.logger.error(f"Error getting current track: {e}")
             raise
 
+    @playback_state.request_scoped
     def is_track_playing(self) -> bool:
         """Check if a track is actively playing."""
         curr_track = self.get_current_track()
         return curr_track and curr_track.get('is_playing', False)
 
+    @playback_state.request_scoped
     @auth_helpers.ensure_auth
     @device_helpers.ensure_active_device
     def start_playback(self, spotify_uri=None, device=None):
@@ -191,12 +438,15 @@ class Client:
         device_id = device_helpers.get_device_id(device)
 
         self.sp.start_playback(uris=uris, context_uri=context_uri, device_id=device_id)
+        self.device_registry.invalidate()
+        playback_state.invalidate()
 
+    @playback_state.request_scoped
     @auth_helpers.ensure_auth
     @device_helpers.ensure_active_device
     def pause_playback(self, device=None):
         """Pause playback."""
-        playback = self.sp.current_playback()
+        playback = self._current_playback()
         if playback and playback.get('is_playing'):
             self.sp.pause_playback(device_helpers.get_device_id(device))
 
@@ -206,14 +456,17 @@ class Client:
         """Add track to queue."""
         self.sp.add_to_queue(track_id, device_helpers.get_device_id(device))
 
+    @playback_state.request_scoped
     @auth_helpers.ensure_auth
     @device_helpers.ensure_active_device
     def get_queue(self, device=None):
         """Get the current queue of tracks."""
         queue_info = self.sp.queue()
-        queue_info['currently_playing'] = self.get_current_track()
-        queue_info['queue'] = [parsers.parse_track(track) for track in queue_info.pop('queue')]
-        return queue_info
+        return {
+            **queue_info,
+            'currently_playing': self.get_current_track(),
+            'queue': [parsers.parse_track(track) for track in queue_info['queue']],
+        }
 
     def skip_track(self, n=1):
         """Skip n tracks forward."""
@@ -234,38 +487,273 @@ class Client:
 
     # ---- Playlist methods ----
 
-    def get_current_user_playlists(self, limit=50) -> List[Dict]:
-        """Get current user's playlists."""
-        playlists = self.sp.current_user_playlists()
-        if not playlists:
+    @auth_helpers.ensure_username
+    def get_current_user_playlists(self, limit: Optional[int] = None, offset: int = 0,
+                                   cursor: Optional[str] = None):
+        """
+        Get current user's playlists.
+
+        Args:
+            limit: Maximum number of playlists to return (default: all)
+            offset: Index of the first playlist to return
+            cursor: next_cursor from a previous call, takes precedence over offset
+
+        Returns:
+            All playlists, or when paging a dict with 'items', 'offset', 'total' and 'next_cursor'
+        """
+        key = self._user_playlists_key()
+        playlists = self.cache.get(key)
+        if playlists is None:
+            playlists = list(self.iter_current_user_playlists())
+            self.cache.set(key, playlists)
+
+        if limit is None and not offset and not cursor:
+            return playlists
+        return pagination.page_of(playlists, offset, limit, cursor)
+
+    @auth_helpers.ensure_username
+    def iter_current_user_playlists(self) -> Iterator[Dict]:
+        """Yield every parsed playlist of the current user, fetching pages concurrently."""
+        first_page = self.sp.current_user_playlists(limit=USER_PLAYLISTS_PAGE_SIZE)
+        if not first_page:
             raise ValueError("No playlists found.")
-        return [parsers.parse_playlist(p, self.username) for p in playlists['items']]
+
+        pages = pagination.iter_pages(
+            first_page,
+            lambda offset: self.sp.current_user_playlists(limit=USER_PLAYLISTS_PAGE_SIZE, offset=offset),
+            USER_PLAYLISTS_PAGE_SIZE,
+            self.fan_out,
+        )
+        for items in pages:
+            for playlist in items:
+                yield parsers.parse_playlist(playlist, self.username)
+
+    def _user_playlists_key(self) -> str:
+        """Cache key for the current user's playlist list."""
+        return f"spotify:user_playlists:{self.username}"
 
     @auth_helpers.ensure_username
-    def get_playlist_tracks(self, playlist_id: str, limit=50) -> List[Dict]:
-        """Get tracks from a playlist."""
-        playlist = self.sp.playlist(playlist_id)
+    def get_playlist_tracks(self, playlist_id: str, limit: Optional[int] = None, offset: int = 0,
+                            cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+        """
+        Get tracks from a playlist.
+
+        Args:
+            playlist_id: Playlist ID, URI or URL
+            limit: Maximum number of tracks to return (default: all)
+            offset: Index of the first track to return
+            cursor: next_cursor from a previous call, takes precedence over offset
+            fields: Extra track attributes to include, as dotted paths like 'album.release_date'
+
+        Returns:
+            All tracks, or when paging a dict with 'items', 'offset', 'total' and 'next_cursor'
+        """
+        fields = projection.validate_fields(fields)
+        if limit is None and not offset and not cursor:
+            return self._load_playlist(playlist_id, fields)['tracks']
+        playlist_id = get_id('playlist', playlist_id)
+        stored = not fields and (self.playlist_store.snapshot(playlist_id) or (
+            self.disk_store is not None and self.disk_store.playlist_snapshot(playlist_id)))
+        if not stored:
+            return self._playlist_tracks_page(playlist_id, pagination.resolve_offset(offset, limit, cursor), limit,
+                                              fields)
+        return pagination.page_of(self._load_playlist(playlist_id, fields)['tracks'], offset, limit, cursor)
+
+    def _playlist_tracks_page(self, playlist_id: str, offset: int, limit: Optional[int], fields: tuple) -> Dict:
+        """
+        One page of a playlist's tracks, requesting only the pages of items that cover it.
+
+        Used when no copy of the playlist is stored to revalidate, so paging
+        through a large playlist doesn't download all of it first.
+        """
+        def fetch_page(page_offset, page_size=PLAYLIST_ITEMS_PAGE_SIZE):
+            return self.sp.playlist_items(playlist_id, fields=projection.playlist_items_fields(fields),
+                                          limit=page_size, offset=page_offset, additional_types=('track',))
+
+        first_page = fetch_page(offset, min(limit or PLAYLIST_ITEMS_PAGE_SIZE, PLAYLIST_ITEMS_PAGE_SIZE))
+        items = pagination.fetch_all_items(first_page, fetch_page, PLAYLIST_ITEMS_PAGE_SIZE, self.fan_out, limit)
+        tracks = [parsers.parse_track(item['track']) for item in items]
+        if fields:
+            projection.with_track_fields(tracks, items, fields)
+        return pagination.make_page(tracks, offset, first_page['total'])
+
+    @auth_helpers.ensure_username
+    def iter_playlist_tracks(self, playlist_id: str, fields: Optional[List[str]] = None) -> Iterator[Progress]:
+        """
+        Load every track of a playlist, yielding a progress step per page.
+
+        Args:
+            playlist_id: Playlist ID, URI or URL
+            fields: Extra track attributes to include, as dotted paths like 'album.release_date'
+
+        Yields:
+            Progress steps; the last one's result is the list of tracks
+        """
+        for step in self._iter_load_playlist(playlist_id, projection.validate_fields(fields)):
+            yield step if step.result is None else step._replace(result=step.result['tracks'])
+
+    def _load_playlist(self, playlist_id: str, fields: tuple = ()) -> Dict:
+        """Get a parsed playlist (see _iter_load_playlist)."""
+        return progress.run(self._iter_load_playlist(playlist_id, fields))
+
+    def _iter_load_playlist(self, playlist_id: str, fields: tuple = ()) -> Iterator[Progress]:
+        """
+        Get a parsed playlist, downloading it only if its snapshot_id has moved.
+
+        Only the attributes the parsers read (plus any extra track fields) are
+        requested. Playlists with extra fields are not kept in the store. A
+        progress step is yielded per page of tracks; the last step's result
+        is the parsed playlist.
+        """
+        playlist_id = get_id('playlist', playlist_id)
+        source = playlist_source(playlist_id)
+        # After a restart the playlist may only be in the disk store
+        on_disk = not fields and self.disk_store is not None and self.disk_store.playlist_snapshot(playlist_id)
+        if not fields and (self.playlist_store.snapshot(playlist_id) or on_disk):
+            current = self.sp.playlist(playlist_id, fields=SNAPSHOT_FIELDS)
+            stored = self.playlist_store.get(playlist_id, current['snapshot_id'])
+            if stored is None:
+                stored = self._restore_playlist(playlist_id, current['snapshot_id'])
+            if stored is not None:
+                self._index_stored_playlist(source, current['snapshot_id'], stored)
+                total = stored.total_tracks
+                yield Progress(total, total, f"Loaded {total} tracks (unchanged)", stored.to_dict())
+                return
+
+        playlist = self.sp.playlist(playlist_id, fields=projection.playlist_fields(fields))
         if not playlist:
             raise ValueError("No playlist found.")
-        return parsers.parse_tracks(playlist['tracks']['items'])
+        total = playlist['tracks']['total']
+        items = []
+        pages = pagination.iter_pages(
+            playlist['tracks'],
+            lambda offset: self.sp.playlist_items(playlist_id, fields=projection.playlist_items_fields(fields),
+                                                  limit=PLAYLIST_ITEMS_PAGE_SIZE, offset=offset,
+                                                  additional_types=('track',)),
+            PLAYLIST_ITEMS_PAGE_SIZE,
+            self.fan_out,
+        )
+        for page in pages:
+            items.extend(page)
+            yield Progress(len(items), total, f"Loaded {len(items)} of {total} tracks")
+        # Responses may be shared with concurrent callers, so build a new dict rather than filling in this one
+        playlist = {**playlist, 'tracks': {**playlist['tracks'], 'items': items}}
+        self.library_index.index_source(source, playlist['snapshot_id'], [item['track'] for item in items if item])
+        if fields:
+            parsed = parsers.parse_playlist(playlist, self.username, detailed=True)
+            projection.with_track_fields(parsed['tracks'], items, fields)
+        else:
+            parsed = self.playlist_store.put(playlist_id, playlist['snapshot_id'],
+                                             Playlist.from_api(playlist, self.username)).to_dict()
+            if self.disk_store is not None:
+                self.disk_store.put_playlist(playlist)
+        yield Progress(len(items), total, f"Loaded {len(items)} tracks", parsed)
+
+    def _restore_playlist(self, playlist_id: str, snapshot_id: str) -> Optional[Playlist]:
+        """Load a playlist saved by an earlier run from the disk store if it is still at this snapshot."""
+        if self.disk_store is None:
+            return None
+        playlist = self.disk_store.get_playlist(playlist_id, snapshot_id)
+        if playlist is None:
+            return None
+        items = playlist['tracks']['items']
+        self.library_index.index_source(playlist_source(playlist_id), snapshot_id, [item['track'] for item in items])
+        return self.playlist_store.put(playlist_id, snapshot_id, Playlist.from_api(playlist, self.username))
+
+    def _index_stored_playlist(self, source: str, snapshot_id: str, stored: Playlist):
+        """
+        Index a reused library playlist that is missing from the library index.
+
+        This happens when a playlist viewed before it was part of the library
+        is reused by the refresh that adds it. The tracks come from the disk
+        store's copy, or else from the parsed playlist, which has no album names.
+        """
+        if self.library_index.signature(source) == snapshot_id or not self.library_index.in_library(source):
+            return
+        playlist_id = source.split(':', 1)[1]
+        raw = self.disk_store.get_playlist(playlist_id, snapshot_id) if self.disk_store is not None else None
+        if raw is not None:
+            tracks = [item['track'] for item in raw['tracks']['items']]
+        else:
+            tracks = [track_object(track) for track in stored.tracks if track is not None]
+        self.library_index.index_source(source, snapshot_id, tracks)
+
+    def _invalidate_playlist(self, playlist_id: str):
+        """Drop cached copies of a playlist after modifying it."""
+        self.cache.invalidate(get_uri('playlist', playlist_id))
+        self.playlist_store.invalidate(get_id('playlist', playlist_id))
+        if self.disk_store is not None:
+            self.disk_store.delete_playlist(get_id('playlist', playlist_id))
+        self.library_index.mark_dirty(playlist_source(get_id('playlist', playlist_id)))
+
+    def add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str], position: Optional[int] = None,
+                               resume_from: int = 0) -> Dict:
+        """
+        Add any number of tracks to a playlist in API-sized chunks.
+
+        Args:
+            playlist_id: Playlist ID, URI or URL
+            track_ids: Track IDs or URIs, in the order they should appear
+            position: Index to insert the tracks at (default: append)
+            resume_from: Offset into track_ids to continue a failed call from
+
+        Returns:
+            Per-chunk results, see bulk.iter_chunks
+        """
+        return progress.run(self.iter_add_tracks_to_playlist(playlist_id, track_ids, position, resume_from))
 
     @auth_helpers.ensure_username
-    def add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str], position: Optional[int] = None):
-        """Add tracks to a playlist."""
+    def iter_add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str], position: Optional[int] = None,
+                                    resume_from: int = 0) -> Iterator[Progress]:
+        """add_tracks_to_playlist, yielding a progress step per chunk."""
         if not playlist_id or not track_ids:
             raise ValueError("playlist_id and track_ids are required.")
 
-        self.sp.playlist_add_items(playlist_id, track_ids, position=position)
-        self.logger.info(f"Added {len(track_ids)} tracks to playlist {playlist_id}")
+        def send(chunk, offset, snapshot_id):
+            # Later chunks go right after the ones already inserted
+            return self.sp.playlist_add_items(
+                playlist_id, chunk, position=None if position is None else position + offset
+            )
+
+        try:
+            for step in bulk.iter_chunks(track_ids, PLAYLIST_MUTATION_CHUNK_SIZE, send, resume_from):
+                if step.result is not None:
+                    self.logger.info(f"Added {step.done} of {len(track_ids)} tracks to playlist {playlist_id}")
+                yield step
+        finally:
+            self._invalidate_playlist(playlist_id)
+
+    def remove_tracks_from_playlist(self, playlist_id: str, track_ids: List[str], resume_from: int = 0) -> Dict:
+        """
+        Remove any number of tracks from a playlist in API-sized chunks.
+
+        Args:
+            playlist_id: Playlist ID, URI or URL
+            track_ids: Track IDs or URIs to remove (all occurrences)
+            resume_from: Offset into track_ids to continue a failed call from
+
+        Returns:
+            Per-chunk results, see bulk.iter_chunks
+        """
+        return progress.run(self.iter_remove_tracks_from_playlist(playlist_id, track_ids, resume_from))
 
     @auth_helpers.ensure_username
-    def remove_tracks_from_playlist(self, playlist_id: str, track_ids: List[str]):
-        """Remove tracks from a playlist."""
+    def iter_remove_tracks_from_playlist(self, playlist_id: str, track_ids: List[str],
+                                         resume_from: int = 0) -> Iterator[Progress]:
+        """remove_tracks_from_playlist, yielding a progress step per chunk."""
         if not playlist_id or not track_ids:
             raise ValueError("playlist_id and track_ids are required.")
 
-        self.sp.playlist_remove_all_occurrences_of_items(playlist_id, track_ids)
-        self.logger.info(f"Removed {len(track_ids)} tracks from playlist {playlist_id}")
+        def send(chunk, offset, snapshot_id):
+            return self.sp.playlist_remove_all_occurrences_of_items(playlist_id, chunk, snapshot_id=snapshot_id)
+
+        try:
+            for step in bulk.iter_chunks(track_ids, PLAYLIST_MUTATION_CHUNK_SIZE, send, resume_from):
+                if step.result is not None:
+                    self.logger.info(f"Removed {step.done} of {len(track_ids)} tracks from playlist {playlist_id}")
+                yield step
+        finally:
+            self._invalidate_playlist(playlist_id)
 
     @auth_helpers.ensure_username
     def create_playlist(self, name: str, description: Optional[str] = None, public: bool = True):
@@ -280,6 +768,8 @@ class Client:
             public=public,
             description=description
         )
+        self.cache.invalidate(self._user_playlists_key())
+        self.library_index.add_to_library(playlist_source(playlist['id']))
         self.logger.info(f"Created playlist: {name} (ID: {playlist['id']})")
         return parsers.parse_playlist(playlist, self.username, detailed=True)
 
@@ -290,13 +780,15 @@ class Client:
             raise ValueError("playlist_id is required.")
 
         self.sp.playlist_change_details(playlist_id, name=name, description=description)
+        self._invalidate_playlist(playlist_id)
+        self.cache.invalidate(self._user_playlists_key())
         self.logger.info(f"Updated playlist details for {playlist_id}")
 
     # ---- Device methods ----
 
     def get_devices(self) -> List[Dict]:
-        """Get all available devices."""
-        return self.sp.devices()['devices']
+        """Get all available devices (reused for a few seconds, see DeviceRegistry)."""
+        return self.device_registry.get(lambda: self.sp.devices()['devices'])
 
     def is_active_device(self) -> bool:
         """Check if there's an active device."""
@@ -304,4 +796,20 @@ class Client:
 
     def _get_candidate_device(self) -> Dict:
         """Get a candidate device for playback."""
-        return device_helpers.get_candidate_device(self.get_devices())
\ No newline at end of file
+        return device_helpers.get_candidate_device(self.get_devices())
+
+    # ---- Diagnostics ----
+
+    def stats(self) -> Dict:
+        """Return the counters of the caches, request scheduler and coalescing layer."""
+        return {
+            'cache': self.cache.stats(),
+            'playlist_store': self.playlist_store.stats(),
+            'library_index': self.library_index.stats(),
+            'device_registry': self.device_registry.stats(),
+            'scheduler': self.scheduler.stats(),
+            'single_flight': self.single_flight.stats(),
+            'disk_store': self.disk_store.stats() if self.disk_store is not None else {},
+            'revalidation': self.revalidation.stats(),
+            'fan_out': self.fan_out.stats(),
+        }
@@ -54,6 +54,157 @@ def validate_environment() -> bool:
     return True
 
 
+def get_int_env(name: str, default: int) -> int:
+    """
+    Read an integer environment variable, falling back to a default.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset or invalid
+
+    Returns:
+        Parsed integer value
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"Invalid integer for {name}: {value!r}, using {default}")
+        return default
+
+
+def get_bool_env(name: str, default: bool = False) -> bool:
+    """
+    Read a boolean environment variable ("1", "true", "yes" or "on").
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset
+
+    Returns:
+        Parsed boolean value
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_choice_env(name: str, choices: tuple, default: str) -> str:
+    """
+    Read an environment variable that must be one of a fixed set of values.
+
+    Args:
+        name: Environment variable name
+        choices: Accepted values (compared case-insensitively)
+        default: Value used when the variable is unset or invalid
+
+    Returns:
+        The chosen value
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    value = value.strip().lower()
+    if value not in choices:
+        logging.getLogger(__name__).warning(f"Invalid value for {name}: {value!r}, using {default}")
+        return default
+    return value
+
+
+# Maximum number of Spotify API calls allowed to run concurrently off the event loop
+MAX_WORKERS = get_int_env("SPOTIFY_MCP_MAX_WORKERS", 8)
+
+# Queue wait (milliseconds) above which a slow executor hand-off is logged
+SLOW_QUEUE_WAIT_MS = get_int_env("SPOTIFY_MCP_SLOW_QUEUE_WAIT_MS", 500)
+
+# Use the native asyncio client instead of running Spotipy in worker threads
+NATIVE_ASYNC = get_bool_env("SPOTIFY_MCP_NATIVE_ASYNC")
+
+# Base URL of the Spotify Web API, e.g. a local stand-in for offline benchmarks
+API_URL = os.getenv("SPOTIFY_MCP_API_URL") or "https://api.spotify.com/v1/"
+
+# Connection pool settings (timeout and HTTP/2 apply to the native asyncio client only)
+HTTP_MAX_CONNECTIONS = get_int_env("SPOTIFY_MCP_HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE = get_int_env("SPOTIFY_MCP_HTTP_MAX_KEEPALIVE", 10)
+HTTP_KEEPALIVE_EXPIRY = get_int_env("SPOTIFY_MCP_HTTP_KEEPALIVE_EXPIRY", 60)
+HTTP_TIMEOUT = get_int_env("SPOTIFY_MCP_HTTP_TIMEOUT", 10)
+HTTP2 = get_bool_env("SPOTIFY_MCP_HTTP2")
+
+# Seconds before expiry at which the access token is refreshed in the background
+TOKEN_REFRESH_MARGIN = get_int_env("SPOTIFY_MCP_TOKEN_REFRESH_MARGIN", 300)
+
+# Metadata cache: per-type TTLs in seconds (0 disables caching for that type) and size bounds
+CACHE_TTLS = {
+    'track': get_int_env("SPOTIFY_MCP_CACHE_TTL_TRACK", 86400),
+    'album': get_int_env("SPOTIFY_MCP_CACHE_TTL_ALBUM", 86400),
+    'artist': get_int_env("SPOTIFY_MCP_CACHE_TTL_ARTIST", 3600),
+    'playlist': get_int_env("SPOTIFY_MCP_CACHE_TTL_PLAYLIST", 60),
+    'user_playlists': get_int_env("SPOTIFY_MCP_CACHE_TTL_USER_PLAYLISTS", 300),
+}
+CACHE_MAX_ENTRIES = get_int_env("SPOTIFY_MCP_CACHE_MAX_ENTRIES", 5000)
+CACHE_MAX_BYTES = get_int_env("SPOTIFY_MCP_CACHE_MAX_MB", 64) * 1024 * 1024
+
+# On-disk store of parsed metadata and playlist snapshots, reused across restarts, and its size bound
+PERSISTENT_STORE = get_bool_env("SPOTIFY_MCP_PERSISTENT_STORE", True)
+STORE_PATH = os.getenv("SPOTIFY_MCP_STORE_PATH") or os.path.join(os.path.expanduser("~"), ".spotify_mcp_store.db")
+STORE_MAX_BYTES = get_int_env("SPOTIFY_MCP_STORE_MAX_MB", 256) * 1024 * 1024
+
+# Revalidate playlist and catalog reads with If-None-Match, keeping up to this many MB of responses with their ETags
+REVALIDATION = get_bool_env("SPOTIFY_MCP_REVALIDATION", True)
+REVALIDATION_MAX_BYTES = get_int_env("SPOTIFY_MCP_REVALIDATION_MAX_MB", 32) * 1024 * 1024
+
+# Maximum number of playlists kept in the snapshot-validated playlist store
+PLAYLIST_STORE_MAX = get_int_env("SPOTIFY_MCP_PLAYLIST_STORE_MAX", 200)
+
+# Maximum number of pages of a paged collection fetched at the same time
+PAGE_CONCURRENCY = get_int_env("SPOTIFY_MCP_PAGE_CONCURRENCY", 4)
+
+# Worker threads shared by all of a client's concurrent page, artist, batch and library requests
+FANOUT_WORKERS = get_int_env("SPOTIFY_MCP_FANOUT_WORKERS", 8)
+
+# Request scheduler: sustained rate and burst size, retries for transient failures
+RATE_LIMIT_PER_SECOND = get_int_env("SPOTIFY_MCP_RATE_LIMIT", 10)
+RATE_LIMIT_BURST = get_int_env("SPOTIFY_MCP_RATE_LIMIT_BURST", 20)
+MAX_RETRIES = get_int_env("SPOTIFY_MCP_MAX_RETRIES", 3)
+BACKOFF_BASE_MS = get_int_env("SPOTIFY_MCP_BACKOFF_BASE_MS", 500)
+BACKOFF_MAX_MS = get_int_env("SPOTIFY_MCP_BACKOFF_MAX_MS", 8000)
+
+# Seconds the device list is reused before /me/player/devices is called again
+DEVICE_CACHE_TTL = get_int_env("SPOTIFY_MCP_DEVICE_CACHE_TTL", 10)
+
+# Seconds before library search revalidates every playlist and the saved tracks (in the background)
+LIBRARY_INDEX_TTL = get_int_env("SPOTIFY_MCP_LIBRARY_INDEX_TTL", 300)
+
+# Build the library index during the warm-up instead of on the first library search
+LIBRARY_INDEX_WARMUP = get_bool_env("SPOTIFY_MCP_LIBRARY_INDEX_WARMUP", True)
+
+# How tool results are encoded: compact JSON, indented JSON, or compact JSON with lists of objects as tables
+OUTPUT_FORMAT = get_choice_env("SPOTIFY_MCP_OUTPUT_FORMAT", ("compact", "pretty", "columnar"), "compact")
+
+# Also return dict/list results as MCP structured content
+STRUCTURED_OUTPUT = get_bool_env("SPOTIFY_MCP_STRUCTURED_OUTPUT")
+
+# Build the Spotify client on first use instead of before the server starts answering
+LAZY_STARTUP = get_bool_env("SPOTIFY_MCP_LAZY_STARTUP", True)
+
+# As soon as the server is up, build the client (with lazy startup) and the library index in the background
+WARMUP = get_bool_env("SPOTIFY_MCP_WARMUP", True)
+
+# Record latency, error, 429 and payload size metrics for tools and Spotify requests
+METRICS = get_bool_env("SPOTIFY_MCP_METRICS", True)
+
+# Profiling of tool calls: which tools (all if empty), the percentage run under cProfile,
+# how many of the slowest calls are kept and where their profiles are written
+PROFILE = get_bool_env("SPOTIFY_MCP_PROFILE")
+PROFILE_TOOLS = frozenset(t.strip() for t in os.getenv("SPOTIFY_MCP_PROFILE_TOOLS", "").split(",") if t.strip())
+PROFILE_SAMPLE_PERCENT = get_int_env("SPOTIFY_MCP_PROFILE_SAMPLE_PERCENT", 10)
+PROFILE_TOP_N = get_int_env("SPOTIFY_MCP_PROFILE_TOP_N", 20)
+PROFILE_DIR = os.getenv("SPOTIFY_MCP_PROFILE_DIR") or os.path.join(os.path.expanduser("~"), ".spotify_mcp_profiles")
+
+
 class SpotifyConfig:
     """Configuration class for Spotify settings."""
 
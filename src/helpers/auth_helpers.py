@@ -40,22 +40,8 @@ def ensure_auth(func: Callable[..., T]) -> Callable[..., T]:
     """Decorator to ensure authentication is valid before API calls."""
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        # Get cached token and validate it
-        token_info = self.auth_manager.get_cached_token()
-
-        if token_info is None:
-            # No token cached - need initial authentication
-            raise RuntimeError(
-                "No authentication token found. Please run initial authentication first.\n"
-                "The browser should have opened during server startup for authentication."
-            )
-
-        # Check if token is expired and refresh if needed
-        if self.auth_manager.is_token_expired(token_info):
-            logger.info("Token expired, refreshing...")
-            # This will refresh without opening browser
-            token_info = self.auth_manager.refresh_access_token(token_info['refresh_token'])
-
+        # Served from memory; refreshes (once, for all callers) only near expiry
+        self.token_manager.get_token()
         return func(self, *args, **kwargs)
 
     return wrapper
@@ -72,6 +58,17 @@ def ensure_username(func: Callable[..., T]) -> Callable[..., T]:
     return wrapper
 
 
+def ensure_username_async(func: Callable[..., T]) -> Callable[..., T]:
+    """Coroutine counterpart of ensure_username."""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if self.username is None:
+            await self.set_username()
+        return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
 def check_token(auth_manager, cache_handler) -> bool:
     """Check if authentication token is valid."""
     try:
@@ -0,0 +1,97 @@
+"""Batch item lookups through Spotify's several-items endpoints."""
+
+import logging
+from typing import Dict, List
+
+from src.helpers import parsers
+from src.helpers.uri_helpers import parse_uri
+
+logger = logging.getLogger(__name__)
+
+# qtype -> (endpoint, response key, maximum IDs per request)
+SEVERAL_ITEMS_ENDPOINTS = {
+    'track': ('tracks', 'tracks', 50),
+    'album': ('albums', 'albums', 20),
+    'artist': ('artists', 'artists', 50),
+}
+
+# Several-items responses parse to the same shape get_info caches for these types.
+# Artists differ (get_info adds albums and top tracks), so they are not shared with the cache.
+CACHED_TYPES = frozenset({'track', 'album'})
+
+_PARSERS = {'track': parsers.parse_track, 'album': parsers.parse_album, 'artist': parsers.parse_artist}
+
+
+def item_error(uri: str, error) -> Dict:
+    """Result entry for an item that could not be resolved."""
+    return {'uri': uri, 'error': str(error)}
+
+
+class BatchPlan:
+    """
+    Resolves a mixed list of URIs with as few requests as possible.
+
+    Items already in the cache are answered directly, duplicates are looked
+    up once, and the rest are grouped by type into several-items requests of
+    the maximum size Spotify accepts. Types without such an endpoint (e.g.
+    playlists) are listed in 'singles' for a regular get_info.
+    """
+
+    def __init__(self, item_uris: List[str], cache):
+        self.cache = cache
+        self.order: List[str] = []
+        self.results: Dict[str, Dict] = {}
+        self.requests: List[tuple] = []
+        self.singles: List[str] = []
+
+        grouped: Dict[str, List[str]] = {}
+        seen = set()
+        for value in item_uris:
+            try:
+                qtype, item_id = parse_uri(value)
+            except ValueError as e:
+                self.order.append(value)
+                self.results[value] = item_error(value, e)
+                continue
+            uri = f"spotify:{qtype}:{item_id}"
+            self.order.append(uri)
+            if uri in seen:
+                continue
+            seen.add(uri)
+
+            cached = cache.get(uri) if qtype in CACHED_TYPES else None
+            if cached is not None:
+                self.results[uri] = cached
+            elif qtype in SEVERAL_ITEMS_ENDPOINTS:
+                grouped.setdefault(qtype, []).append(item_id)
+            else:
+                self.singles.append(uri)
+
+        for qtype, ids in grouped.items():
+            size = SEVERAL_ITEMS_ENDPOINTS[qtype][2]
+            self.requests.extend((qtype, ids[i:i + size]) for i in range(0, len(ids), size))
+
+    def add_response(self, qtype: str, ids: List[str], response: Dict):
+        """Parse a several-items response; Spotify returns items in request order, null if not found."""
+        items = (response or {}).get(SEVERAL_ITEMS_ENDPOINTS[qtype][1]) or []
+        for i, item_id in enumerate(ids):
+            uri = f"spotify:{qtype}:{item_id}"
+            item = items[i] if i < len(items) else None
+            if not item:
+                self.results[uri] = item_error(uri, "Not found.")
+                continue
+            parsed = _PARSERS[qtype](item, detailed=True)
+            if qtype in CACHED_TYPES:
+                self.cache.set(uri, parsed)
+            self.results[uri] = parsed
+
+    def add_error(self, qtype: str, ids: List[str], error: Exception):
+        """Mark every item of a failed request as failed."""
+        logger.error(f"Batch lookup of {len(ids)} {qtype}(s) failed: {error}")
+        for item_id in ids:
+            uri = f"spotify:{qtype}:{item_id}"
+            self.results[uri] = item_error(uri, error)
+
+    def collect(self) -> List[Dict]:
+        """Results in the order the URIs were given."""
+        return [self.results[uri] for uri in self.order]
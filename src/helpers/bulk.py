@@ -0,0 +1,120 @@
+"""Chunked execution of bulk playlist mutations."""
+
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from src.helpers import progress
+from src.helpers.progress import Progress
+
+logger = logging.getLogger(__name__)
+
+# send(chunk, offset, snapshot_id) -> Spotify response containing the new snapshot_id
+ChunkSender = Callable[[List[str], int, Optional[str]], Optional[Dict]]
+
+
+def _chunks(items: List[str], chunk_size: int, resume_from: int):
+    if resume_from < 0 or resume_from > len(items):
+        raise ValueError(f"resume_from must be between 0 and {len(items)}.")
+    return [(offset, items[offset:offset + chunk_size]) for offset in range(resume_from, len(items), chunk_size)]
+
+
+def _result(items: List[str], chunks: List[Dict], snapshot_id: Optional[str]) -> Dict:
+    failed = next((c for c in chunks if c['status'] == 'failed'), None)
+    return {
+        'total': len(items),
+        'processed': sum(c['count'] for c in chunks if c['status'] == 'ok'),
+        'snapshot_id': snapshot_id,
+        'chunks': chunks,
+        'resume_from': failed['offset'] if failed else None,
+        'error': failed['error'] if failed else None,
+    }
+
+
+def _record_failure(chunks: List[Dict], pending: List, error: Exception):
+    failed = chunks[-1]
+    failed.update(status='failed', error=str(error))
+    # Nothing was applied, so surface the error exactly as a single request would
+    if not any(c['status'] == 'ok' for c in chunks):
+        raise error
+    chunks.extend({'offset': offset, 'count': len(chunk), 'status': 'pending'} for offset, chunk in pending)
+    logger.error(f"Bulk operation stopped at item {failed['offset']}: {error}")
+
+
+def _step(items: List[str], chunks: List[Dict]) -> Progress:
+    processed = sum(c['count'] for c in chunks if c['status'] == 'ok')
+    resume_from = chunks[-1]['offset'] + chunks[-1]['count']
+    return Progress(processed, len(items), f"Processed {processed} of {len(items)} items "
+                                           f"(resume_from={resume_from})")
+
+
+def iter_chunks(items: List[str], chunk_size: int, send: ChunkSender,
+                resume_from: int = 0) -> Iterator[Progress]:
+    """
+    Apply a bulk mutation as a chain of API-sized requests.
+
+    Each chunk is sent once the previous one is acknowledged, passing along
+    the snapshot_id it returned, so Spotify applies the chunks in order.
+    A progress step is yielded after every chunk; closing the generator
+    stops before the next chunk is sent.
+
+    Args:
+        items: Track IDs/URIs to process
+        chunk_size: Maximum items per request
+        send: Callable performing one request for (chunk, offset, snapshot_id)
+        resume_from: Item offset to start from, e.g. 'resume_from' of a failed run
+
+    Yields:
+        Progress steps; the last one's result is a dict with per-chunk
+        results, the final snapshot_id and, if a chunk failed, the
+        'resume_from' offset and 'error' for retrying the rest
+    """
+    chunks, snapshot_id = [], None
+    pending = _chunks(items, chunk_size, resume_from)
+    while pending:
+        offset, chunk = pending.pop(0)
+        chunks.append({'offset': offset, 'count': len(chunk)})
+        try:
+            response = send(chunk, offset, snapshot_id)
+        except Exception as e:
+            _record_failure(chunks, pending, e)
+            break
+        snapshot_id = (response or {}).get('snapshot_id', snapshot_id)
+        chunks[-1].update(status='ok', snapshot_id=snapshot_id)
+        yield _step(items, chunks)
+    result = _result(items, chunks, snapshot_id)
+    yield Progress(result['processed'], len(items), f"Processed {result['processed']} of {len(items)} items",
+                   result)
+
+
+async def iter_chunks_async(items: List[str], chunk_size: int,
+                            send: Callable[[List[str], int, Optional[str]], Awaitable[Optional[Dict]]],
+                            resume_from: int = 0) -> AsyncIterator[Progress]:
+    """Coroutine counterpart of iter_chunks."""
+    chunks, snapshot_id = [], None
+    pending = _chunks(items, chunk_size, resume_from)
+    while pending:
+        offset, chunk = pending.pop(0)
+        chunks.append({'offset': offset, 'count': len(chunk)})
+        try:
+            response = await send(chunk, offset, snapshot_id)
+        except Exception as e:
+            _record_failure(chunks, pending, e)
+            break
+        snapshot_id = (response or {}).get('snapshot_id', snapshot_id)
+        chunks[-1].update(status='ok', snapshot_id=snapshot_id)
+        yield _step(items, chunks)
+    result = _result(items, chunks, snapshot_id)
+    yield Progress(result['processed'], len(items), f"Processed {result['processed']} of {len(items)} items",
+                   result)
+
+
+def run_chunks(items: List[str], chunk_size: int, send: ChunkSender, resume_from: int = 0) -> Dict:
+    """Apply a bulk mutation and return its result (see iter_chunks)."""
+    return progress.run(iter_chunks(items, chunk_size, send, resume_from))
+
+
+async def run_chunks_async(items: List[str], chunk_size: int,
+                           send: Callable[[List[str], int, Optional[str]], Awaitable[Optional[Dict]]],
+                           resume_from: int = 0) -> Dict:
+    """Coroutine counterpart of run_chunks."""
+    return await progress.run_async(iter_chunks_async(items, chunk_size, send, resume_from))
@@ -0,0 +1,182 @@
+"""In-memory TTL + LRU cache for parsed Spotify objects."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
+
+from src.config import config
+from src.helpers.disk_store import DiskStore
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory footprint of a parsed object in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+class MetadataCache:
+    """
+    Bounded cache of parsed objects keyed by Spotify URI.
+
+    Each item type ('track', 'album', 'artist', 'playlist', ...) has its own
+    TTL; a TTL of 0 disables caching for that type. Entries are evicted least
+    recently used first once either the entry or the byte limit is exceeded.
+
+    With a DiskStore, entries are also written to disk and misses are looked
+    up there, so parsed objects outlive the process until their TTL runs out.
+    Async callers use get_async so the disk lookup runs off the event loop.
+    Disk deletes are applied on the store's writer thread, so until then the
+    invalidated keys are not read from disk, and a disk read that raced an
+    invalidation is not kept.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = config.CACHE_MAX_ENTRIES,
+                 max_bytes: int = config.CACHE_MAX_BYTES,
+                 store: Optional[DiskStore] = None):
+        self.ttls = ttls if ttls is not None else config.CACHE_TTLS
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0                               # bumped by every disk delete
+        self._deleting: Dict[str, int] = defaultdict(int)  # key prefix -> disk deletes not yet applied
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _qtype(uri: str) -> str:
+        return uri.split(":")[1] if uri.count(":") >= 2 else uri
+
+    def get(self, uri: str, disk: bool = True) -> Optional[Any]:
+        """Return the cached object for a URI, or None if missing or expired; disk=False skips the DiskStore."""
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(uri)
+                    self.hits += 1
+                    return value
+                self._remove(uri)
+            self.misses += 1
+        return self._load(uri) if disk else None
+
+    async def get_async(self, uri: str) -> Optional[Any]:
+        """Like get, reading the DiskStore in a worker thread."""
+        value = self.get(uri, disk=False)
+        if value is None and self.store is not None:
+            value = await asyncio.to_thread(self._load, uri)
+        return value
+
+    def _load(self, uri: str) -> Optional[Any]:
+        """Read a URI through from the DiskStore into memory."""
+        if self.store is None:
+            return None
+        with self._lock:
+            if any(uri == key or uri.startswith(key + ":") for key in self._deleting):
+                return None
+            generation = self._generation
+        stored = self.store.get_item(uri)
+        if stored is None:
+            return None
+        value, ttl = stored
+        self._insert(uri, value, ttl, generation)
+        return value
+
+    def set(self, uri: str, value: Any):
+        """Cache a parsed object under its URI using the TTL for its type."""
+        ttl = self.ttls.get(self._qtype(uri), 0)
+        if ttl <= 0 or value is None:
+            return
+        if self.store is not None:
+            self.store.put_item(uri, value, ttl)
+        self._insert(uri, value, ttl)
+
+    def _insert(self, uri: str, value: Any, ttl: float, generation: Optional[int] = None):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A value read from disk before an invalidation may be stale
+            if generation is not None and generation != self._generation:
+                return
+            if uri in self._entries:
+                self._remove(uri)
+            self._entries[uri] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, uri: str) -> bool:
+        """Drop a URI and its variants (e.g. 'spotify:artist:xxx:discography'). Returns True if any was cached."""
+        with self._lock:
+            keys = [key for key in self._entries if key == uri or key.startswith(uri + ":")]
+            for key in keys:
+                self._remove(key)
+        self._delete_on_disk(uri)
+        if keys:
+            logger.debug(f"Invalidated {uri}")
+        return bool(keys)
+
+    def invalidate_type(self, qtype: str):
+        """Drop every cached object of one item type."""
+        with self._lock:
+            for uri in [u for u in self._entries if self._qtype(u) == qtype]:
+                self._remove(uri)
+        self._delete_on_disk(f"spotify:{qtype}")
+
+    def clear(self):
+        """Drop everything, on disk too."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._delete_on_disk("spotify")
+
+    def _delete_on_disk(self, key: str):
+        """Delete a key and its variants from the DiskStore, not reading them from disk until that is applied."""
+        if self.store is None:
+            return
+        with self._lock:
+            self._deleting[key] += 1
+            self._generation += 1
+
+        def applied(_):
+            with self._lock:
+                self._deleting[key] -= 1
+                if not self._deleting[key]:
+                    del self._deleting[key]
+
+        self.store.delete_items(key).add_done_callback(applied)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def _remove(self, uri: str):
+        _, _, size = self._entries.pop(uri)
+        self._bytes -= size
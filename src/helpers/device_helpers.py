@@ -4,6 +4,8 @@ import functools
 import logging
 from typing import Callable, TypeVar, Optional, Dict, List
 
+from spotipy import SpotifyException
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -13,10 +15,40 @@ def ensure_active_device(func: Callable[..., T]) -> Callable[..., T]:
     """Decorator to ensure an active device is available for playback."""
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        if not is_device_active(self.get_devices()):
-            kwargs['device'] = get_candidate_device(self.get_devices())
-        return func(self, *args, **kwargs)
-    
+        devices = self.get_devices()
+        # Picking a device or a device error means the cached device state is about to change
+        stale = not is_device_active(devices)
+        try:
+            if stale:
+                kwargs['device'] = get_candidate_device(devices)
+            return func(self, *args, **kwargs)
+        except (SpotifyException, ConnectionError):
+            stale = True
+            raise
+        finally:
+            if stale:
+                self.device_registry.invalidate()
+
+    return wrapper
+
+
+def ensure_active_device_async(func: Callable[..., T]) -> Callable[..., T]:
+    """Coroutine counterpart of ensure_active_device."""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        devices = await self.get_devices()
+        stale = not is_device_active(devices)
+        try:
+            if stale:
+                kwargs['device'] = get_candidate_device(devices)
+            return await func(self, *args, **kwargs)
+        except (SpotifyException, ConnectionError):
+            stale = True
+            raise
+        finally:
+            if stale:
+                self.device_registry.invalidate()
+
     return wrapper
 
 
@@ -0,0 +1,81 @@
+"""Short-lived shared view of the user's playback devices."""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceRegistry:
+    """
+    Caches the /me/player/devices response for a few seconds.
+
+    Concurrent callers that find the list stale share one refresh. The list
+    is invalidated whenever playback may have moved to another device or a
+    device-related error came back, so stale state is never reused after it
+    has been proven wrong.
+    """
+
+    def __init__(self, ttl: float = config.DEVICE_CACHE_TTL):
+        self.ttl = ttl
+        self._devices: Optional[List[Dict]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._inflight: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.refreshes = 0
+
+    def _fresh(self) -> Optional[List[Dict]]:
+        if self._devices is not None and time.monotonic() - self._fetched_at < self.ttl:
+            return self._devices
+        return None
+
+    def _store(self, devices: List[Dict]) -> List[Dict]:
+        self._devices = devices
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+        return devices
+
+    def get(self, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return the device list, calling fetch only if the cached one is stale."""
+        devices = self._fresh()
+        if devices is not None:
+            self.hits += 1
+            return devices
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            devices = self._fresh()
+            if devices is not None:
+                self.hits += 1
+                return devices
+            return self._store(fetch())
+
+    async def get_async(self, fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        """Coroutine counterpart of get."""
+        devices = self._fresh()
+        if devices is not None:
+            self.hits += 1
+            return devices
+        if self._inflight is None:
+            async def refresh():
+                try:
+                    return self._store(await fetch())
+                finally:
+                    self._inflight = None
+            self._inflight = asyncio.ensure_future(refresh())
+        else:
+            self.hits += 1
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self):
+        """Forget the cached device list."""
+        self._devices = None
+
+    def stats(self) -> Dict:
+        """Return how often the device list was served from memory versus refreshed."""
+        return {'hits': self.hits, 'refreshes': self.refreshes}
@@ -0,0 +1,331 @@
+"""On-disk store of parsed Spotify metadata that survives server restarts."""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    uri TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_accessed ON items (accessed_at);
+
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    snapshot_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS playlists_accessed ON playlists (accessed_at);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT,
+    data TEXT,
+    PRIMARY KEY (playlist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS playlist_tracks_track ON playlist_tracks (track_id);
+"""
+
+# Rows examined per eviction round
+EVICTION_BATCH = 64
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+class DiskStore:
+    """
+    SQLite store of parsed items and playlist snapshots, next to the token cache.
+
+    Items are the parsed objects MetadataCache holds, keyed the same way and
+    kept until their TTL runs out. Playlists are stored with their
+    snapshot_id and their track objects as requested from Spotify; a track
+    shared by several playlists is stored once, and playlist_tracks indexes
+    which playlists contain it.
+
+    The database runs in WAL mode so reads never wait for a write. Reads
+    use a small pool of connections; writes, including access-time updates,
+    go through one background thread so callers don't wait on disk. Once
+    the stored data exceeds max_bytes the least recently used items and
+    playlists are evicted.
+    """
+
+    def __init__(self, path: str = config.STORE_PATH, max_bytes: int = config.STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._readers: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metadata-store")
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._bytes = conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM items) + (SELECT COALESCE(SUM(size), 0) FROM playlists)"
+            " + (SELECT COALESCE(SUM(length(data)), 0) FROM tracks)"
+        ).fetchone()[0]
+        self._readers.put(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        # In WAL mode, NORMAL only syncs at checkpoints; a crash can lose the last writes but not corrupt the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _read(self, sql: str, params: tuple = ()) -> List[tuple]:
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            self._readers.put(conn)
+
+    def _write(self, func, *args) -> Future:
+        """Run func(connection, *args) in a transaction on the writer thread; the future is done once it ran."""
+        def run():
+            if self._write_conn is None:
+                self._write_conn = self._connect()
+            try:
+                with self._write_conn:
+                    self._write_conn.execute("BEGIN")
+                    func(self._write_conn, *args)
+            except sqlite3.Error as e:
+                logger.warning(f"Metadata store write failed: {e}")
+        return self._writer.submit(run)
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ---- Items ----
+
+    def get_item(self, uri: str) -> Optional[Tuple[Any, float]]:
+        """
+        Return a stored item and its remaining TTL in seconds.
+
+        Args:
+            uri: Cache key, e.g. 'spotify:track:xxx' or 'spotify:artist:xxx:discography'
+
+        Returns:
+            (value, seconds until it expires), or None if missing or expired
+        """
+        rows = self._read("SELECT data, expires_at FROM items WHERE uri = ?", (uri,))
+        now = time.time()
+        if not rows or rows[0][1] <= now:
+            self._count(False)
+            return None
+        self._count(True)
+        self._write(lambda conn: conn.execute("UPDATE items SET accessed_at = ? WHERE uri = ?", (now, uri)))
+        return json.loads(rows[0][0]), rows[0][1] - now
+
+    def put_item(self, uri: str, value: Any, ttl: float):
+        """Store a parsed item for ttl seconds; it is encoded on the writer, so it must not be modified afterwards."""
+        now = time.time()
+
+        def write(conn):
+            data = _dumps(value)
+            old = conn.execute("SELECT size FROM items WHERE uri = ?", (uri,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?)", (uri, data, now + ttl, now, len(data)))
+            self._grow(conn, len(data) - (old[0] if old else 0))
+        self._write(write)
+
+    def delete_items(self, uri: str) -> Future:
+        """Delete an item and its variants (keys starting with uri + ':'); the future is done once the delete ran."""
+        pattern = uri.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + ':%'
+
+        def write(conn):
+            where = "uri = ? OR uri LIKE ? ESCAPE '\\'"
+            size = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM items WHERE {where}", (uri, pattern)).fetchone()[0]
+            conn.execute(f"DELETE FROM items WHERE {where}", (uri, pattern))
+            self._grow(conn, -size)
+        return self._write(write)
+
+    def delete_item_type(self, qtype: str) -> Future:
+        """Delete every item of one type."""
+        return self.delete_items(f"spotify:{qtype}")
+
+    # ---- Playlists ----
+
+    def playlist_snapshot(self, playlist_id: str) -> Optional[str]:
+        """Return the snapshot_id of the stored copy of a playlist, if any."""
+        rows = self._read("SELECT snapshot_id FROM playlists WHERE id = ?", (playlist_id,))
+        return rows[0][0] if rows else None
+
+    def get_playlist(self, playlist_id: str, snapshot_id: str) -> Optional[Dict]:
+        """
+        Return the stored playlist if it matches the given snapshot.
+
+        Returns:
+            The playlist object as it was downloaded, with all of tracks.items, or None
+        """
+        rows = self._read("SELECT data FROM playlists WHERE id = ? AND snapshot_id = ?", (playlist_id, snapshot_id))
+        if not rows:
+            self._count(False)
+            return None
+        playlist = json.loads(rows[0][0])
+        tracks = self._read(
+            "SELECT COALESCE(pt.data, t.data) FROM playlist_tracks pt LEFT JOIN tracks t ON t.id = pt.track_id "
+            "WHERE pt.playlist_id = ? ORDER BY pt.position",
+            (playlist_id,),
+        )
+        playlist['tracks']['items'] = [{'track': json.loads(data) if data else None} for data, in tracks]
+        self._count(True)
+        now = time.time()
+        self._write(lambda conn: conn.execute("UPDATE playlists SET accessed_at = ? WHERE id = ?", (now, playlist_id)))
+        return playlist
+
+    def put_playlist(self, playlist: Dict):
+        """Store a downloaded playlist object whose tracks.items are complete; it must not be modified afterwards."""
+        now = time.time()
+
+        def write(conn):
+            # Encoding happens on the writer too, so the caller only pays for queueing
+            meta = {**playlist, 'tracks': {k: v for k, v in playlist['tracks'].items() if k != 'items'}}
+            data = _dumps(meta)
+            rows = []
+            for position, item in enumerate(playlist['tracks']['items']):
+                track = item.get('track') if item else None
+                rows.append((position, track.get('id') if track else None, _dumps(track) if track else None))
+            # The playlist's size covers its own row and tracks without an ID; shared tracks are counted once below
+            size = len(data) + sum(len(track) for _, track_id, track in rows if track and not track_id)
+
+            self._delete_playlist(conn, playlist['id'])
+            conn.execute("INSERT INTO playlists VALUES (?, ?, ?, ?, ?)",
+                         (playlist['id'], playlist['snapshot_id'], data, now, size))
+            for track_id, track in {track_id: track for _, track_id, track in rows if track_id}.items():
+                old = conn.execute("SELECT length(data) FROM tracks WHERE id = ?", (track_id,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO tracks VALUES (?, ?)", (track_id, track))
+                size += len(track) - (old[0] if old else 0)
+            conn.executemany("INSERT INTO playlist_tracks VALUES (?, ?, ?, ?)",
+                             [(playlist['id'], position, track_id, None if track_id else track)
+                              for position, track_id, track in rows])
+            self._grow(conn, size)
+        self._write(write)
+
+    def delete_playlist(self, playlist_id: str):
+        """Forget a stored playlist."""
+        self._write(self._delete_playlist, playlist_id)
+
+    def playlists_containing(self, track_id: str) -> List[str]:
+        """IDs of the stored playlists that contain a track."""
+        return [row[0] for row in self._read(
+            "SELECT DISTINCT playlist_id FROM playlist_tracks WHERE track_id = ?", (track_id,))]
+
+    def _delete_playlist(self, conn: sqlite3.Connection, playlist_id: str):
+        """Delete a playlist and the tracks no other stored playlist contains. Runs on the writer."""
+        old = conn.execute("SELECT size FROM playlists WHERE id = ?", (playlist_id,)).fetchone()
+        if old is None:
+            return
+        track_ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT track_id FROM playlist_tracks WHERE playlist_id = ? AND track_id IS NOT NULL",
+            (playlist_id,))]
+        conn.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,))
+        conn.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+        freed = old[0]
+        for track_id in track_ids:
+            orphan = conn.execute(
+                "SELECT length(data) FROM tracks WHERE id = ?1 "
+                "AND NOT EXISTS (SELECT 1 FROM playlist_tracks WHERE track_id = ?1)", (track_id,)
+            ).fetchone()
+            if orphan is not None:
+                conn.execute("DELETE FROM tracks WHERE id = ?", (track_id,))
+                freed += orphan[0]
+        self._grow(conn, -freed)
+
+    # ---- Eviction ----
+
+    def _grow(self, conn: sqlite3.Connection, delta: int):
+        """Account for written data and evict least recently used rows while over budget. Runs on the writer."""
+        with self._lock:
+            self._bytes += delta
+        while self._bytes > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT 'item', uri, accessed_at FROM items UNION ALL SELECT 'playlist', id, accessed_at FROM playlists "
+                "ORDER BY accessed_at LIMIT ?", (EVICTION_BATCH,)
+            ).fetchall()
+            if not oldest:
+                break
+            for kind, key, _ in oldest:
+                if self._bytes <= self.max_bytes:
+                    break
+                if kind == 'item':
+                    size = conn.execute("SELECT size FROM items WHERE uri = ?", (key,)).fetchone()[0]
+                    conn.execute("DELETE FROM items WHERE uri = ?", (key,))
+                    with self._lock:
+                        self._bytes -= size
+                else:
+                    self._delete_playlist(conn, key)
+                self.evictions += 1
+
+    # ---- Lifecycle ----
+
+    def flush(self):
+        """Wait for pending writes."""
+        self._writer.submit(lambda: None).result()
+
+    def close(self):
+        """Finish pending writes and close the connections."""
+        self._writer.shutdown(wait=True)
+        if self._write_conn is not None:
+            self._write_conn.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the stored data size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+def open_store() -> Optional[DiskStore]:
+    """Open the configured store, or return None if it is disabled or can't be opened."""
+    if not config.PERSISTENT_STORE:
+        return None
+    try:
+        return DiskStore()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Metadata store at {config.STORE_PATH} unavailable, keeping metadata in memory only: {e}")
+        return None
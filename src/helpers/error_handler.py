@@ -1,30 +1,83 @@
 """Error handling utilities for Spotify MCP server."""
 
+import asyncio
+import contextlib
 import functools
-import json
+import inspect
 import logging
-from typing import Callable, TypeVar
-from spotipy import SpotifyException
+import time
+from typing import Callable, Optional, TypeVar
+from mcp.types import CallToolResult, TextContent
+
+from src.helpers import metrics, profiling
+from src.helpers.output import tool_result
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Start of the messages returned in place of a result when a tool fails, including the tools' own argument checks
+ERROR_PREFIXES = ("Error:", "Spotify API error:", "Validation error:", "Unexpected error:")
+
+
+def _spotify_exception() -> type:
+    """SpotifyException, imported when first needed so starting the server doesn't load spotipy."""
+    from spotipy import SpotifyException
+    return SpotifyException
+
+
+def _result_text(result) -> Optional[str]:
+    """The text a tool returned, if any."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, CallToolResult) and result.content and isinstance(result.content[0], TextContent):
+        return result.content[0].text
+    return None
+
 
 def handle_spotify_errors(func: Callable[..., T]) -> Callable[..., T]:
     """
     Decorator to handle Spotify API errors consistently across tools.
-    Returns formatted error messages instead of raising exceptions.
+    Returns formatted error messages instead of raising exceptions, and
+    records each call's latency, outcome and result size in the metrics,
+    profiling the call if profiling is on for the tool.
     """
+    registry = metrics.registry
+    profiler = profiling.profiler
+    tool = func.__name__
+
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
+        if not registry.enabled and not profiler.enabled:
+            return await _call(*args, **kwargs)
+        call = profiler.start(tool) if profiler.wants(tool) else None
+        token = profiling.current_call.set(call)
+        started = time.perf_counter()
+        try:
+            with call.section() if call is not None else contextlib.nullcontext():
+                result = await _call(*args, **kwargs)
+        finally:
+            profiling.current_call.reset(token)
+        elapsed = time.perf_counter() - started
+
+        text = _result_text(result)
+        registry.record_tool(tool, elapsed, text is not None and text.startswith(ERROR_PREFIXES),
+                             len(text) if text is not None else None)
+        if call is not None and profiler.qualifies(elapsed):
+            # Writing the profile is file I/O, kept off the event loop
+            await asyncio.to_thread(profiler.finish, call, elapsed)
+        return result
+
+    async def _call(*args, **kwargs):
         try:
             result = await func(*args, **kwargs)
-            # If result is a dict or list, convert to JSON
+            # If result is a dict or list, encode it in the configured output format
             if isinstance(result, (dict, list)):
-                return json.dumps(result, indent=2)
+                started = time.perf_counter()
+                result = tool_result(result)
+                profiling.add_phase('encode', time.perf_counter() - started)
             return result
-        except SpotifyException as se:
+        except _spotify_exception() as se:
             error_msg = f"Spotify API error: {str(se)}"
             logger.error(error_msg)
             return error_msg
@@ -36,5 +89,9 @@ def handle_spotify_errors(func: Callable[..., T]) -> Callable[..., T]:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return error_msg
-    
+
+    # Declaring CallToolResult keeps FastMCP from deriving an output schema from "-> str" and
+    # repeating every text result as {"result": ...} structured content; tool_result adds
+    # structured content itself when enabled
+    wrapper.__signature__ = inspect.signature(func).replace(return_annotation=CallToolResult)
     return wrapper
@@ -0,0 +1,156 @@
+"""Bounded thread pools for running blocking Spotify calls off the event loop and fanning them out."""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, TypeVar
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def in_context(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap func to run in a copy of the caller's context, for handing work to a thread pool.
+
+    Each call gets its own copy since a context can't be entered by two threads at once.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(func, *args, **kwargs)
+
+
+class SpotifyExecutor:
+    """Runs blocking Spotipy calls in a bounded thread pool and tracks queueing."""
+
+    def __init__(self, max_workers: int = config.MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="spotify")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking callable in the pool and await its result.
+
+        Args:
+            func: Blocking callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def call():
+            wait = time.perf_counter() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            if wait * 1000 >= config.SLOW_QUEUE_WAIT_MS:
+                logger.warning(f"{getattr(func, '__name__', func)} waited {wait * 1000:.0f}ms for a worker")
+            try:
+                return ctx.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        return await loop.run_in_executor(self._pool, call)
+
+    def stats(self) -> Dict:
+        """Return queue depth, worker usage and wait times."""
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self._queued,
+                'active': self._active,
+                'completed': self._completed,
+                'avg_wait_ms': round(self._total_wait / started * 1000, 3) if started else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class FanOutPool:
+    """
+    Bounded thread pool shared by a client's concurrent sub-requests:
+    pages of a collection, the parts of an artist, batch lookup groups and
+    library refresh jobs.
+
+    Fan-outs nest (a library refresh loads playlists that page
+    concurrently), so a caller waiting for a call no worker has started
+    yet runs it itself. Waiting threads then only ever wait on running
+    calls, and the pool can't deadlock however small it is.
+    """
+
+    def __init__(self, max_workers: int = config.FANOUT_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="spotify-fanout")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._ran_inline = 0
+
+    def map(self, func: Callable[..., T], items: Iterable,
+            max_parallel: int = config.PAGE_CONCURRENCY) -> Iterator[T]:
+        """
+        Yield func(item) for each item in order, running up to max_parallel calls at a time.
+
+        Calls run in a copy of the caller's context. Closing the iterator
+        early cancels the calls that haven't started.
+        """
+        func = in_context(func)
+        items = list(items)
+        pending = deque()
+        submitted = 0
+        try:
+            for _ in items:
+                while submitted < len(items) and len(pending) < max(1, max_parallel):
+                    pending.append((self._pool.submit(func, items[submitted]), items[submitted]))
+                    submitted += 1
+                future, item = pending.popleft()
+                if future.cancel():
+                    with self._lock:
+                        self._ran_inline += 1
+                    yield func(item)
+                else:
+                    yield future.result()
+        finally:
+            for future, _ in pending:
+                future.cancel()
+            with self._lock:
+                self._submitted += submitted
+
+    def stats(self) -> Dict:
+        """Return how many calls were fanned out and how many the waiting caller ran itself."""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'calls': self._submitted,
+                'ran_inline': self._ran_inline,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,261 @@
+"""In-process search index over the tracks in the user's library."""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.config import config
+from src.helpers.models import Track
+
+logger = logging.getLogger(__name__)
+
+# Source holding the user's saved ("liked") tracks; playlists are 'playlist:<id>'
+SAVED_TRACKS_SOURCE = "saved"
+
+# How much a query token matching each field counts
+FIELD_WEIGHTS = {'name': 3.0, 'artist': 2.0, 'album': 1.0}
+
+# Minimum trigram similarity for a fuzzy token match
+MIN_SIMILARITY = 0.3
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def playlist_source(playlist_id: str) -> str:
+    """Index source name of a playlist."""
+    return f"playlist:{playlist_id}"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free word tokens of a string."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigrams of a token, padded so short tokens still produce some."""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def track_object(track: Track) -> Dict:
+    """Spotify track object with the attributes a parsed track keeps, for indexing stored playlists."""
+    return {
+        'id': track.id,
+        'name': track.name,
+        'is_playable': track.is_playable,
+        'artists': [{'id': artist.id, 'name': artist.name} for artist in track.artists],
+    }
+
+
+class LibraryIndex:
+    """
+    Inverted index of track, artist and album names.
+
+    Tracks are grouped by source (a playlist or the saved tracks) together
+    with a signature of that source's version, e.g. a playlist's
+    snapshot_id, so a refresh only re-indexes sources that changed. Only
+    sources a refresh has established as making up the library are indexed,
+    so playlists the user merely viewed never show up in results. Query
+    tokens match index tokens exactly, by prefix, or by trigram similarity
+    for typos; results are ranked by how many query tokens matched and in
+    which fields.
+    """
+
+    def __init__(self, ttl: int = config.LIBRARY_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sources: Dict[str, tuple] = {}                  # source -> (signature, track IDs)
+        self._tracks: Dict[str, Track] = {}                   # track ID -> track
+        self._track_tokens: Dict[str, Dict[str, float]] = {}  # track ID -> token -> weight
+        self._refs: Dict[str, int] = defaultdict(int)         # track ID -> number of sources
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._dirty: Set[str] = set()
+        self._library: Optional[Set[str]] = None
+        self.refreshed_at: Optional[float] = None
+
+    # ---- Freshness ----
+
+    def signature(self, source: str) -> Any:
+        """Signature the source was indexed with, or None if not indexed."""
+        with self._lock:
+            entry = self._sources.get(source)
+            return entry[0] if entry else None
+
+    def in_library(self, source: str) -> bool:
+        """Whether a source belongs to the library, as far as the last refresh knows."""
+        with self._lock:
+            return self._library is not None and source in self._library
+
+    def add_to_library(self, source: str):
+        """Count a source as part of the library before the next refresh, e.g. a playlist just created."""
+        with self._lock:
+            if self._library is not None:
+                self._library.add(source)
+
+    def is_stale(self) -> bool:
+        """Whether the whole library should be revalidated."""
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.ttl
+
+    def needs_refresh(self) -> bool:
+        """Whether the library is stale or some sources were marked dirty."""
+        with self._lock:
+            if self._dirty:
+                return True
+        return self.is_stale()
+
+    def mark_refreshed(self):
+        """Record that every source was just revalidated."""
+        self.refreshed_at = time.monotonic()
+
+    def mark_dirty(self, source: str):
+        """Revalidate a source on the next refresh, e.g. after modifying the playlist."""
+        with self._lock:
+            self._dirty.add(source)
+
+    def take_dirty(self) -> Set[str]:
+        """Return and clear the sources marked dirty."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    # ---- Updates ----
+
+    def index_source(self, source: str, signature: Any, tracks: Iterable[Dict]):
+        """
+        Replace the tracks indexed for a source; sources outside the library, or any
+        before the first refresh has established it, are ignored.
+
+        Args:
+            source: Source name, see playlist_source and SAVED_TRACKS_SOURCE
+            signature: Version of the source, e.g. a playlist's snapshot_id
+            tracks: Raw Spotify track objects
+        """
+        tracks = {t['id']: t for t in tracks if t and t.get('id')}
+        with self._lock:
+            if self._library is None or source not in self._library:
+                return
+            self._remove_source(source)
+            self._sources[source] = (signature, set(tracks))
+            for track_id, track in tracks.items():
+                self._refs[track_id] += 1
+                if self._refs[track_id] == 1:
+                    self._add_track(track_id, track)
+
+    def remove_source(self, source: str):
+        """Drop a source from the index."""
+        with self._lock:
+            self._remove_source(source)
+
+    def retain(self, sources: Set[str]):
+        """Make sources the library, dropping every other source, e.g. playlists the user no longer follows."""
+        with self._lock:
+            self._library = set(sources)
+            for source in set(self._sources) - sources:
+                self._remove_source(source)
+
+    def _remove_source(self, source: str):
+        entry = self._sources.pop(source, None)
+        if entry is None:
+            return
+        for track_id in entry[1]:
+            self._refs[track_id] -= 1
+            if self._refs[track_id] <= 0:
+                del self._refs[track_id]
+                self._remove_track(track_id)
+
+    def _add_track(self, track_id: str, track: Dict):
+        fields = {
+            'name': track.get('name'),
+            'artist': ' '.join(a['name'] for a in track.get('artists') or []),
+            'album': (track.get('album') or {}).get('name'),
+        }
+        tokens: Dict[str, float] = {}
+        for field, text in fields.items():
+            for token in tokenize(text):
+                tokens[token] = max(tokens.get(token, 0.0), FIELD_WEIGHTS[field])
+        for token, weight in tokens.items():
+            if not self._postings[token]:
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+            self._postings[token][track_id] = weight
+        self._tracks[track_id] = Track.from_api(track)
+        self._track_tokens[track_id] = tokens
+
+    def _remove_track(self, track_id: str):
+        self._tracks.pop(track_id, None)
+        for token in self._track_tokens.pop(track_id, {}):
+            postings = self._postings[token]
+            postings.pop(track_id, None)
+            if not postings:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+
+    # ---- Queries ----
+
+    def _matches(self, query_token: str) -> Dict[str, float]:
+        """Index tokens similar to a query token, with their similarity."""
+        matches = {}
+        if query_token in self._postings:
+            matches[query_token] = 1.0
+        query_grams = trigrams(query_token)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] += 1
+        for token, count in shared.items():
+            if token in matches:
+                continue
+            similarity = count / (len(query_grams) + len(trigrams(token)) - count)
+            if len(query_token) >= 2 and token.startswith(query_token):
+                similarity = max(similarity, 0.8)
+            if similarity >= MIN_SIMILARITY:
+                matches[token] = similarity
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Find indexed tracks matching a query.
+
+        Args:
+            query: Free text over track, artist and album names
+            limit: Maximum number of tracks to return
+
+        Returns:
+            Parsed tracks, best match first
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            raise ValueError("Search query must contain at least one word.")
+
+        with self._lock:
+            scores: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+            for query_token in query_tokens:
+                best: Dict[str, float] = {}
+                for token, similarity in self._matches(query_token).items():
+                    for track_id, weight in self._postings[token].items():
+                        best[track_id] = max(best.get(track_id, 0.0), similarity * weight)
+                for track_id, score in best.items():
+                    scores[track_id][0] += 1
+                    scores[track_id][1] += score
+
+            ranked = sorted(scores.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+            return [self._tracks[track_id].to_dict() for track_id, _ in ranked[:limit]]
+
+    def stats(self) -> Dict:
+        """Return the size of the index."""
+        with self._lock:
+            return {
+                'sources': len(self._sources),
+                'tracks': len(self._tracks),
+                'tokens': len(self._postings),
+            }
@@ -0,0 +1,207 @@
+"""In-process metrics for tool calls and Spotify requests."""
+
+import bisect
+import contextvars
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.config import config
+
+# Upper bounds of the histogram buckets; values above the last bound fall in the +Inf bucket
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Metric name -> (type, label, buckets, help text)
+METRICS = {
+    'tool_calls_total': ('counter', 'tool', None, "Tool calls"),
+    'tool_errors_total': ('counter', 'tool', None, "Tool calls that returned an error"),
+    'tool_duration_ms': ('histogram', 'tool', LATENCY_BUCKETS_MS, "Tool call latency"),
+    'tool_result_chars': ('histogram', 'tool', SIZE_BUCKETS, "Length of tool result text"),
+    'spotify_requests_total': ('counter', 'endpoint', None, "Spotify API calls, counting retries once"),
+    'spotify_errors_total': ('counter', 'endpoint', None, "Spotify API calls that failed after retries"),
+    'spotify_throttled_total': ('counter', 'endpoint', None, "429 responses from the Spotify API"),
+    'spotify_duration_ms': ('histogram', 'endpoint', LATENCY_BUCKETS_MS,
+                            "Spotify API call latency, including rate limit waits and retries"),
+    'spotify_response_bytes': ('histogram', 'endpoint', SIZE_BUCKETS, "Size of Spotify API response bodies"),
+}
+
+# Spotify endpoint being called in this thread or task, so responses and 429s can be attributed to it
+current_endpoint: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_endpoint', default=None)
+
+
+class Histogram:
+    """Bucketed counts plus sum, as in a Prometheus histogram."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    """
+    Counters and histograms keyed by metric name and label value.
+
+    Recording is a dict lookup and a few additions under one lock, cheap
+    enough for every tool call and Spotify request. When disabled nothing
+    is recorded.
+    """
+
+    def __init__(self, enabled: bool = config.METRICS):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def increment(self, metric: str, label: str, amount: int = 1):
+        if not self.enabled:
+            return
+        key = (metric, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, metric: str, label: str, value: float):
+        if not self.enabled:
+            return
+        key = (metric, label)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRICS[metric][2])
+            histogram.observe(value)
+
+    def record_tool(self, tool: str, seconds: float, error: bool, result_chars: Optional[int]):
+        """Record one tool call."""
+        self.increment('tool_calls_total', tool)
+        if error:
+            self.increment('tool_errors_total', tool)
+        self.observe('tool_duration_ms', tool, seconds * 1000)
+        if result_chars is not None:
+            self.observe('tool_result_chars', tool, result_chars)
+
+    def record_request(self, endpoint: str, seconds: float, error: bool):
+        """Record one Spotify API call."""
+        self.increment('spotify_requests_total', endpoint)
+        if error:
+            self.increment('spotify_errors_total', endpoint)
+        self.observe('spotify_duration_ms', endpoint, seconds * 1000)
+
+    def record_response(self, size: int):
+        """Record the body size of a response to the endpoint currently being called."""
+        self.observe('spotify_response_bytes', current_endpoint.get() or 'unknown', size)
+
+    def record_throttled(self):
+        """Record a 429 response to the endpoint currently being called."""
+        self.increment('spotify_throttled_total', current_endpoint.get() or 'unknown')
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # ---- Export ----
+
+    def snapshot(self) -> Dict:
+        """
+        Summarize the metrics per tool and per endpoint.
+
+        Latency percentiles are bucket upper bounds, so they are estimates
+        good to within one bucket.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.count, h.sum, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                          for key, h in self._histograms.items()}
+
+        def summarize(prefix: str, counter_names: Tuple[str, ...]) -> Dict:
+            summary: Dict[str, Dict] = {}
+            for (metric, label), value in counters.items():
+                if metric in counter_names:
+                    summary.setdefault(label, {})[metric.removesuffix('_total')] = value
+            for (metric, label), (count, total, p50, p95, p99) in histograms.items():
+                if not metric.startswith(prefix) or not count:
+                    continue
+                entry = summary.setdefault(label, {})
+                if metric.endswith('_ms'):
+                    entry.update(mean_ms=round(total / count, 1), p50_ms=p50, p95_ms=p95, p99_ms=p99)
+                else:
+                    entry[f"mean_{metric.rsplit('_', 1)[1]}"] = round(total / count)
+            return dict(sorted(summary.items()))
+
+        return {
+            'tools': summarize('tool_', ('tool_calls_total', 'tool_errors_total')),
+            'spotify': summarize('spotify_', ('spotify_requests_total', 'spotify_errors_total',
+                                              'spotify_throttled_total')),
+        }
+
+    def prometheus(self, components: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            components: Stats of the server's components (cache, scheduler, ...),
+                exported as spotify_mcp_component gauges
+
+        Returns:
+            The exposition text
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+
+        lines = []
+        for metric, (kind, label_name, bounds, help_text) in METRICS.items():
+            name = f"spotify_mcp_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (m, label), value in sorted(counters.items()):
+                    if m == metric:
+                        lines.append(f'{name}{{{label_name}="{_escape(label)}"}} {value}')
+                continue
+            for (m, label), (counts, total, count) in sorted(histograms.items()):
+                if m != metric:
+                    continue
+                labels = f'{label_name}="{_escape(label)}"'
+                cumulative = 0
+                for bound, bucket in zip(bounds + ('+Inf',), counts):
+                    cumulative += bucket
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {round(total, 3)}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+
+        if components:
+            lines.append("# HELP spotify_mcp_component Numeric stats of the server's caches, scheduler and pools")
+            lines.append("# TYPE spotify_mcp_component gauge")
+            for component, stats in components.items():
+                for stat, value in stats.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f'spotify_mcp_component{{component="{_escape(component)}",'
+                                     f'stat="{_escape(stat)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by the tools and the Spotify clients
+registry = Metrics()
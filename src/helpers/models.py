@@ -0,0 +1,198 @@
+"""Compact in-memory models of parsed Spotify objects."""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.helpers.profiling import timed
+
+# Stands in for attributes the source object did not have, so they are left out of to_dict
+_UNSET: Any = object()
+
+# Shared instances by ID. Entries disappear once nothing holds the instance any more.
+_artists: 'weakref.WeakValueDictionary[str, Artist]' = weakref.WeakValueDictionary()
+_albums: 'weakref.WeakValueDictionary[str, Album]' = weakref.WeakValueDictionary()
+_tracks: 'weakref.WeakValueDictionary[tuple, Track]' = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+
+def _intern(table: weakref.WeakValueDictionary, key, build):
+    """Return the shared instance for key, building it on first use."""
+    if key is None:
+        return build()
+    instance = table.get(key)
+    if instance is not None:
+        return instance
+    # Built outside the lock, since building a track interns its artists and album
+    built = build()
+    with _intern_lock:
+        instance = table.get(key)
+        if instance is None:
+            instance = table[key] = built
+        return instance
+
+
+def _one_or_many(items: List) -> Tuple[str, Any]:
+    """Key and value the parsers use for a list of artists."""
+    return ('artist', items[0]) if len(items) == 1 else ('artists', items)
+
+
+@dataclass(slots=True, weakref_slot=True)
+class Artist:
+    """
+    An artist as parsers.parse_artist returns it.
+
+    Artists without genres are shared between every track and album that
+    refers to the same artist ID; treat instances as read-only.
+    """
+    name: str
+    id: Optional[str]
+    genres: Optional[Tuple[str, ...]] = _UNSET
+
+    @classmethod
+    def from_api(cls, artist_item: dict, detailed: bool = False) -> Optional['Artist']:
+        """Build an artist from a Spotify artist object."""
+        if not artist_item:
+            return None
+        if detailed:
+            genres = artist_item.get('genres')
+            return cls(artist_item['name'], artist_item['id'], tuple(genres) if genres is not None else None)
+        return _intern(_artists, artist_item['id'], lambda: cls(artist_item['name'], artist_item['id']))
+
+    def to_dict(self) -> Dict:
+        """Same dict as parsers.parse_artist."""
+        item = {'name': self.name, 'id': self.id}
+        if self.genres is not _UNSET:
+            item['genres'] = list(self.genres) if self.genres is not None else None
+        return item
+
+
+@dataclass(slots=True, weakref_slot=True)
+class Album:
+    """
+    An album summary (name, ID and artists) as parsers.parse_album returns it.
+
+    Albums are shared between every track on them; treat instances as read-only.
+    """
+    name: str
+    id: Optional[str]
+    artists: Tuple[Artist, ...]
+
+    @classmethod
+    def from_api(cls, album_item: dict) -> 'Album':
+        """Build an album summary from a Spotify album object."""
+        return _intern(_albums, album_item['id'], lambda: cls(
+            album_item['name'],
+            album_item['id'],
+            tuple(Artist.from_api(a) for a in album_item['artists']),
+        ))
+
+    def to_dict(self) -> Dict:
+        """Same dict as parsers.parse_album without detailed."""
+        item = {'name': self.name, 'id': self.id}
+        key, value = _one_or_many([a.name for a in self.artists])
+        item[key] = value
+        return item
+
+
+@dataclass(slots=True, weakref_slot=True)
+class Track:
+    """
+    A track as parsers.parse_track returns it.
+
+    Tracks without playback state are shared by ID, so a song saved and
+    added to several playlists is held once; treat instances as read-only.
+    """
+    name: str
+    id: Optional[str]
+    artists: Tuple[Artist, ...]
+    is_playable: bool = True
+    is_playing: Any = _UNSET
+    album: Any = _UNSET
+    track_number: Optional[int] = None
+    duration_ms: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, track_item: dict, detailed: bool = False) -> Optional['Track']:
+        """Build a track from a Spotify track object."""
+        if not track_item:
+            return None
+
+        def build():
+            track = cls(
+                track_item['name'],
+                track_item['id'],
+                tuple(Artist.from_api(a) for a in track_item['artists']),
+                bool(track_item.get('is_playable', True)),
+                track_item.get('is_playing', _UNSET),
+            )
+            if detailed:
+                album = track_item.get('album')
+                track.album = Album.from_api(album) if album is not None else None
+                track.track_number = track_item.get('track_number')
+                track.duration_ms = track_item.get('duration_ms')
+            return track
+
+        key = None
+        if track_item['id'] and 'is_playing' not in track_item:
+            key = (track_item['id'], detailed, bool(track_item.get('is_playable', True)))
+        return _intern(_tracks, key, build)
+
+    def to_dict(self) -> Dict:
+        """Same dict as parsers.parse_track with the detail level the track was built with."""
+        item = {'name': self.name, 'id': self.id}
+        if self.is_playing is not _UNSET:
+            item['is_playing'] = self.is_playing
+        detailed = self.album is not _UNSET
+        if detailed:
+            item['album'] = self.album.to_dict() if self.album is not None else None
+            item['track_number'] = self.track_number
+            item['duration_ms'] = self.duration_ms
+        if not self.is_playable:
+            item['is_playable'] = False
+        artists = [a.to_dict() for a in self.artists] if detailed else [a.name for a in self.artists]
+        key, value = _one_or_many(artists)
+        item[key] = value
+        return item
+
+
+@dataclass(slots=True)
+class Playlist:
+    """A playlist with its tracks as parsers.parse_playlist returns it with detailed."""
+    name: str
+    id: str
+    owner: Optional[str]
+    user_is_owner: bool
+    total_tracks: int
+    description: Optional[str]
+    tracks: Tuple[Optional[Track], ...]
+
+    @classmethod
+    @timed('parse')
+    def from_api(cls, playlist_item: dict, username: Optional[str]) -> Optional['Playlist']:
+        """Build a playlist from a Spotify playlist object whose tracks.items are complete."""
+        if not playlist_item:
+            return None
+        owner = playlist_item['owner']['display_name']
+        return cls(
+            playlist_item['name'],
+            playlist_item['id'],
+            owner,
+            owner == username,
+            playlist_item['tracks']['total'],
+            playlist_item.get('description'),
+            tuple(Track.from_api(t['track']) for t in playlist_item['tracks']['items']),
+        )
+
+    def to_dict(self) -> Dict:
+        """Same dict as parsers.parse_playlist with detailed."""
+        return {
+            'name': self.name,
+            'id': self.id,
+            'owner': self.owner,
+            'user_is_owner': self.user_is_owner,
+            'total_tracks': self.total_tracks,
+            'description': self.description,
+            'tracks': [t.to_dict() if t is not None else None for t in self.tracks],
+        }
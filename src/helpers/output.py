@@ -0,0 +1,60 @@
+"""Encoding of tool results."""
+
+import json
+from typing import Any, Union
+
+from mcp.types import CallToolResult, TextContent
+
+from src.config import config
+
+
+def to_columns(value: Any) -> Any:
+    """
+    Rewrite every list of two or more objects as a table.
+
+    The list becomes {'columns': [...], 'rows': [[...], ...]}, naming each
+    key once instead of once per item. Keys missing from an item are null.
+    """
+    if isinstance(value, dict):
+        return {key: to_columns(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if len(value) > 1 and all(isinstance(item, dict) for item in value):
+            columns = list(dict.fromkeys(key for item in value for key in item))
+            return {
+                'columns': columns,
+                'rows': [[to_columns(item.get(column)) for column in columns] for item in value],
+            }
+        return [to_columns(item) for item in value]
+    return value
+
+
+def encode(value: Any, output_format: str = config.OUTPUT_FORMAT) -> str:
+    """Serialize a dict or list result as text in the configured format."""
+    if output_format == 'pretty':
+        return json.dumps(value, indent=2)
+    if output_format == 'columnar':
+        value = to_columns(value)
+    # Without indent, json uses its C encoder
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def tool_result(value: Any, output_format: str = config.OUTPUT_FORMAT,
+                structured: bool = config.STRUCTURED_OUTPUT) -> Union[str, CallToolResult]:
+    """
+    Build the response of a tool that produced a dict or list.
+
+    Args:
+        value: The tool's result
+        output_format: 'compact', 'pretty' or 'columnar'
+        structured: Also attach the result as MCP structured content
+
+    Returns:
+        The encoded text, or a CallToolResult carrying both text and structured content
+    """
+    text = encode(value, output_format)
+    if not structured:
+        return text
+    return CallToolResult(
+        content=[TextContent(type='text', text=text)],
+        structuredContent=value if isinstance(value, dict) else {'result': value},
+    )
@@ -0,0 +1,148 @@
+"""Pagination helpers for Spotify paging objects."""
+
+import asyncio
+import base64
+import binascii
+import itertools
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from src.config import config
+from src.helpers.executor import FanOutPool
+
+
+def remaining_offsets(first_page: Dict, page_size: int, limit: Optional[int] = None) -> List[int]:
+    """
+    Offsets of the pages still missing after the first page.
+
+    Args:
+        first_page: Spotify paging object with 'items', 'offset' and 'total'
+        page_size: Items requested per page
+        limit: Stop once this many items (counted from the first page) are covered
+    """
+    start = first_page.get('offset', 0) + len(first_page['items'])
+    end = first_page['total']
+    if limit is not None:
+        end = min(end, first_page.get('offset', 0) + limit)
+    return list(range(start, end, page_size))
+
+
+def iter_pages(first_page: Dict, fetch_page: Callable[[int], Dict], page_size: int, pool: FanOutPool,
+               limit: Optional[int] = None,
+               max_parallel: int = config.PAGE_CONCURRENCY) -> Iterator[List]:
+    """
+    Yield the items of each page in order, fetching missing pages concurrently.
+
+    Args:
+        first_page: Paging object already returned by Spotify
+        fetch_page: Callable returning the paging object at a given offset
+        page_size: Items per page requested by fetch_page
+        pool: The client's fan-out pool the missing pages are fetched in
+        limit: Maximum number of items to yield
+        max_parallel: Maximum pages fetched at the same time
+    """
+    remaining = limit
+    pages = pool.map(fetch_page, remaining_offsets(first_page, page_size, limit), max_parallel)
+    try:
+        for page in itertools.chain([first_page], pages):
+            items = page['items'] if remaining is None else page['items'][:remaining]
+            if remaining is not None:
+                remaining -= len(items)
+            yield items
+    finally:
+        pages.close()
+
+
+async def iter_pages_async(first_page: Dict, fetch_page: Callable[[int], Awaitable[Dict]],
+                           page_size: int, limit: Optional[int] = None,
+                           max_parallel: int = config.PAGE_CONCURRENCY) -> AsyncIterator[List]:
+    """Coroutine counterpart of iter_pages."""
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def fetch(offset: int) -> Dict:
+        async with semaphore:
+            return await fetch_page(offset)
+
+    remaining = limit
+    tasks = [asyncio.ensure_future(fetch(o)) for o in remaining_offsets(first_page, page_size, limit)]
+    try:
+        for page in itertools.chain([first_page], tasks):
+            if isinstance(page, asyncio.Future):
+                page = await page
+            items = page['items'] if remaining is None else page['items'][:remaining]
+            if remaining is not None:
+                remaining -= len(items)
+            yield items
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def fetch_all_items(first_page: Dict, fetch_page: Callable[[int], Dict], page_size: int, pool: FanOutPool,
+                    limit: Optional[int] = None,
+                    max_parallel: int = config.PAGE_CONCURRENCY) -> List:
+    """Collect every item of a paged collection in order (see iter_pages)."""
+    return [item for items in iter_pages(first_page, fetch_page, page_size, pool, limit, max_parallel)
+            for item in items]
+
+
+async def fetch_all_items_async(first_page: Dict, fetch_page: Callable[[int], Awaitable[Dict]],
+                                page_size: int, limit: Optional[int] = None,
+                                max_parallel: int = config.PAGE_CONCURRENCY) -> List:
+    """Coroutine counterpart of fetch_all_items."""
+    return [item async for items in iter_pages_async(first_page, fetch_page, page_size, limit, max_parallel)
+            for item in items]
+
+
+def encode_cursor(offset: int) -> str:
+    """Encode an offset as an opaque cursor string."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor back into an offset."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split(":", 1)
+        if prefix != "o":
+            raise ValueError
+        return int(offset)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def resolve_offset(offset: int = 0, limit: Optional[int] = None, cursor: Optional[str] = None) -> int:
+    """Offset a page request starts at, taken from the cursor if given; rejects negative offsets and empty pages."""
+    if cursor:
+        offset = decode_cursor(cursor)
+    if offset < 0 or (limit is not None and limit <= 0):
+        raise ValueError("offset must be >= 0 and limit must be > 0.")
+    return offset
+
+
+def make_page(items: List, offset: int, total: int) -> Dict:
+    """Page of items starting at offset in a collection of total items, with a cursor to the next."""
+    end = offset + len(items)
+    return {
+        'items': items,
+        'offset': offset,
+        'total': total,
+        'next_cursor': encode_cursor(end) if end < total else None,
+    }
+
+
+def page_of(items: List, offset: int = 0, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+    """
+    Slice a complete item list into one page with a cursor to the next.
+
+    Args:
+        items: Complete list of items
+        offset: Index of the first item to return (ignored when cursor is given)
+        limit: Maximum number of items to return (default: all remaining)
+        cursor: Cursor returned by a previous page
+
+    Returns:
+        Dict with 'items', 'offset', 'total' and 'next_cursor' (None on the last page)
+    """
+    offset = resolve_offset(offset, limit, cursor)
+    end = len(items) if limit is None else min(len(items), offset + limit)
+    return make_page(items[offset:end], offset, len(items))
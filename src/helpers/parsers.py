@@ -3,7 +3,10 @@
 from collections import defaultdict
 from typing import Optional, Dict, List
 
+from src.helpers.profiling import timed
 
+
+@timed('parse')
 def parse_track(track_item: dict, detailed: bool = False) -> Optional[dict]:
     """Parse a track item from Spotify API."""
     if not track_item:
@@ -34,6 +37,7 @@ def parse_track(track_item: dict, detailed: bool = False) -> Optional[dict]:
     return narrowed_item
 
 
+@timed('parse')
 def parse_artist(artist_item: dict, detailed: bool = False) -> Optional[dict]:
     """Parse an artist item from Spotify API."""
     if not artist_item:
@@ -50,6 +54,7 @@ def parse_artist(artist_item: dict, detailed: bool = False) -> Optional[dict]:
     return narrowed_item
 
 
+@timed('parse')
 def parse_playlist(playlist_item: dict, username: str, detailed: bool = False) -> Optional[dict]:
     """Parse a playlist item from Spotify API."""
     if not playlist_item:
@@ -72,6 +77,7 @@ def parse_playlist(playlist_item: dict, username: str, detailed: bool = False) -
     return narrowed_item
 
 
+@timed('parse')
 def parse_album(album_item: dict, detailed: bool = False) -> dict:
     """Parse an album item from Spotify API."""
     narrowed_item = {
@@ -92,6 +98,7 @@ def parse_album(album_item: dict, detailed: bool = False) -> dict:
     return narrowed_item
 
 
+@timed('parse')
 def parse_search_results(results: Dict, qtype: str, username: Optional[str] = None) -> Dict:
     """Parse search results from Spotify API."""
     _results = defaultdict(list)
@@ -111,6 +118,30 @@ def parse_search_results(results: Dict, qtype: str, username: Optional[str] = No
     return dict(_results)
 
 
+@timed('parse')
 def parse_tracks(items: List[Dict]) -> List[Dict]:
     """Parse a list of track items."""
     return [parse_track(item['track']) for item in items if item]
+
+
+@timed('parse')
+def dedupe_releases(albums: List[Dict]) -> List[Dict]:
+    """
+    Drop repeated releases from an artist's album list.
+
+    Spotify lists the same release once per market edition (e.g. explicit
+    and clean versions), each with its own ID. Releases are considered the
+    same when name, group and track count match; the first one is kept.
+    """
+    seen = set()
+    unique = []
+    for album in albums:
+        if not album:
+            continue
+        key = (album['name'].casefold(), album.get('album_group') or album.get('album_type'),
+               album.get('total_tracks'))
+        if album['id'] in seen or key in seen:
+            continue
+        seen.update((album['id'], key))
+        unique.append(album)
+    return unique
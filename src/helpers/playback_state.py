@@ -0,0 +1,67 @@
+"""Per-request snapshot of the user's playback state."""
+
+import functools
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Holds {'playback': <current_playback response>} for the duration of one client call
+_snapshot: ContextVar[Optional[Dict]] = ContextVar('playback_snapshot', default=None)
+
+
+def request_scoped(func: Callable[..., T]) -> Callable[..., T]:
+    """Decorator sharing one current_playback response across everything func calls."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _snapshot.get() is not None:
+            return func(*args, **kwargs)
+        token = _snapshot.set({})
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _snapshot.reset(token)
+
+    return wrapper
+
+
+def request_scoped_async(func: Callable[..., T]) -> Callable[..., T]:
+    """Coroutine counterpart of request_scoped."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _snapshot.get() is not None:
+            return await func(*args, **kwargs)
+        token = _snapshot.set({})
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _snapshot.reset(token)
+
+    return wrapper
+
+
+def current_playback(fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+    """Return the playback state, calling fetch at most once per request scope."""
+    scope = _snapshot.get()
+    if scope is None:
+        return fetch()
+    if 'playback' not in scope:
+        scope['playback'] = fetch()
+    return scope['playback']
+
+
+async def current_playback_async(fetch: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+    """Coroutine counterpart of current_playback."""
+    scope = _snapshot.get()
+    if scope is None:
+        return await fetch()
+    if 'playback' not in scope:
+        scope['playback'] = await fetch()
+    return scope['playback']
+
+
+def invalidate():
+    """Drop the snapshot after a command that changed playback."""
+    scope = _snapshot.get()
+    if scope is not None:
+        scope.pop('playback', None)
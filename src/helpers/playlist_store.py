@@ -0,0 +1,82 @@
+"""Local store of parsed playlists, revalidated by snapshot_id."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.config import config
+from src.helpers.models import Playlist
+
+logger = logging.getLogger(__name__)
+
+# Fields requested when checking whether a stored playlist is still current
+SNAPSHOT_FIELDS = "snapshot_id"
+
+
+class PlaylistStore:
+    """
+    Keeps each playlist's snapshot_id next to its contents, held as a
+    models.Playlist so tracks, albums and artists shared between playlists
+    are stored once.
+
+    Spotify changes a playlist's snapshot_id whenever the playlist changes,
+    so a stored copy can be revalidated with a fields-limited request and
+    only re-downloaded when the snapshot has moved.
+    """
+
+    def __init__(self, max_playlists: int = config.PLAYLIST_STORE_MAX):
+        self.max_playlists = max_playlists
+        self._playlists: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.downloads = 0
+
+    def get(self, playlist_id: str, snapshot_id: str) -> Optional[Playlist]:
+        """
+        Return the stored playlist if it matches the given snapshot.
+
+        Args:
+            playlist_id: Playlist ID
+            snapshot_id: Current snapshot_id reported by Spotify
+
+        Returns:
+            The playlist, or None if missing or out of date
+        """
+        with self._lock:
+            entry = self._playlists.get(playlist_id)
+            if entry is None or entry[0] != snapshot_id:
+                return None
+            self._playlists.move_to_end(playlist_id)
+            self.reused += 1
+            return entry[1]
+
+    def snapshot(self, playlist_id: str) -> Optional[str]:
+        """Return the stored snapshot_id for a playlist, if any."""
+        with self._lock:
+            entry = self._playlists.get(playlist_id)
+            return entry[0] if entry else None
+
+    def put(self, playlist_id: str, snapshot_id: str, playlist: Playlist) -> Playlist:
+        """Store a freshly downloaded playlist and return it."""
+        with self._lock:
+            self._playlists[playlist_id] = (snapshot_id, playlist)
+            self._playlists.move_to_end(playlist_id)
+            self.downloads += 1
+            while len(self._playlists) > self.max_playlists:
+                self._playlists.popitem(last=False)
+        return playlist
+
+    def invalidate(self, playlist_id: str):
+        """Forget a playlist, e.g. after modifying it."""
+        with self._lock:
+            self._playlists.pop(playlist_id, None)
+
+    def stats(self) -> Dict:
+        """Return how often stored playlists were reused versus re-downloaded."""
+        with self._lock:
+            return {
+                'playlists': len(self._playlists),
+                'reused': self.reused,
+                'downloads': self.downloads,
+            }
@@ -0,0 +1,221 @@
+"""Opt-in profiling of tool calls."""
+
+import contextlib
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# File in the profile directory listing the slowest calls
+SLOWEST_FILE = "slowest.json"
+
+T = TypeVar('T')
+
+
+class CallProfile:
+    """Where the time of one tool call went."""
+
+    def __init__(self, tool: str, sampled: bool):
+        self.tool = tool
+        self.started = time.time()
+        self.sampled = sampled
+        self.phases: Dict[str, List[float]] = {}
+        self.profile: Optional[cProfile.Profile] = None
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float):
+        """Add time spent in a phase; phases overlap when requests run concurrently."""
+        with self._lock:
+            total = self.phases.setdefault(phase, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    @contextlib.contextmanager
+    def section(self):
+        """Run the enclosed code under cProfile if this call was sampled and no other call holds the profiler."""
+        # Since Python 3.12 cProfile covers every thread and only one profiler can be active at a time
+        if not self.sampled or not _profiler_lock.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler, e.g. one wrapped around the whole server, is already running
+            _profiler_lock.release()
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.profile = profile
+            _profiler_lock.release()
+
+    def summary(self, seconds: float) -> Dict:
+        """The call's wall time split into Spotify requests, parsing, result encoding and everything else."""
+        spotify, requests = self.phases.get('spotify', (0.0, 0))
+        parse, _ = self.phases.get('parse', (0.0, 0))
+        encode, _ = self.phases.get('encode', (0.0, 0))
+        return {
+            'tool': self.tool,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'duration_ms': round(seconds * 1000, 1),
+            'spotify_ms': round(spotify * 1000, 1),
+            'spotify_requests': requests,
+            'parse_ms': round(parse * 1000, 1),
+            'encode_ms': round(encode * 1000, 1),
+            # Caches, indexing and worker hand-offs; concurrent requests can add up to more than the wall time
+            'other_ms': round(max(0.0, seconds - spotify - parse - encode) * 1000, 1),
+            'profile': None,
+        }
+
+
+# Tool call being profiled in this task or thread; copied into worker threads with the context
+current_call: contextvars.ContextVar[Optional[CallProfile]] = contextvars.ContextVar('current_call', default=None)
+
+# Held by the call running under cProfile
+_profiler_lock = threading.Lock()
+
+
+# Phase a timed function is running in, so functions it calls that are timed in the same phase count once
+_timed_phase: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('timed_phase', default=None)
+
+
+def add_phase(phase: str, seconds: float):
+    """Attribute time to a phase of the current tool call, if it is profiled."""
+    call = current_call.get()
+    if call is not None:
+        call.add(phase, seconds)
+
+
+def timed(phase: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator attributing a function's time to a phase of the current tool call, if it is profiled."""
+    def decorate(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_call.get() is None or _timed_phase.get() == phase:
+                return func(*args, **kwargs)
+            token = _timed_phase.set(phase)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_phase(phase, time.perf_counter() - started)
+                _timed_phase.reset(token)
+        return wrapper
+    return decorate
+
+
+class Profiler:
+    """
+    Profiles tool calls when enabled.
+
+    Every call of a selected tool gets a breakdown of its wall time into
+    Spotify requests, parsing, result encoding and the rest, which costs a
+    few timer reads. A sample of the calls also runs under cProfile, one call
+    at a time; the profile covers every thread, so it includes whatever
+    else the server ran meanwhile.
+
+    The slowest calls are kept as a rolling top-N in slowest.json in the
+    profile directory, next to the cProfile data (.prof, readable
+    with pstats or snakeviz) of those that were sampled. Profiles of calls
+    that drop out of the top-N are deleted.
+    """
+
+    def __init__(self, enabled: bool = config.PROFILE, tools: Iterable[str] = config.PROFILE_TOOLS,
+                 sample_percent: int = config.PROFILE_SAMPLE_PERCENT, directory: str = config.PROFILE_DIR,
+                 top_n: int = config.PROFILE_TOP_N):
+        self.enabled = enabled
+        self.tools = frozenset(tools)
+        self.sample_percent = sample_percent
+        self.directory = directory
+        self.top_n = max(1, top_n)
+        self._slowest: List[Dict] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def configure(self, enabled: Optional[bool] = None, tools: Optional[Iterable[str]] = None,
+                  sample_percent: Optional[int] = None):
+        """Change the settings at runtime; None leaves a setting unchanged."""
+        if sample_percent is not None and not 0 <= sample_percent <= 100:
+            raise ValueError("sample_percent must be between 0 and 100.")
+        if enabled is not None:
+            self.enabled = enabled
+        if tools is not None:
+            self.tools = frozenset(tools)
+        if sample_percent is not None:
+            self.sample_percent = sample_percent
+        logger.info(f"Profiling {'enabled' if self.enabled else 'disabled'} "
+                    f"for {', '.join(sorted(self.tools)) or 'all tools'}, sampling {self.sample_percent}%")
+
+    def settings(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'tools': sorted(self.tools) or 'all',
+            'sample_percent': self.sample_percent,
+            'directory': self.directory,
+            'top_n': self.top_n,
+        }
+
+    def wants(self, tool: str) -> bool:
+        """Whether calls of this tool are profiled."""
+        return self.enabled and (not self.tools or tool in self.tools)
+
+    def start(self, tool: str) -> CallProfile:
+        """Begin profiling a call, sampling whether it runs under cProfile."""
+        return CallProfile(tool, random.random() * 100 < self.sample_percent)
+
+    def qualifies(self, seconds: float) -> bool:
+        """Whether a call this slow would enter the top-N."""
+        with self._lock:
+            return len(self._slowest) < self.top_n or seconds * 1000 > self._slowest[-1]['duration_ms']
+
+    def finish(self, call: CallProfile, seconds: float):
+        """Record a finished call if it is among the slowest; blocking, as it may write files."""
+        record = call.summary(seconds)
+        if call.profile is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(call.started))
+            name = f"{stamp}-{call.tool}-{record['duration_ms']:.0f}ms-{id(call):x}.prof"
+            call.profile.dump_stats(os.path.join(self.directory, name))
+            record['profile'] = name
+
+        with self._lock:
+            self._slowest.append(record)
+            self._slowest.sort(key=lambda r: r['duration_ms'], reverse=True)
+            evicted = self._slowest[self.top_n:]
+            del self._slowest[self.top_n:]
+            slowest = list(self._slowest)
+
+        for old in evicted:
+            if old['profile']:
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.directory, old['profile']))
+        if any(old is record for old in evicted):
+            return
+        path = os.path.join(self.directory, SLOWEST_FILE)
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                json.dump(slowest, f, indent=2)
+            os.replace(path + ".tmp", path)
+
+    def slowest(self) -> List[Dict]:
+        """The slowest profiled calls, slowest first."""
+        with self._lock:
+            return list(self._slowest)
+
+
+# Shared by the tools
+profiler = Profiler()
@@ -0,0 +1,66 @@
+"""Incremental progress of long-running client operations."""
+
+import contextlib
+import logging
+from typing import Any, AsyncIterator, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Progress(NamedTuple):
+    """
+    One step of a long-running operation.
+
+    Operations are generators yielding a step whenever a page or chunk is
+    done; the last step carries the operation's result. Closing the
+    generator early stops the remaining work.
+    """
+    done: int
+    total: Optional[int]
+    message: str
+    result: Any = None
+
+
+def run(steps: Iterator[Progress]) -> Any:
+    """Drive an operation to completion and return its result."""
+    step = None
+    for step in steps:
+        pass
+    return step.result if step else None
+
+
+async def run_async(steps: AsyncIterator[Progress]) -> Any:
+    """Coroutine counterpart of run."""
+    step = None
+    async with contextlib.aclosing(steps):
+        async for step in steps:
+            pass
+    return step.result if step else None
+
+
+async def report(steps: AsyncIterator[Progress], ctx=None) -> Any:
+    """
+    Drive an operation, forwarding each step as an MCP progress notification.
+
+    If the request is cancelled the operation is closed before its next
+    step, so no further pages are fetched and no further chunks are sent.
+    The last reported message says how far it got, e.g. where to resume.
+
+    Args:
+        steps: Progress steps of the operation
+        ctx: MCP context of the tool call, if any
+
+    Returns:
+        The operation's result
+    """
+    step = None
+    async with contextlib.aclosing(steps):
+        try:
+            async for step in steps:
+                if ctx:
+                    await ctx.report_progress(step.done, step.total, step.message)
+        except BaseException:
+            if step is not None:
+                logger.info(f"Stopped before completion: {step.message}")
+            raise
+    return step.result if step else None
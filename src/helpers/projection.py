@@ -0,0 +1,84 @@
+"""Field projection for Spotify requests."""
+
+import functools
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Track attributes read by parsers.parse_track and the library index
+TRACK_FIELDS = ('id', 'name', 'is_playable', 'artists.id', 'artists.name', 'album.name')
+
+# Playlist attributes read by parsers.parse_playlist, the playlist store and pagination
+PLAYLIST_FIELDS = ('id', 'name', 'description', 'snapshot_id', 'owner.display_name', 'tracks.total',
+                   'tracks.offset')
+
+_FIELD_RE = re.compile(r"^[A-Za-z_]+(\.[A-Za-z_]+)*$")
+
+
+def validate_fields(fields: Optional[Sequence[str]]) -> tuple:
+    """
+    Check extra fields requested by a caller.
+
+    Args:
+        fields: Dotted attribute paths, e.g. ['duration_ms', 'album.release_date']
+
+    Returns:
+        The fields as a sorted tuple without duplicates
+    """
+    fields = tuple(sorted(set(fields or ())))
+    for field in fields:
+        if not _FIELD_RE.match(field):
+            raise ValueError(f"Invalid field: {field!r}. Use dotted attribute names like 'album.release_date'.")
+    return fields
+
+
+def render(paths: Iterable[str]) -> str:
+    """Turn dotted paths into Spotify's fields filter, e.g. 'a.b', 'a.c' -> 'a(b,c)'."""
+    tree: Dict[str, Dict] = {}
+    for path in paths:
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+
+    def fmt(node: Dict) -> str:
+        return ','.join(f"{key}({fmt(child)})" if child else key for key, child in node.items())
+
+    return fmt(tree)
+
+
+@functools.lru_cache(maxsize=128)
+def playlist_fields(extra_track_fields: tuple = ()) -> str:
+    """Fields filter for a playlist with its first page of tracks."""
+    track = [f"tracks.items.track.{f}" for f in TRACK_FIELDS + extra_track_fields]
+    return render(PLAYLIST_FIELDS + tuple(track))
+
+
+@functools.lru_cache(maxsize=128)
+def playlist_items_fields(extra_track_fields: tuple = ()) -> str:
+    """Fields filter for a page of playlist items."""
+    return render(('offset', 'total', *(f"items.track.{f}" for f in TRACK_FIELDS + extra_track_fields)))
+
+
+def get_path(item: Any, path: str) -> Any:
+    """Read a dotted attribute path; lists along the way are mapped over."""
+    for part in path.split('.'):
+        if isinstance(item, list):
+            return [get_path(i, part) for i in item]
+        if not isinstance(item, dict):
+            return None
+        item = item.get(part)
+    return item
+
+
+def with_fields(parsed: Optional[Dict], raw: Optional[Dict], fields: Sequence[str]) -> Optional[Dict]:
+    """Add the requested extra fields of a raw Spotify object to its parsed form."""
+    if parsed is not None and raw is not None:
+        for field in fields:
+            parsed[field] = get_path(raw, field)
+    return parsed
+
+
+def with_track_fields(tracks: List[Optional[Dict]], items: List[Dict], fields: Sequence[str]) -> List:
+    """with_fields for parsed playlist tracks and the playlist items they came from."""
+    for parsed, item in zip(tracks, items):
+        with_fields(parsed, (item or {}).get('track'), fields)
+    return tracks
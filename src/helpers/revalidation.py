@@ -0,0 +1,184 @@
+"""Conditional revalidation of Spotify responses with ETags."""
+
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import requests
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Read endpoints whose responses are kept with their ETag and revalidated with If-None-Match
+REVALIDATED_ENDPOINTS = frozenset({
+    'playlist', 'current_user_playlists', 'track', 'album', 'artist', 'artist_albums', 'artist_top_tracks',
+})
+
+
+class Exchange:
+    """What the transport saw of one conditional request; filled in by the HTTP layer."""
+    __slots__ = ('kept', 'etag_sent', 'status', 'etag', 'size', 'decode_seconds')
+
+    def __init__(self, kept: Optional[tuple]):
+        # The kept response is held here so it can still be returned if it is evicted before the 304 arrives
+        self.kept = kept
+        self.etag_sent = kept[0] if kept else None
+        self.status: Optional[int] = None
+        self.etag: Optional[str] = None
+        self.size = 0
+        self.decode_seconds = 0.0
+
+    def received(self, status: int, etag: Optional[str], size: int):
+        self.status = status
+        self.etag = etag
+        self.size = size
+
+
+# Conditional request being made in this thread or task, for the HTTP layer to fill in
+current_exchange: contextvars.ContextVar[Optional[Exchange]] = contextvars.ContextVar('current_exchange', default=None)
+
+
+class RevalidationCache:
+    """
+    Decoded responses kept with their ETag, bounded by the total size of their bodies.
+
+    A response is reused when Spotify answers its If-None-Match with 304 Not
+    Modified; the bytes and the JSON decode time of the original response
+    are counted as saved.
+    """
+
+    def __init__(self, max_bytes: int = config.REVALIDATION_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.decode_seconds_saved = 0.0
+
+    def start(self, key: str) -> Exchange:
+        """Begin a conditional request for a key, sending the ETag of the response kept for it."""
+        with self._lock:
+            return Exchange(self._entries.get(key))
+
+    def settle(self, key: str, exchange: Exchange, result: Any) -> Any:
+        """
+        Resolve the result of a conditional request.
+
+        Returns:
+            The kept response if the request came back 304, otherwise result,
+            which is kept if it carried an ETag
+        """
+        with self._lock:
+            if exchange.etag_sent is not None:
+                self.revalidated += 1
+            if exchange.status == 304 and exchange.kept is not None:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                _, kept, size, decode_seconds = exchange.kept
+                self.not_modified += 1
+                self.bytes_saved += size
+                self.decode_seconds_saved += decode_seconds
+                return kept
+            if key in self._entries:
+                self._remove(key)
+            if exchange.status != 200 or not exchange.etag or result is None or exchange.size > self.max_bytes:
+                return result
+            self._entries[key] = (exchange.etag, result, exchange.size, exchange.decode_seconds)
+            self._bytes += exchange.size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            return result
+
+    def stats(self) -> Dict:
+        """Return how many requests were revalidated and what 304s saved."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'revalidated': self.revalidated,
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+                'decode_ms_saved': round(self.decode_seconds_saved * 1000, 1),
+            }
+
+    def _remove(self, key: str):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class RevalidatingSpotify:
+    """
+    Wraps a Spotipy (or AsyncSpotify) object so revalidated endpoints send
+    the ETag of their last response and reuse its decoded body on a 304.
+
+    Responses are shared between callers, as with CoalescedSpotify, so they
+    must not be modified.
+    """
+
+    def __init__(self, sp, cache: RevalidationCache):
+        self.sp = sp
+        self.cache = cache
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.sp, name)
+        if name not in REVALIDATED_ENDPOINTS:
+            return attr
+
+        if inspect.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            async def revalidated_async(*args, **kwargs):
+                key = repr((name, args, sorted(kwargs.items())))
+                exchange = self.cache.start(key)
+                token = current_exchange.set(exchange)
+                try:
+                    result = await attr(*args, **kwargs)
+                finally:
+                    current_exchange.reset(token)
+                return self.cache.settle(key, exchange, result)
+            return revalidated_async
+
+        @functools.wraps(attr)
+        def revalidated(*args, **kwargs):
+            key = repr((name, args, sorted(kwargs.items())))
+            exchange = self.cache.start(key)
+            token = current_exchange.set(exchange)
+            try:
+                result = attr(*args, **kwargs)
+            finally:
+                current_exchange.reset(token)
+            return self.cache.settle(key, exchange, result)
+        return revalidated
+
+
+class RevalidatingAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter that sends If-None-Match for the current conditional request and records the response."""
+
+    def send(self, request, **kwargs):
+        exchange = current_exchange.get()
+        if exchange is None:
+            return super().send(request, **kwargs)
+        if exchange.etag_sent is not None:
+            request.headers['If-None-Match'] = exchange.etag_sent
+        response = super().send(request, **kwargs)
+        exchange.received(response.status_code, response.headers.get('ETag'), len(response.content))
+
+        # Spotipy decodes the body itself, so time that call; a 304 has no body and decodes to None
+        decode = response.json
+
+        def timed_json(**json_kwargs):
+            started = time.perf_counter()
+            try:
+                return decode(**json_kwargs)
+            finally:
+                exchange.decode_seconds = time.perf_counter() - started
+
+        response.json = timed_json
+        return response
@@ -0,0 +1,299 @@
+"""Rate-limit-aware scheduling of Spotify API requests."""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+import httpx
+import requests
+from spotipy import SpotifyException
+
+from src.config import config
+from src.helpers import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Priority lanes, lower runs first
+INTERACTIVE = 0
+BULK = 1
+LANES = (INTERACTIVE, BULK)
+
+# Endpoints behind playback control; they always go ahead of library and playlist reads
+INTERACTIVE_ENDPOINTS = frozenset({
+    'start_playback', 'pause_playback', 'next_track', 'previous_track', 'seek_track', 'volume',
+    'add_to_queue', 'queue', 'current_playback', 'current_user_playing_track', 'devices',
+    'transfer_playback', 'shuffle', 'repeat',
+})
+
+# Endpoints that must not be resent after an ambiguous failure (5xx, dropped connection)
+NON_IDEMPOTENT_ENDPOINTS = frozenset({
+    'playlist_add_items', 'user_playlist_create', 'add_to_queue', 'next_track', 'previous_track',
+})
+
+# Lowest fraction of the configured rate a 429 can push the rate down to, and growth per successful request
+MIN_RATE_FRACTION = 0.25
+RECOVERY_FACTOR = 1.05
+
+# Tokens held back for the interactive lane, refilled at the configured rate even while the rate is reduced
+INTERACTIVE_RESERVE = 5
+
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+TRANSPORT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError)
+
+
+def retry_after_seconds(error: SpotifyException, default: float = 1.0) -> float:
+    """Read the Retry-After header of a 429 response."""
+    headers = error.headers or {}
+    try:
+        return max(0.0, float(headers.get('Retry-After', default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class RequestScheduler:
+    """
+    Central gate for Spotify requests.
+
+    A token bucket paces requests. On a 429 the bucket stops issuing tokens
+    until Retry-After has passed and halves its rate, once per pause: 429s
+    for requests already in flight don't compound it. The rate never drops
+    below a quarter of the configured rate and recovers multiplicatively as
+    requests succeed. Waiting interactive requests are always let through
+    before bulk ones, and when the bucket is empty they draw on a small
+    reserve refilled at the configured rate, so backing off bulk requests
+    doesn't starve playback control. Failed requests are retried with
+    jittered exponential backoff.
+    """
+
+    def __init__(self, rate: float = config.RATE_LIMIT_PER_SECOND, burst: int = config.RATE_LIMIT_BURST,
+                 max_retries: int = config.MAX_RETRIES):
+        self.max_rate = max(0.1, rate)
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self._tokens = float(self.burst)
+        self._reserve = float(INTERACTIVE_RESERVE)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = {lane: 0 for lane in LANES}
+        self._cond = threading.Condition()
+        self.counters = {'succeeded': 0, 'throttled': 0, 'retried': 0, 'failed': 0, 'delayed': 0}
+
+    # ---- Token bucket ----
+
+    def _try_acquire(self, lane: int) -> float:
+        """Take a token if this lane may go now; otherwise return seconds to wait. Caller holds the lock."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._reserve = min(INTERACTIVE_RESERVE, self._reserve + elapsed * self.max_rate)
+        self._updated = now
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if any(self._waiting[other] for other in LANES if other < lane):
+            return 0.05
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        if lane != INTERACTIVE:
+            return (1 - self._tokens) / self.rate
+        if self._reserve >= 1:
+            self._reserve -= 1
+            return 0.0
+        return min((1 - self._tokens) / self.rate, (1 - self._reserve) / self.max_rate)
+
+    def acquire(self, lane: int = BULK):
+        """Block until the request may be sent."""
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                wait = self._try_acquire(lane)
+                if wait:
+                    self.counters['delayed'] += 1
+                while wait:
+                    self._cond.wait(wait)
+                    wait = self._try_acquire(lane)
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    async def acquire_async(self, lane: int = BULK):
+        """Coroutine counterpart of acquire."""
+        with self._cond:
+            self._waiting[lane] += 1
+        try:
+            delayed = False
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(lane)
+                if not wait:
+                    return
+                if not delayed:
+                    delayed = True
+                    with self._cond:
+                        self.counters['delayed'] += 1
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def throttle(self, retry_after: float):
+        """Stop issuing tokens for retry_after seconds and halve the request rate unless already paused."""
+        with self._cond:
+            now = time.monotonic()
+            if now >= self._blocked_until:
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            # A little jitter so waiting requests don't all fire at the same instant
+            until = now + retry_after + random.uniform(0, 0.25)
+            self._blocked_until = max(self._blocked_until, until)
+            self._tokens = 0.0
+            self.counters['throttled'] += 1
+        logger.warning(f"Rate limited by Spotify, pausing requests for {retry_after:.1f}s (rate now {self.rate:.2f}/s)")
+
+    def _on_success(self):
+        with self._cond:
+            self.counters['succeeded'] += 1
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * RECOVERY_FACTOR)
+
+    # ---- Retry policy ----
+
+    def _retry_delay(self, error: Exception, attempt: int, idempotent: bool) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error should be raised."""
+        if isinstance(error, SpotifyException) and error.http_status == 429:
+            metrics.registry.record_throttled()
+            self.throttle(retry_after_seconds(error))
+            # The rejected request was not applied, so it is safe to resend once the pause is over
+            return 0.0 if attempt < self.max_retries else None
+        if attempt >= self.max_retries:
+            return None
+        retryable = isinstance(error, TRANSPORT_ERRORS) or (
+            isinstance(error, SpotifyException) and error.http_status in RETRYABLE_STATUSES
+        )
+        if not retryable or not idempotent:
+            return None
+        # Full jitter exponential backoff
+        return random.uniform(0, min(config.BACKOFF_MAX_MS, config.BACKOFF_BASE_MS * 2 ** attempt) / 1000)
+
+    def _record_retry(self, name: str, error: Exception, attempt: int):
+        with self._cond:
+            self.counters['retried'] += 1
+        logger.info(f"Retrying {name} (attempt {attempt + 1}/{self.max_retries}) after: {error}")
+
+    def _record_failure(self):
+        with self._cond:
+            self.counters['failed'] += 1
+
+    def call(self, func: Callable[..., T], *args, lane: int = BULK, idempotent: bool = True, **kwargs) -> T:
+        """Run a blocking request under the rate limit, retrying transient failures."""
+        attempt = 0
+        while True:
+            self.acquire(lane)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    self._record_failure()
+                    raise
+                self._record_retry(getattr(func, '__name__', 'request'), e, attempt)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._on_success()
+            return result
+
+    async def call_async(self, func: Callable, *args, lane: int = BULK, idempotent: bool = True, **kwargs):
+        """Coroutine counterpart of call."""
+        attempt = 0
+        while True:
+            await self.acquire_async(lane)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    self._record_failure()
+                    raise
+                self._record_retry(getattr(func, '__name__', 'request'), e, attempt)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._on_success()
+            return result
+
+    def stats(self) -> Dict:
+        """Return request, throttle and retry counters and the current rate."""
+        with self._cond:
+            return {
+                **self.counters,
+                'rate_per_second': round(self.rate, 2),
+                'waiting_interactive': self._waiting[INTERACTIVE],
+                'waiting_bulk': self._waiting[BULK],
+            }
+
+
+class ScheduledSpotify:
+    """
+    Wraps a Spotipy (or AsyncSpotify) object so every endpoint call goes
+    through a RequestScheduler in the lane that matches the endpoint.
+    """
+
+    def __init__(self, sp, scheduler: RequestScheduler):
+        self.sp = sp
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.sp, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        lane = INTERACTIVE if name in INTERACTIVE_ENDPOINTS else BULK
+        idempotent = name not in NON_IDEMPOTENT_ENDPOINTS
+
+        if inspect.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            async def scheduled_async(*args, **kwargs):
+                if not _observed():
+                    return await self.scheduler.call_async(attr, *args, lane=lane, idempotent=idempotent, **kwargs)
+                with _observe(name):
+                    return await self.scheduler.call_async(attr, *args, lane=lane, idempotent=idempotent, **kwargs)
+            return scheduled_async
+
+        @functools.wraps(attr)
+        def scheduled(*args, **kwargs):
+            if not _observed():
+                return self.scheduler.call(attr, *args, lane=lane, idempotent=idempotent, **kwargs)
+            with _observe(name):
+                return self.scheduler.call(attr, *args, lane=lane, idempotent=idempotent, **kwargs)
+        return scheduled
+
+
+def _observed() -> bool:
+    """Whether requests are being recorded, in the metrics or for a profiled tool call."""
+    return metrics.registry.enabled or profiling.current_call.get() is not None
+
+
+@contextlib.contextmanager
+def _observe(endpoint: str):
+    """Time a request, attributing its responses and 429s to the endpoint."""
+    token = metrics.current_endpoint.set(endpoint)
+    started = time.perf_counter()
+    error = True
+    try:
+        yield
+        error = False
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.registry.record_request(endpoint, elapsed, error)
+        profiling.add_phase('spotify', elapsed)
+        metrics.current_endpoint.reset(token)
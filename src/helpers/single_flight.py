@@ -0,0 +1,156 @@
+"""Coalescing of concurrent identical read requests."""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Endpoints that only read state and can safely share one response between callers
+READ_ENDPOINTS = frozenset({
+    'track', 'tracks', 'album', 'albums', 'album_tracks', 'artist', 'artists', 'artist_albums',
+    'artist_top_tracks', 'playlist', 'playlist_items', 'current_user', 'current_user_playlists',
+    'current_user_saved_tracks', 'search', 'current_playback', 'current_user_playing_track',
+    'devices', 'queue',
+})
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs a function once for all callers that ask for the same key at the
+    same time. Callers arriving while it runs wait for and share its result
+    (or its exception); later callers start a new execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run func, or wait for the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Coroutine counterpart of do."""
+        future = self._futures.get(key)
+        if future is None:
+            self.executed += 1
+            future = self._futures[key] = asyncio.ensure_future(func())
+            future.add_done_callback(functools.partial(self._finish, key))
+        else:
+            self.coalesced += 1
+        # One waiter being cancelled must not cancel the request for the others
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        self._futures.pop(key, None)
+        if not future.cancelled():
+            # Mark the exception retrieved even if every waiter has gone away
+            future.exception()
+
+    def stats(self) -> Dict:
+        """Return how many calls were executed and how many were served by one already in flight."""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls) + len(self._futures),
+            }
+
+
+class CoalescedSpotify:
+    """
+    Wraps a Spotipy (or AsyncSpotify) object so identical read endpoint calls
+    made at the same time share one request.
+
+    Any other endpoint call is treated as a write: once it returns, reads
+    already in flight are no longer joined, so a caller never receives a
+    response that was requested before its own change was applied.
+    """
+
+    def __init__(self, sp, single_flight: SingleFlight):
+        self.sp = sp
+        self.single_flight = single_flight
+        self._generation = 0
+
+    def _key(self, name: str, args: tuple, kwargs: dict) -> str:
+        return repr((self._generation, name, args, sorted(kwargs.items())))
+
+    def _written(self):
+        self._generation += 1
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.sp, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        if name in READ_ENDPOINTS:
+            if inspect.iscoroutinefunction(attr):
+                @functools.wraps(attr)
+                async def coalesced_async(*args, **kwargs):
+                    key = self._key(name, args, kwargs)
+                    return await self.single_flight.do_async(key, lambda: attr(*args, **kwargs))
+                return coalesced_async
+
+            @functools.wraps(attr)
+            def coalesced(*args, **kwargs):
+                return self.single_flight.do(self._key(name, args, kwargs), lambda: attr(*args, **kwargs))
+            return coalesced
+
+        if inspect.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            async def write_async(*args, **kwargs):
+                try:
+                    return await attr(*args, **kwargs)
+                finally:
+                    self._written()
+            return write_async
+
+        @functools.wraps(attr)
+        def write(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self._written()
+        return write
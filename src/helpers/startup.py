@@ -0,0 +1,26 @@
+"""Timings of the server's startup phases."""
+
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Taken when this module is first imported, which src.server does before anything else
+_started = time.perf_counter()
+_phases: Dict[str, float] = {}
+
+
+def mark(phase: str):
+    """Record that a startup phase finished, in milliseconds since the server module started loading."""
+    _phases.setdefault(phase, round((time.perf_counter() - _started) * 1000, 1))
+
+
+def timings() -> Dict[str, float]:
+    """Return the recorded phases in the order they finished."""
+    return dict(_phases)
+
+
+def log_timings():
+    """Log the phases recorded so far."""
+    logger.info("Startup timings (ms): " + ", ".join(f"{phase}={ms}" for phase, ms in _phases.items()))
@@ -0,0 +1,134 @@
+"""In-memory OAuth token handling with proactive background refresh."""
+
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from spotipy.cache_handler import CacheFileHandler
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCacheFileHandler(CacheFileHandler):
+    """
+    Token cache that reads the cache file once and keeps the token in memory.
+
+    Saved tokens are written back to disk on a background thread so callers
+    never wait on file I/O.
+    """
+
+    def __init__(self, cache_path: str):
+        super().__init__(cache_path=cache_path)
+        self._token = super().get_cached_token()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-cache")
+
+    def get_cached_token(self) -> Optional[dict]:
+        return self._token
+
+    def save_token_to_cache(self, token_info: dict):
+        self._token = token_info
+        self._writer.submit(functools.partial(CacheFileHandler.save_token_to_cache, self, token_info))
+
+    def flush(self):
+        """Wait for pending writes to reach the cache file."""
+        self._writer.shutdown(wait=True)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-cache")
+
+
+class TokenManager:
+    """
+    Serves the access token from memory and renews it before it expires.
+
+    A background timer refreshes the token refresh_margin seconds ahead of
+    expiry. Callers that still find an expiring token share a single refresh
+    instead of each calling the token endpoint.
+    """
+
+    def __init__(self, auth_manager, refresh_margin: int = config.TOKEN_REFRESH_MARGIN):
+        self.auth_manager = auth_manager
+        self.cache_handler = auth_manager.cache_handler
+        # Stay within the one-hour token lifetime so the timer cannot spin
+        self.refresh_margin = min(max(refresh_margin, 60), 1800)
+        self.refresh_count = 0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def start(self):
+        """Schedule the background refresh for the current token."""
+        token_info = self.cache_handler.get_cached_token()
+        if token_info:
+            self._schedule(token_info)
+
+    def stop(self):
+        """Cancel the background refresh and flush pending cache writes."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if isinstance(self.cache_handler, BufferedCacheFileHandler):
+            self.cache_handler.flush()
+
+    def expires_soon(self, token_info: Optional[dict] = None) -> bool:
+        """Check whether a token (default: the current one) is inside the refresh margin."""
+        token_info = token_info or self.cache_handler.get_cached_token()
+        return token_info is None or token_info['expires_at'] - time.time() < self.refresh_margin
+
+    def get_token(self) -> dict:
+        """Return a valid token, refreshing it first if it is about to expire."""
+        token_info = self.cache_handler.get_cached_token()
+        if token_info is None:
+            # No token cached - need initial authentication
+            raise RuntimeError(
+                "No authentication token found. Please run initial authentication first.\n"
+                "The browser should have opened during server startup for authentication."
+            )
+        if self.expires_soon(token_info):
+            token_info = self.refresh(stale=token_info)
+        return token_info
+
+    def refresh(self, stale: Optional[dict] = None) -> dict:
+        """
+        Refresh the token, letting concurrent callers share one request.
+
+        Args:
+            stale: The token the caller saw. If another caller already replaced
+                   it with a fresh one, that token is returned without a request.
+
+        Returns:
+            The refreshed token info
+        """
+        with self._lock:
+            token_info = self.cache_handler.get_cached_token()
+            if token_info is None or 'refresh_token' not in token_info:
+                raise RuntimeError("No refresh token available. Please authenticate again.")
+            if stale is not None and token_info is not stale and not self.expires_soon(token_info):
+                return token_info
+
+            logger.info("Refreshing access token")
+            # This will refresh without opening browser
+            token_info = self.auth_manager.refresh_access_token(token_info['refresh_token'])
+            self.refresh_count += 1
+            self._schedule(token_info)
+            return token_info
+
+    def _schedule(self, token_info: dict):
+        """Arm the timer that refreshes the token ahead of expiry."""
+        if self._timer:
+            self._timer.cancel()
+        delay = max(0.0, token_info['expires_at'] - self.refresh_margin - time.time())
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh(stale=self.cache_handler.get_cached_token())
+        except Exception as e:
+            logger.error(f"Background token refresh failed, retrying in 30s: {e}")
+            self._timer = threading.Timer(30, self._background_refresh)
+            self._timer.daemon = True
+            self._timer.start()
@@ -0,0 +1,33 @@
+"""Spotify ID and URI helpers."""
+
+import re
+
+from spotipy import SpotifyException
+
+_URI_RE = re.compile(r"^spotify:(?:user:[^:]+:)?(?P<type>\w+):(?P<id>[0-9A-Za-z]+)$")
+_URL_RE = re.compile(r"open\.spotify\.com/(?:intl-\w+/)?(?P<type>\w+)/(?P<id>[0-9A-Za-z]+)")
+
+
+def get_id(qtype: str, value: str) -> str:
+    """Extract a Spotify ID from an ID, URI or open.spotify.com URL."""
+    match = _URI_RE.match(value) or _URL_RE.search(value)
+    if match:
+        if match.group('type') != qtype:
+            raise SpotifyException(400, -1, f"Unexpected Spotify {match.group('type')} URI, expected {qtype}.")
+        return match.group('id')
+    return value
+
+
+def get_uri(qtype: str, value: str) -> str:
+    """Build a Spotify URI from an ID, URI or open.spotify.com URL."""
+    if _URI_RE.match(value):
+        return value
+    return f"spotify:{qtype}:{get_id(qtype, value)}"
+
+
+def parse_uri(value: str) -> tuple:
+    """Split a Spotify URI or open.spotify.com URL into (type, id)."""
+    match = _URI_RE.match(value) or _URL_RE.search(value)
+    if not match:
+        raise ValueError(f"Invalid Spotify URI: {value}")
+    return match.group('type'), match.group('id')
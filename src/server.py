@@ -2,21 +2,70 @@
 Spotify MCP Server - Improved with FastMCP best practices
 """
 
+# Imported first so the startup timings cover everything below
+from src.helpers import startup
+
 import sys
+from contextlib import asynccontextmanager
 from mcp.server import FastMCP
-from src.helpers.auth_helpers import normalize_redirect_uri
-from src.api import spotify_api
-from src.config.config import validate_environment, setup_logging
+from src.api.lazy_client import LazyClient
+from src.config.config import (
+    validate_environment, setup_logging, NATIVE_ASYNC, LAZY_STARTUP, WARMUP, LIBRARY_INDEX_WARMUP
+)
+from src.helpers.executor import SpotifyExecutor
 from src.tools.playback import register_playback_tools
 from src.tools.search import register_search_tools
 from src.tools.playlists import register_playlist_tools
 from src.tools.devices import register_device_tools
+from src.tools.metrics import register_metrics_tools
+
+startup.mark('imports')
 
 # Setup logging
 logger = setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Log startup timings once the server is about to answer, start the warm-up, and close the client on the way out."""
+    startup.mark('serving')
+    startup.log_timings()
+    if spotify_client and WARMUP:
+        # Without lazy startup the client already exists and only the library index is built
+        spotify_client.warm_up(library_index=LIBRARY_INDEX_WARMUP)
+    try:
+        yield {}
+    finally:
+        if spotify_client:
+            # The native async client's connections have to be closed on the event loop
+            await spotify_client.aclose()
+
+
 # Initialize FastMCP server
-mcp = FastMCP("spotify-mcp")
+mcp = FastMCP("spotify-mcp", lifespan=lifespan)
+
+# Worker pool that keeps blocking Spotify calls off the event loop
+executor = SpotifyExecutor()
+
+
+def _build_client():
+    """Construct the Spotify client; imports spotipy and may run the browser OAuth flow."""
+    from src.api import spotify_api
+    from src.helpers.auth_helpers import normalize_redirect_uri
+
+    if spotify_api.REDIRECT_URI:
+        spotify_api.REDIRECT_URI = normalize_redirect_uri(spotify_api.REDIRECT_URI)
+
+    if NATIVE_ASYNC:
+        from src.api.async_spotify_api import AsyncClient
+        client = AsyncClient(logger)
+        logger.info("Spotify client initialized successfully (native asyncio)")
+    else:
+        from src.api.async_bridge import AsyncBridge
+        client = AsyncBridge(spotify_api.Client(logger), executor)
+        logger.info(f"Spotify client initialized successfully ({executor.max_workers} workers)")
+    return client
+
 
 # Initialize Spotify client and register tools
 def _initialize_server():
@@ -25,23 +74,23 @@ def _initialize_server():
         logger.error("Environment validation failed. Please check your configuration.")
         return None
 
-    if spotify_api.REDIRECT_URI:
-        spotify_api.REDIRECT_URI = normalize_redirect_uri(spotify_api.REDIRECT_URI)
-
-    try:
-        spotify_client = spotify_api.Client(logger)
-        logger.info("Spotify client initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Spotify client: {e}")
-        return None
+    # With lazy startup the client is built on first use (or by the warm-up) instead of here
+    spotify_client = LazyClient(_build_client)
+    if not LAZY_STARTUP:
+        try:
+            spotify_client.build()
+        except Exception as e:
+            logger.error(f"Failed to initialize Spotify client: {e}")
+            return None
 
     # Register all tools with context support
-    if spotify_client:
-        register_playback_tools(mcp, spotify_client)
-        register_search_tools(mcp, spotify_client)
-        register_playlist_tools(mcp, spotify_client)
-        register_device_tools(mcp, spotify_client)
-        logger.info("All tools registered successfully")
+    register_playback_tools(mcp, spotify_client)
+    register_search_tools(mcp, spotify_client)
+    register_playlist_tools(mcp, spotify_client)
+    register_device_tools(mcp, spotify_client)
+    register_metrics_tools(mcp, spotify_client)
+    startup.mark('tools_registered')
+    logger.info("All tools registered successfully")
 
     return spotify_client
 
@@ -64,6 +113,9 @@ def main():
     except Exception as e:
         logger.error(f"Server error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        spotify_client.close()
+        executor.shutdown(wait=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -15,12 +15,12 @@ def register_device_tools(mcp, spotify_client):
     async def get_devices(ctx: Context) -> str:
         """Get list of available Spotify devices."""
         await ctx.info("Getting available devices")
-        return spotify_client.get_devices()
+        return await spotify_client.get_devices()
 
     @mcp.tool(description="Check if there is currently an active Spotify device ready to play music. Returns true if a device is active, false if you need to open Spotify on a device first.")
     @handle_spotify_errors
     async def is_active_device(ctx: Context) -> str:
         "Check if there's an active Spotify device."""
         await ctx.info("Checking for active device")
-        is_active = spotify_client.is_active_device()
+        is_active = await spotify_client.is_active_device()
         return f"Active device: {is_active}"
\ No newline at end of file
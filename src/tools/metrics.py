@@ -0,0 +1,57 @@
+"""Metrics tool and resource for Spotify MCP server."""
+
+import logging
+from typing import List, Optional
+from mcp.server.fastmcp import Context
+from src.helpers import metrics, profiling, startup
+from src.helpers.error_handler import handle_spotify_errors
+
+logger = logging.getLogger(__name__)
+
+
+def register_metrics_tools(mcp, spotify_client):
+    """Register the server metrics and profiling tools and the Prometheus resource with the FastMCP server."""
+
+    async def component_stats():
+        return {**await spotify_client.stats(), 'startup_ms': startup.timings()}
+
+    @mcp.tool(description="Get the server's performance metrics: latency percentiles, call, error and 429 counts and payload sizes per tool and per Spotify endpoint, plus cache hit ratios and scheduler state.")
+    @handle_spotify_errors
+    async def get_server_metrics(ctx: Context) -> str:
+        """Get server performance metrics."""
+        await ctx.info("Collecting server metrics")
+        return {
+            'enabled': metrics.registry.enabled,
+            **metrics.registry.snapshot(),
+            'components': await component_stats(),
+        }
+
+    @mcp.resource("metrics://prometheus", name="prometheus_metrics", mime_type="text/plain",
+                  description="Server metrics in the Prometheus text exposition format")
+    async def prometheus_metrics() -> str:
+        return metrics.registry.prometheus(await component_stats())
+
+    @mcp.tool(description="Turn profiling of tool calls on or off. Profiled calls are split into time spent in Spotify requests, result encoding and the rest; a sample also runs under cProfile. The slowest calls are kept for get_slowest_calls and written to the profile directory.")
+    @handle_spotify_errors
+    async def configure_profiling(enabled: bool, tools: Optional[List[str]] = None,
+                                  sample_percent: Optional[int] = None, ctx: Context = None) -> str:
+        """
+        Configure profiling of tool calls.
+
+        Args:
+            enabled: Whether to profile tool calls.
+            tools: Names of the tools to profile (default: unchanged; an empty list means all tools).
+            sample_percent: Percentage of profiled calls that also run under cProfile (default: unchanged).
+            ctx: MCP context for logging
+        """
+        if ctx:
+            await ctx.info(f"{'Enabling' if enabled else 'Disabling'} profiling")
+        profiling.profiler.configure(enabled=enabled, tools=tools, sample_percent=sample_percent)
+        return profiling.profiler.settings()
+
+    @mcp.tool(description="Get the slowest profiled tool calls, slowest first, with the time each spent in Spotify requests, result encoding and everything else, and the name of its cProfile file if it was sampled.")
+    @handle_spotify_errors
+    async def get_slowest_calls(ctx: Context) -> str:
+        """Get the slowest profiled tool calls."""
+        await ctx.info("Getting the slowest profiled calls")
+        return {'settings': profiling.profiler.settings(), 'calls': profiling.profiler.slowest()}
@@ -18,7 +18,7 @@ def register_playback_tools(mcp, spotify_client):
     async def get_current_track(ctx: Context) -> str:
         """Get information about user's current track."""
         await ctx.info("Getting current track")
-        curr_track = spotify_client.get_current_track()
+        curr_track = await spotify_client.get_current_track()
         return curr_track if curr_track else "No track playing."
 
     @mcp.tool(
@@ -36,7 +36,7 @@ def register_playback_tools(mcp, spotify_client):
         """
         if ctx:
             await ctx.info(f"Starting playback: {spotify_uri or 'resuming'}")
-        spotify_client.start_playback(spotify_uri=spotify_uri)
+        await spotify_client.start_playback(spotify_uri=spotify_uri)
         return "Playback started."
 
     @mcp.tool(
@@ -46,7 +46,7 @@ def register_playback_tools(mcp, spotify_client):
     async def pause_playback(ctx: Context) -> str:
         """Pause current playback."""
         await ctx.info("Pausing playback")
-        spotify_client.pause_playback()
+        await spotify_client.pause_playback()
         return "Playback paused."
 
     @mcp.tool(
@@ -62,7 +62,7 @@ def register_playback_tools(mcp, spotify_client):
             ctx: MCP context for logging
         """
         await ctx.info(f"Skipping {num_skips} track(s)")
-        spotify_client.skip_track(n=num_skips)
+        await spotify_client.skip_track(n=num_skips)
         return f"Skipped {num_skips} track(s)."
 
     @mcp.tool(
@@ -72,7 +72,7 @@ def register_playback_tools(mcp, spotify_client):
     async def previous_track(ctx: Context) -> str:
         """Go to the previous track."""
         await ctx.info("Going to previous track")
-        spotify_client.previous_track()
+        await spotify_client.previous_track()
         return "Switched to previous track."
 
     @mcp.tool(
@@ -91,7 +91,7 @@ def register_playback_tools(mcp, spotify_client):
         if volume_percent < 0 or volume_percent > 100:
             return "Error: Volume must be between 0 and 100."
 
-        spotify_client.set_volume(volume_percent)
+        await spotify_client.set_volume(volume_percent)
         return f"Volume set to {volume_percent}%."
 
     @mcp.tool(
@@ -107,5 +107,5 @@ def register_playback_tools(mcp, spotify_client):
             ctx: MCP context for logging
         """
         await ctx.info(f"Seeking to position {position_ms}ms")
-        spotify_client.seek_to_position(position_ms)
+        await spotify_client.seek_to_position(position_ms)
         return f"Seeked to position {position_ms}ms."
@@ -3,6 +3,7 @@
 import logging
 from typing import List, Optional
 from mcp.server.fastmcp import Context
+from src.helpers import progress
 from src.helpers.error_handler import handle_spotify_errors
 
 logger = logging.getLogger(__name__)
@@ -12,76 +13,139 @@ def register_playlist_tools(mcp, spotify_client):
     """Register playlist management tools with the FastMCP server."""
 
     @mcp.tool(
-        description="Get current user's playlists"
+        description="Get current user's playlists. Returns every playlist unless limit, offset or cursor "
+                    "is given, in which case one page is returned with a next_cursor for the following page."
     )
     @handle_spotify_errors
-    async def get_user_playlists(ctx: Context) -> str:
-        """Get current user's playlists."""
-        await ctx.info("Getting user playlists")
-        return spotify_client.get_current_user_playlists()
+    async def get_user_playlists(
+        limit: Optional[int] = None,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        ctx: Context = None
+    ) -> str:
+        """
+        Get current user's playlists.
+
+        Args:
+            limit: Maximum number of playlists to return (default: all).
+            offset: Index of the first playlist to return (default: 0).
+            cursor: next_cursor from a previous page; takes precedence over offset.
+            ctx: MCP context for logging
+        """
+        if ctx:
+            await ctx.info("Getting user playlists")
+        return await spotify_client.get_current_user_playlists(limit=limit, offset=offset, cursor=cursor)
 
 
     @mcp.tool(
-        description="Get tracks from a specific playlist"
+        description="Get tracks from a specific playlist. Returns every track unless limit, offset or cursor "
+                    "is given, in which case one page is returned with a next_cursor for the following page."
     )
     @handle_spotify_errors
-    async def get_playlist_tracks(playlist_id: str, ctx: Context) -> str:
+    async def get_playlist_tracks(
+        playlist_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        ctx: Context = None
+    ) -> str:
         """
         Get tracks from a specific playlist.
 
         Args:
             playlist_id: ID of the playlist to get tracks from.
+            limit: Maximum number of tracks to return (default: all).
+            offset: Index of the first track to return (default: 0).
+            cursor: next_cursor from a previous page; takes precedence over offset.
+            fields: Extra track attributes to include, e.g. ["duration_ms", "album.release_date"].
             ctx: MCP context for logging
         """
-        await ctx.info(f"Getting tracks from playlist: {playlist_id}")
+        if ctx:
+            await ctx.info(f"Getting tracks from playlist: {playlist_id}")
 
         if not playlist_id:
             return "Error: playlist_id is required."
-        return spotify_client.get_playlist_tracks(playlist_id)
+        if limit is None and not offset and not cursor:
+            # Whole playlists can take many pages, so report each one as it arrives
+            return await progress.report(spotify_client.iter_playlist_tracks(playlist_id, fields=fields), ctx)
+        return await spotify_client.get_playlist_tracks(playlist_id, limit=limit, offset=offset, cursor=cursor,
+                                                        fields=fields)
 
 
     @mcp.tool(
-        description="Add tracks to a specific playlist"
+        description="Add tracks to a specific playlist. Any number of tracks can be added; if the operation "
+                    "stops partway, the result includes resume_from to continue where it left off."
     )
     @handle_spotify_errors
-    async def add_tracks_to_playlist(playlist_id: str, track_ids: List[str], ctx: Context) -> str:
+    async def add_tracks_to_playlist(
+        playlist_id: str,
+        track_ids: List[str],
+        position: Optional[int] = None,
+        resume_from: int = 0,
+        ctx: Context = None
+    ) -> str:
         """
         Add tracks to a specific playlist.
 
         Args:
             playlist_id: ID of the playlist to add tracks to.
             track_ids: List of track IDs to add to the playlist.
+            position: Index to insert the tracks at (default: append to the end).
+            resume_from: Index into track_ids to continue a partially failed call from.
             ctx: MCP context for logging
         """
-        await ctx.info(f"Adding {len(track_ids)} tracks to playlist {playlist_id}")
+        if ctx:
+            await ctx.info(f"Adding {len(track_ids)} tracks to playlist {playlist_id}")
 
         if not playlist_id or not track_ids:
             return "Error: playlist_id and track_ids are required."
 
-        spotify_client.add_tracks_to_playlist(playlist_id=playlist_id, track_ids=track_ids)
-        return "Tracks added to playlist."
+        result = await progress.report(spotify_client.iter_add_tracks_to_playlist(
+            playlist_id=playlist_id,
+            track_ids=track_ids,
+            position=position,
+            resume_from=resume_from
+        ), ctx)
+        if result['resume_from'] is not None:
+            return result
+        return f"Added {result['processed']} tracks to playlist."
 
 
     @mcp.tool(
-        description="Remove tracks from a specific playlist"
+        description="Remove tracks from a specific playlist. Any number of tracks can be removed; if the operation "
+                    "stops partway, the result includes resume_from to continue where it left off."
     )
     @handle_spotify_errors
-    async def remove_tracks_from_playlist(playlist_id: str, track_ids: List[str], ctx: Context) -> str:
+    async def remove_tracks_from_playlist(
+        playlist_id: str,
+        track_ids: List[str],
+        resume_from: int = 0,
+        ctx: Context = None
+    ) -> str:
         """
         Remove tracks from a specific playlist.
 
         Args:
             playlist_id: ID of the playlist to remove tracks from.
             track_ids: List of track IDs to remove from the playlist.
+            resume_from: Index into track_ids to continue a partially failed call from.
             ctx: MCP context for logging
         """
-        await ctx.info(f"Removing {len(track_ids)} tracks from playlist {playlist_id}")
+        if ctx:
+            await ctx.info(f"Removing {len(track_ids)} tracks from playlist {playlist_id}")
 
         if not playlist_id or not track_ids:
             return "Error: playlist_id and track_ids are required."
 
-        spotify_client.remove_tracks_from_playlist(playlist_id=playlist_id, track_ids=track_ids)
-        return "Tracks removed from playlist."
+        result = await progress.report(spotify_client.iter_remove_tracks_from_playlist(
+            playlist_id=playlist_id,
+            track_ids=track_ids,
+            resume_from=resume_from
+        ), ctx)
+        if result['resume_from'] is not None:
+            return result
+        return f"Removed {result['processed']} tracks from playlist."
 
 
     @mcp.tool(
@@ -103,7 +167,7 @@ def register_playlist_tools(mcp, spotify_client):
         if not name:
             return "Error: name is required for creating a playlist."
 
-        return spotify_client.create_playlist(name=name, description=description, public=public)
+        return await spotify_client.create_playlist(name=name, description=description, public=public)
 
     @mcp.tool(
         description="Change playlist details (name and/or description)"
@@ -129,7 +193,7 @@ def register_playlist_tools(mcp, spotify_client):
         if not playlist_id:
             return "Error: playlist_id is required."
 
-        spotify_client.change_playlist_details(
+        await spotify_client.change_playlist_details(
             playlist_id=playlist_id,
             name=name,
             description=description
@@ -1,6 +1,7 @@
 """Search and queue tools for Spotify MCP server - Improved with Context"""
 
 import logging
+from typing import List, Optional
 from mcp.server.fastmcp import Context
 from src.helpers.error_handler import handle_spotify_errors
 
@@ -14,7 +15,8 @@ def register_search_tools(mcp, spotify_client):
         description="Search for tracks, albums, artists, or playlists on Spotify"
     )
     @handle_spotify_errors
-    async def search_spotify(query: str, qtype: str = "track", limit: int = 10, ctx: Context = None) -> str:
+    async def search_spotify(query: str, qtype: str = "track", limit: int = 10, scope: str = "catalog",
+                             ctx: Context = None) -> str:
         """
         Search for tracks, albums, artists, or playlists on Spotify.
 
@@ -23,11 +25,13 @@ def register_search_tools(mcp, spotify_client):
             qtype: Type of items to search for (track, album, artist, playlist,
                    or comma-separated combination).
             limit: Maximum number of items to return (default: 10).
+            scope: "catalog" to search all of Spotify (default), or "library" to search
+                   only tracks in the user's playlists and saved tracks (qtype is ignored).
             ctx: MCP context for logging
         """
         if ctx:
-            await ctx.info(f"Searching: query='{query}', type={qtype}, limit={limit}")
-        return spotify_client.search(query=query, qtype=qtype, limit=limit)
+            await ctx.info(f"Searching: query='{query}', type={qtype}, limit={limit}, scope={scope}")
+        return await spotify_client.search(query=query, qtype=qtype, limit=limit, scope=scope)
 
 
     @mcp.tool(
@@ -44,7 +48,7 @@ def register_search_tools(mcp, spotify_client):
         """
         if ctx:
             await ctx.info(f"Adding track to queue: {track_id}")
-        spotify_client.add_to_queue(track_id)
+        await spotify_client.add_to_queue(track_id)
         return "Track added to queue."
 
 
@@ -55,14 +59,15 @@ def register_search_tools(mcp, spotify_client):
     async def get_queue(ctx: Context) -> str:
         """Get the current playback queue."""
         await ctx.info("Getting current queue")
-        return spotify_client.get_queue()
+        return await spotify_client.get_queue()
 
 
     @mcp.tool(
         description="Get detailed information about a Spotify item (track, album, artist, or playlist)"
     )
     @handle_spotify_errors
-    async def get_item_info(item_uri: str, ctx: Context = None) -> str:
+    async def get_item_info(item_uri: str, full_discography: bool = False, album_tracks: bool = False,
+                            fields: Optional[List[str]] = None, ctx: Context = None) -> str:
         """
         Get detailed information about a Spotify item (track, album, artist, or playlist).
 
@@ -70,8 +75,34 @@ def register_search_tools(mcp, spotify_client):
             item_uri: URI of the item to get information about.
                      If 'playlist' or 'album', returns its tracks.
                      If 'artist', returns albums and top tracks.
+            full_discography: For artists, list every album, single, compilation and
+                              appearance instead of only the first page of albums.
+            album_tracks: For artists, include the tracks of each listed album.
+            fields: Extra attributes to include, e.g. ["popularity", "album.release_date"]
+                    (for playlists, attributes of each track).
             ctx: MCP context for logging
         """
         if ctx:
             await ctx.info(f"Getting info for: {item_uri}")
-        return spotify_client.get_info(item_uri)
\ No newline at end of file
+        return await spotify_client.get_info(item_uri, full_discography=full_discography, album_tracks=album_tracks,
+                                             fields=fields)
+
+
+    @mcp.tool(
+        description="Get information about several Spotify items (tracks, albums, artists, playlists) in one call"
+    )
+    @handle_spotify_errors
+    async def get_items_info(item_uris: List[str], ctx: Context = None) -> str:
+        """
+        Get information about several Spotify items at once.
+
+        Tracks, albums and artists are fetched in batches; playlists are
+        fetched one by one. Artists are returned without albums and top tracks.
+
+        Args:
+            item_uris: List of Spotify URIs, e.g. ["spotify:track:xxxxx", "spotify:album:yyyyy"].
+            ctx: MCP context for logging
+        """
+        if ctx:
+            await ctx.info(f"Getting info for {len(item_uris)} items")
+        return await spotify_client.get_items_info(item_uris)